@@ -4,12 +4,8 @@ import dash_bootstrap_components as dbc
 import utils
 from dash_components import RegisterCallbacks
 from dotenv import load_dotenv
-import asyncio
-from loguru import logger
 
-from fundamental import FinancialStatement
 from common import FUNDAMENTAL_DATA_CACHE_ID
-from utils.comm_interface import HttpComm
 
 load_dotenv()
 
@@ -18,6 +14,8 @@ dbc_css = "https://cdn.jsdelivr.net/npm/bootswatch@4.5.2/dist/minty/bootstrap.mi
 app = Dash(
     title="Trust the Algorithms",
     external_stylesheets=[dbc.themes.DARKLY, dbc_css, dbc.icons.FONT_AWESOME],
+    # Fundamental panels are only added to the layout once their tab is opened
+    suppress_callback_exceptions=True,
 )
 server = app.server
 app._favicon = "bull_icon.ico"
@@ -93,6 +91,7 @@ app.layout = dbc.Container(
                                                     style={"display": "flex"},
                                                 ),
                                                 rc.checklist.layout(),
+                                                rc.stream.layout(),
                                             ]
                                         )
                                     ],
@@ -138,34 +137,26 @@ def update_stock_data(_, search_stock):
     return dash.no_update
 
 
-@callback(
-    Output(FUNDAMENTAL_DATA_CACHE_ID, "data"),
-    Input("activate-search", "data"),
-    State("search-stock", "value"),
-    prevent_initial_call=True,
-)
-def fetch_fundamental_data(_, search_stock):
-    if search_stock:
-        try:
-            logger.debug("Fetch financial statement")
-            fs = FinancialStatement()
-            fs._data_fetcher = HttpComm
-            data = asyncio.run(fs.fetch_financial_statement(search_stock))
-            return data
-        except Exception as e:
-            logger.error(f"Error fetching financial statement: {e}")
-            return None
+@server.route("/metrics")
+def metrics():
+    return rc.metrics()
 
 
+rc.register_search_callback()
 rc.register_MA_plot_callbacks()
 rc.register_RSI_plot_callback()
 rc.register_BB_plot_callback()
 rc.register_best_performance_MA()
 rc.register_best_performance_RSI()
 rc.register_best_performance_BB()
+rc.register_zoom_callbacks()
+rc.register_tab_content_callback()
+rc.register_fundamental_fetch_callback()
 rc.register_fundamental_balance_sheet()
 rc.register_fundamental_cash_flow()
 rc.register_fundamental_income_statement()
+rc.register_scanner_callbacks()
+rc.register_stream_callbacks()
 
 if __name__ == "__main__":
     app.run(debug=True)
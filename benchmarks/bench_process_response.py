@@ -0,0 +1,131 @@
+"""
+Micro-benchmarks of the strategy response parser against the per-strategy
+parsers it replaced. Run from the repository root:
+
+    python -m benchmarks.bench_process_response
+"""
+
+from datetime import datetime, timedelta, timezone
+import random
+import time
+import polars as pl
+
+from strategy import StrategyCrossingMA, StrategyRSI
+from utils.comm_interface import HttpComm
+
+SIZES = [10_000, 100_000, 1_000_000]
+REPEAT = 3
+
+
+def legacy_process_response(data: dict) -> pl.DataFrame | None:
+    if "data" in data and "columns" in data:
+        df = pl.DataFrame(data["data"])
+        df = df.with_columns(
+            pl.col(df.columns[0]).str.strptime(pl.Datetime).cast(pl.Date),
+            *[pl.col(i).cast(pl.Float64) for i in df.columns[1:]],
+        )
+        new_names = data["columns"]["column_names"]
+        df = df.rename(dict(zip(df.columns, new_names)))
+        return df.sort(by=pl.col("datetime"), descending=False)
+
+
+def legacy_process_ma_response(data: dict, columns: list[str]) -> pl.DataFrame | None:
+    if "data" in data and "columns" in data:
+        df = pl.DataFrame(data["data"])
+        df = df.with_columns(
+            pl.col("ma_windows")
+            .map_elements(lambda x: x[0] if len(x) > 0 else None)
+            .alias("ma_window_1"),
+            pl.col("ma_windows")
+            .map_elements(lambda x: x[1] if len(x) > 1 else None)
+            .alias("ma_window_2"),
+        ).drop("ma_windows")
+        df = df.with_columns(
+            pl.col(df.columns[0]).str.strptime(pl.Datetime).cast(pl.Date),
+            *[pl.col(i).cast(pl.Float64) for i in df.columns[1:]],
+        )
+        df = df.select(columns + ["ma_window_1", "ma_window_2", "signal"])
+        new_names = data["columns"]["column_names"]
+        df = df.rename(dict(zip(df.columns, new_names)))
+        return df.sort(by=pl.col("datetime"), descending=False)
+
+
+def make_rows(n: int, ma: bool = False) -> list[dict]:
+    start = datetime(1900, 1, 1)
+    rows = []
+    for i in range(n):
+        price = 100 + random.random()
+        row = {
+            "datetime": (start + timedelta(days=i)).strftime("%Y-%m-%dT%H:%M:%S"),
+            "high": price + 1,
+            "low": price - 1,
+            "open": price,
+            "close": price,
+            "signal": random.choice([-1, 0, 1]),
+        }
+        if ma:
+            row["ma_windows"] = [price, price + 0.5]
+        else:
+            row["rsi"] = random.random() * 100
+        rows.append(row)
+    return rows
+
+
+def to_columns(rows: list[dict]) -> dict:
+    return {key: [row[key] for row in rows] for key in rows[0]}
+
+
+def to_epochs(rows: list[dict]) -> list[dict]:
+    return [
+        {
+            **row,
+            # Upstream epochs are UTC, whatever the host's timezone
+            "datetime": int(
+                datetime.fromisoformat(row["datetime"])
+                .replace(tzinfo=timezone.utc)
+                .timestamp()
+            ),
+        }
+        for row in rows
+    ]
+
+
+def timed(func, *args) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    random.seed(0)
+    rsi = StrategyRSI(HttpComm)
+    x_ma = StrategyCrossingMA(HttpComm)
+    rsi_names = {"column_names": ["datetime", "high", "low", "open", "close"]}
+    rsi_names["column_names"] += ["Signal", "RSI_14"]
+    ma_names = {"column_names": x_ma.columns + ["SMA_20", "SMA_50", "Signal"]}
+
+    print(f"{'payload':<28}{'rows':>10}{'legacy [s]':>12}{'new [s]':>10}{'speedup':>9}")
+    for n in SIZES:
+        rows = make_rows(n)
+        ma_rows = make_rows(n, ma=True)
+        cases = [
+            ("rsi rows", {"data": rows, "columns": rsi_names}, rsi),
+            ("rsi columns", {"data": to_columns(rows), "columns": rsi_names}, rsi),
+            ("rsi epoch rows", {"data": to_epochs(rows), "columns": rsi_names}, rsi),
+            ("crossing ma rows", {"data": ma_rows, "columns": ma_names}, x_ma),
+        ]
+        # Every payload is compared with the legacy parse of the same rows
+        legacy_rsi = timed(legacy_process_response, cases[0][1])
+        legacy_ma = timed(legacy_process_ma_response, cases[-1][1], x_ma.columns)
+        for name, payload, strategy in cases:
+            legacy = legacy_ma if strategy is x_ma else legacy_rsi
+            strategy._process_response(payload)  # warm the schema cache
+            new = timed(strategy._process_response, payload)
+            print(f"{name:<28}{n:>10}{legacy:>12.3f}{new:>10.3f}{legacy / new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
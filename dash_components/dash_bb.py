@@ -7,6 +7,7 @@ class DashBollingerBands:
         self.bb_graph_id = "bb-graph"
         self.bestperf_button = "bb-bestperf-button"
         self.id_layout = "bb-layout"
+        self.view_store = "bb-view"
 
     def layout(self):
         return html.Div(
@@ -26,5 +27,7 @@ class DashBollingerBands:
                     ),
                 ),
                 dcc.Graph(id=self.bb_graph_id),
+                dcc.Store(id=self.view_store),
             ],
+            style={"display": "none"},
         )
@@ -12,6 +12,7 @@ class DashCrossingMA:
         self.bestperf_button = "x-ma-bestperf-button"
         self.crossing_ma_graph = "crossing-ma-graph"
         self.id_layout = "crossing-ma-layout"
+        self.view_store = "crossing-ma-view"
 
     def layout(self):
         return html.Div(
@@ -105,6 +106,7 @@ class DashCrossingMA:
                 dcc.Graph(
                     id=self.crossing_ma_graph,
                 ),
+                dcc.Store(id=self.view_store),
             ],
             style={
                 "display": "none",
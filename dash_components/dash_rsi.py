@@ -7,6 +7,7 @@ class DashRSI:
         self.rsi_graph_id = "rsi-graph"
         self.bestperf_button = "rsi-bestperf-button"
         self.id_layout = "rsi-layout"
+        self.view_store = "rsi-view"
 
     def layout(self):
         return html.Div(
@@ -26,5 +27,7 @@ class DashRSI:
                     ),
                 ),
                 dcc.Graph(id=self.rsi_graph_id),
+                dcc.Store(id=self.view_store),
             ],
+            style={"display": "none"},
         )
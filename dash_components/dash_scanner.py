@@ -0,0 +1,71 @@
+from dash import dash_table, dcc, html
+import dash_bootstrap_components as dbc
+import utils
+
+from scanner import read_watchlist
+from scanner.scan import WATCHLIST
+
+
+class DashScanner:
+    def __init__(self):
+        self.id_layout = "scanner-layout"
+        self.tickers_input = "scanner-tickers"
+        self.run_button = "scanner-run-button"
+        self.progress = "scanner-progress"
+        self.interval = "scanner-interval"
+        self.table = "scanner-table"
+        self.scan_store = "scanner-scan-id"
+        self.columns = [
+            "rank",
+            "stock",
+            "last_date",
+            "close",
+            "buy_votes",
+            "score",
+            "x_ma_signal",
+            "rsi_signal",
+            "bb_signal",
+            "error",
+        ]
+
+    def layout(self):
+        try:
+            watchlist = ", ".join(read_watchlist(WATCHLIST))
+        except OSError:
+            watchlist = ""
+        return html.Div(
+            id=self.id_layout,
+            children=[
+                html.Div(
+                    children=[
+                        dcc.Textarea(
+                            id=self.tickers_input,
+                            value=watchlist,
+                            style={"width": "70%", "height": "60px"},
+                        ),
+                        dbc.Button(
+                            id=self.run_button,
+                            children="Scan",
+                            n_clicks=0,
+                            color="success",
+                            style={"marginLeft": "30px"},
+                        ),
+                    ],
+                    style={"display": "flex", "alignItems": "center"},
+                ),
+                html.Div(
+                    id=self.progress,
+                    style={"color": utils.colors["text"], "margin": "10px 0"},
+                ),
+                dcc.Interval(id=self.interval, interval=1000, disabled=True),
+                dcc.Store(id=self.scan_store),
+                dash_table.DataTable(
+                    id=self.table,
+                    columns=[{"name": col, "id": col} for col in self.columns],
+                    sort_action="native",
+                    page_size=25,
+                    style_header={"backgroundColor": "#222", "color": "white"},
+                    style_cell={"backgroundColor": "#111", "color": "white"},
+                ),
+            ],
+        )
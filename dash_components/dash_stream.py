@@ -0,0 +1,29 @@
+from dash import dcc, html
+import dash_bootstrap_components as dbc
+import os
+import utils
+
+
+class DashStream:
+    def __init__(self):
+        self.live_switch = "live-switch"
+        self.status = "live-status"
+        self.interval = "stream-interval"
+        self.store = "stream-store"
+        self.refresh_ms = int(os.getenv("STREAM_REFRESH_MS", "2000"))
+
+    def layout(self):
+        return html.Div(
+            children=[
+                dbc.Switch(
+                    id=self.live_switch,
+                    label="Live",
+                    value=False,
+                    style={"color": utils.colors["text"], "font-size": 20},
+                ),
+                html.Div(id=self.status, style={"color": utils.colors["text"]}),
+                dcc.Interval(id=self.interval, interval=self.refresh_ms, disabled=True),
+                dcc.Store(id=self.store),
+            ],
+            style={"marginTop": "20px"},
+        )
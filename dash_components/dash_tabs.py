@@ -7,6 +7,7 @@ from .dash_bb import DashBollingerBands
 from .dash_balance_sheet import DashBalanceSheet
 from .dash_cash_flow import DashCashFlow
 from .dash_income_statement import DashIncomeStatement
+from .dash_scanner import DashScanner
 
 
 class DashTabs:
@@ -14,6 +15,9 @@ class DashTabs:
         self.id_layout = "tabs-id"
         self.technical_analysis_id = "ta-id"
         self.fundamental_analysis_id = "fa-id"
+        self.fundamental_content_id = "fa-content"
+        self.fundamental_rendered = "fa-rendered"
+        self.scanner_id = "scan-id"
 
         self.x_ma = DashCrossingMA()
         self.rsi = DashRSI()
@@ -23,6 +27,8 @@ class DashTabs:
         self.cash_flow = DashCashFlow()
         self.income_statement = DashIncomeStatement()
 
+        self.scanner = DashScanner()
+
     def layout(self):
         # Common styles for both tabs
         tab_style = {
@@ -41,9 +47,11 @@ class DashTabs:
         }
         return dcc.Tabs(
             id=self.id_layout,
+            value=self.technical_analysis_id,
             children=[
                 dcc.Tab(
                     id=self.technical_analysis_id,
+                    value=self.technical_analysis_id,
                     label="Technical Analysis",
                     children=[
                         html.Br(),
@@ -59,17 +67,35 @@ class DashTabs:
                 ),
                 dcc.Tab(
                     id=self.fundamental_analysis_id,
+                    value=self.fundamental_analysis_id,
                     label="Fundamental Analysis",
                     children=[
-                        html.Br(),
-                        self.balance_sheet.layout(),
-                        html.Br(),
-                        self.cash_flow.layout(),
-                        html.Br(),
-                        self.income_statement.layout(),
+                        html.Div(id=self.fundamental_content_id),
+                        dcc.Store(id=self.fundamental_rendered, data=False),
                     ],
                     selected_style=tab_selected_style,
                     style=tab_style,
                 ),
+                dcc.Tab(
+                    id=self.scanner_id,
+                    value=self.scanner_id,
+                    label="Scanner",
+                    children=[html.Br(), self.scanner.layout()],
+                    selected_style=tab_selected_style,
+                    style=tab_style,
+                ),
             ],
         )
+
+    def fundamental_layout(self):
+        """
+        Panels of the fundamental tab, only mounted once the tab is opened
+        """
+        return [
+            html.Br(),
+            self.balance_sheet.layout(),
+            html.Br(),
+            self.cash_flow.layout(),
+            html.Br(),
+            self.income_statement.layout(),
+        ]
@@ -1,9 +1,28 @@
-from dash import callback, Input, Output, State
+from dash import callback, ctx, no_update, Input, Output, Patch, State
+from dash.exceptions import PreventUpdate
 import asyncio
+import os
+import re
+import tempfile
+import time
+import uuid
+from datetime import date
+import plotly.graph_objects as go
 
 from utils.comm_interface import *
+from utils.async_runner import get_runner, run_async
+from utils.cached_comm import CachedComm
+from utils.single_flight_comm import SingleFlightComm
+from utils.shared_cache import SharedCacheComm
+from utils.rate_limited_comm import BACKGROUND, RateLimitedComm, request_priority
+from utils.feed_client import FeedClient
+from utils.figure_cache import FigureCache
+from utils.utils import df_fingerprint
+from utils import downsample
 from strategy import StrategyCrossingMA, StrategyRSI, StrategyBollingerBands
-from fundamental import FinancialStatement, BalanceSheet
+from strategy import optimizer
+from fundamental import FinancialStatement, BalanceSheet, StatementStore
+from scanner import Scanner, ScanProgress, run_scan
 from common import FUNDAMENTAL_DATA_CACHE_ID
 
 from .dash_crossing_ma import DashCrossingMA
@@ -11,6 +30,7 @@ from .dash_rsi import DashRSI
 from .dash_bb import DashBollingerBands
 from .dash_checklist import DashChecklist
 from .dash_tabs import DashTabs
+from .dash_stream import DashStream
 from .dash_balance_sheet import DashBalanceSheet
 from .dash_cash_flow import DashCashFlow
 from .dash_income_statement import DashIncomeStatement
@@ -26,60 +46,448 @@ class RegisterCallbacks:
         self.dash_income_statement = DashIncomeStatement()
         self.checklist = DashChecklist()
         self.tabs = DashTabs()
+        self.dash_scanner = self.tabs.scanner
+        self.stream = DashStream()
 
         self.not_display = {}, {"display": "none"}
         self.display = {"display": "block"}
 
-        self.strategy_x_ma = StrategyCrossingMA(HttpComm)
-        self.strategy_rsi = StrategyRSI(HttpComm)
-        self.strategy_bb = StrategyBollingerBands(HttpComm)
+        # Upstream calls share one token bucket, cache hits don't take tokens
+        self.rate_limiter = RateLimitedComm(HttpComm)
+        upstream = self.rate_limiter
+        # Responses are shared by every worker of the host unless disabled
+        if os.getenv("SHARED_CACHE", "1") == "1":
+            upstream = SharedCacheComm(upstream)
+        self.data_fetcher = CachedComm(SingleFlightComm(upstream))
+        self.strategy_x_ma = StrategyCrossingMA(self.data_fetcher)
+        self.strategy_rsi = StrategyRSI(self.data_fetcher)
+        self.strategy_bb = StrategyBollingerBands(self.data_fetcher)
         self.strategy_name = ""
+        # Figures expire with their data, so revalidated prices show up
+        self.figure_cache = FigureCache(
+            ttl=min(self.data_fetcher.default_ttl, *self.data_fetcher.ttls.values())
+        )
 
         self.financial_statement = FinancialStatement()
-        self.financial_statement._data_fetcher = HttpComm
+        self.financial_statement._data_fetcher = self.data_fetcher
+        self.statements = StatementStore()
+        # Fetch fundamentals in the background after a search, otherwise only
+        # once the fundamental tab is opened
+        self.prefetch_fundamentals = os.getenv("FUNDAMENTAL_PREFETCH", "0") == "1"
+
+        self.scanner = Scanner(self.data_fetcher)
+        # Results and progress of every scan on disk, so any worker can
+        # answer the polls of the session that started it
+        self.scan_dir = os.getenv(
+            "SCAN_DASHBOARD_DIR", os.path.join(tempfile.gettempdir(), "vtrade-scans")
+        )
+        # Files of scans nobody polled to the end are removed after this
+        self.scan_file_ttl = float(os.getenv("SCAN_DASHBOARD_FILE_TTL", "3600"))
+
+        # Live bars of the searched ticker, subscribed while live is on
+        self.feed = FeedClient()
+
+    def metrics(self) -> dict:
+        """
+        Hit rates of the caches, queue times of the rate limiter and the
+        state of the upstream circuits
+        """
+        return {
+            "data_cache": self.data_fetcher.stats(),
+            "figure_cache": self.figure_cache.stats(),
+            "rate_limiter": self.rate_limiter.stats(),
+            "http": {
+                "hedges": HttpComm.hedges,
+                "circuits": HttpComm.breaker_states(),
+            },
+        }
+
+    def _figure(self, strategy, stock: str, params: tuple, build):
+        """
+        Figure of a strategy for a ticker and parameters. Served from the
+        figure cache as long as the ticker's price data is unchanged and the
+        entry is younger than the data TTL, otherwise built by build() and
+        cached.
+        """
+        key = (type(strategy).__name__, stock.upper(), params)
+        version = self._data_version(strategy, stock)
+        if version is not None:
+            cached = self.figure_cache.get((*key, version))
+            if cached is not None:
+                return cached
+
+        fig = build()
+        # Building may have fetched newer prices
+        version = self._data_version(strategy, stock)
+        if fig is not None and version is not None:
+            self.figure_cache.put((*key, version), fig)
+        return fig
+
+    @staticmethod
+    def _data_version(strategy, stock: str) -> str | None:
+        ohlcv = strategy.ohlcv(stock)
+        if ohlcv is None:
+            return None
+        return df_fingerprint(ohlcv, ohlcv.columns)
+
+    @staticmethod
+    def _view(stock: str, bestperf: bool = False, **params) -> dict:
+        """
+        What a graph shows, kept in the graph's view store so a zoom can
+        re-render it
+        """
+        return {"stock": stock, "bestperf": bestperf, "params": params}
+
+    @staticmethod
+    def _view_key(view: dict, window) -> tuple:
+        return (view["bestperf"], *view["params"].values(), window)
+
+    @staticmethod
+    def _keep_best(view: dict, surface: pl.DataFrame) -> dict:
+        """
+        Keep the parameters a sweep picked in the view, so a zoom re-renders
+        them instead of sweeping again
+        """
+        best = optimizer.best_params(surface)
+        best.pop("score")
+        view["best"] = best
+        return best
+
+    def _render_crossing_ma(self, view: dict, window=None, df=None):
+        strategy, stock = self.strategy_x_ma, view["stock"]
+        params = view["params"]
+
+        def build():
+            data = df
+            if data is None and view["bestperf"]:
+                if view.get("best") is not None:
+                    data = strategy.compute_cross_ma_signal(
+                        stock, **view["best"], ma_type=params["ma_type"]
+                    )
+                if data is None:
+                    sweep = strategy.sweep_best_performance(stock, params["ma_type"])
+                    if sweep is not None:
+                        data, surface = sweep
+                        self._keep_best(view, surface)
+                if data is None:
+                    data = run_async(
+                        strategy.fetch_best_performance(stock, params["ma_type"])
+                    )
+            elif data is None:
+                # Parameter changes are calculated locally once the ticker's
+                # price history is known
+                data = strategy.compute_cross_ma_signal(stock, **params)
+                if data is None:
+                    data = run_async(strategy.fetch_cross_ma_signal(stock, **params))
+            if data is not None:
+                return strategy.show(data, stock, window)
+
+        return self._figure(strategy, stock, self._view_key(view, window), build)
+
+    def _patch_crossing_ma(self, view: dict) -> Patch | None:
+        """
+        Patch replacing only the moving average and signal traces of a shown
+        crossing MA figure, its candlestick stays in the browser as it is
+        """
+        strategy, stock = self.strategy_x_ma, view["stock"]
+        df = strategy.compute_cross_ma_signal(stock, **view["params"])
+        if df is None:
+            df = run_async(strategy.fetch_cross_ma_signal(stock, **view["params"]))
+        traces = strategy.show_overlay(df, self._window(view))
+        if traces is None:
+            return None
+
+        # An untemplated figure only to serialize the traces as typed arrays
+        data = go.Figure(data=traces, layout={"template": {}}).to_plotly_json()
+        patch = Patch()
+        for i, trace in enumerate(data["data"], start=1):
+            patch["data"][i] = trace
+        return patch
+
+    def _patch_live(self, stock: str) -> Patch:
+        """
+        Patch replacing only the live candlestick, the last trace of every
+        price chart, with the streamed bars of a ticker
+        """
+        trace = self.strategy_x_ma.live_layer(self.feed.buffer(stock).arrays())
+        data = go.Figure(data=[trace], layout={"template": {}}).to_plotly_json()
+        patch = Patch()
+        patch["data"][-1] = data["data"][0]
+        return patch
+
+    @staticmethod
+    def _window(view: dict) -> tuple[date, date] | None:
+        window = view.get("window")
+        if window is None:
+            return None
+        return date.fromisoformat(window[0]), date.fromisoformat(window[1])
+
+    def _render_rsi(self, view: dict, window=None, df=None):
+        strategy, stock = self.strategy_rsi, view["stock"]
+
+        def build():
+            data = df
+            if data is None and view["bestperf"]:
+                best = view.get("best")
+                if best is not None:
+                    data = strategy.compute_rsi_signal(stock, **best)
+                if data is None:
+                    sweep = strategy.sweep_best_performance(stock)
+                    if sweep is not None:
+                        data, surface = sweep
+                        best = self._keep_best(view, surface)
+                if data is not None:
+                    return strategy.show(
+                        data, stock, window, best["upper_bound"], best["lower_bound"]
+                    )
+                data = run_async(strategy.fetch_best_performance(stock))
+            elif data is None:
+                data = run_async(strategy.fetch_rsi_signal(stock))
+            if data is not None:
+                return strategy.show(data, stock, window)
+
+        return self._figure(strategy, stock, self._view_key(view, window), build)
+
+    def _render_bb(self, view: dict, window=None, df=None):
+        strategy, stock = self.strategy_bb, view["stock"]
+
+        def build():
+            data = df
+            if data is None and view["bestperf"]:
+                if view.get("best") is not None:
+                    data = strategy.compute_bb_signal(stock, **view["best"])
+                if data is None:
+                    sweep = strategy.sweep_best_performance(stock)
+                    if sweep is not None:
+                        data, surface = sweep
+                        self._keep_best(view, surface)
+                if data is None:
+                    data = run_async(strategy.fetch_best_performance(stock))
+            elif data is None:
+                data = run_async(strategy.fetch_bb_signal(stock))
+            if data is not None:
+                return strategy.show(data, stock, window)
+
+        return self._figure(strategy, stock, self._view_key(view, window), build)
+
+    def register_search_callback(self):
+        @callback(
+            Output(self.x_ma.crossing_ma_graph, "figure", allow_duplicate=True),
+            Output(self.x_ma.id_layout, "style", allow_duplicate=True),
+            Output(self.dash_rsi.rsi_graph_id, "figure", allow_duplicate=True),
+            Output(self.dash_rsi.id_layout, "style", allow_duplicate=True),
+            Output(self.dash_bb.bb_graph_id, "figure", allow_duplicate=True),
+            Output(self.dash_bb.id_layout, "style", allow_duplicate=True),
+            Output(self.x_ma.view_store, "data", allow_duplicate=True),
+            Output(self.dash_rsi.view_store, "data", allow_duplicate=True),
+            Output(self.dash_bb.view_store, "data", allow_duplicate=True),
+            Input("activate-search", "data"),
+            State(self.checklist.id, "value"),
+            State(self.x_ma.short_ma_input, "value"),
+            State(self.x_ma.long_ma_input, "value"),
+            State(self.x_ma.ma_types, "value"),
+            prevent_initial_call=True,
+        )
+        def search(
+            search_stock,
+            checklist,
+            short_ma: int = 20,
+            long_ma: int = 50,
+            ma_type: str = "SMA",
+        ):
+            if not search_stock:
+                return (*self.not_display * 3, None, None, None)
+            try:
+                results = run_async(
+                    self._fetch_search(
+                        search_stock, checklist, short_ma, long_ma, ma_type
+                    )
+                )
+            except Exception as e:
+                logger.error(f"Error fetching data for {search_stock}: {e}")
+                return (*self.not_display * 3, None, None, None)
+
+            figures, views = [], []
+            for key, render, view in (
+                (
+                    self.checklist.x_ma_val,
+                    self._render_crossing_ma,
+                    self._view(
+                        search_stock,
+                        short_ma=short_ma,
+                        long_ma=long_ma,
+                        ma_type=ma_type,
+                    ),
+                ),
+                (self.checklist.rsi_val, self._render_rsi, self._view(search_stock)),
+                (self.checklist.bb_val, self._render_bb, self._view(search_stock)),
+            ):
+                try:
+                    df = results.get(key)
+                    if isinstance(df, Exception):
+                        raise df
+                    if df is not None:
+                        figures.extend((render(view, df=df), self.display))
+                        views.append(view)
+                        continue
+                except Exception as e:
+                    logger.error(f"Error plotting {key} of {search_stock}: {e}")
+                figures.extend(self.not_display)
+                views.append(None)
+
+            if self.prefetch_fundamentals:
+                get_runner().submit(self._prefetch_statement(search_stock))
+            return (*figures, *views)
+
+    async def _prefetch_statement(self, stock: str):
+        """
+        Low priority fetch of a financial statement once the charts are out
+        """
+        if self.statements.get(self.statements.key(stock)) is not None:
+            return
+        try:
+            with request_priority(BACKGROUND):
+                payload = await self.financial_statement.fetch_financial_statement(
+                    stock
+                )
+            if payload is not None:
+                # Validation is CPU bound, keep it off the event loop
+                await asyncio.to_thread(self.statements.put, stock, payload)
+        except Exception as e:
+            logger.error(f"Error prefetching financial statement of {stock}: {e}")
+
+    def _statement(self, key: str | None) -> FinancialStatement | None:
+        """
+        Validated financial statement of a store key, fetched again if this
+        worker didn't handle the search
+        """
+        if not key:
+            return None
+        statement = self.statements.get(key)
+        if statement is None:
+            payload = run_async(self.financial_statement.fetch_financial_statement(key))
+            if payload is not None:
+                statement = self.statements.put(key, payload)
+        return statement
+
+    async def _fetch_search(
+        self,
+        stock: str,
+        checklist: list[str],
+        short_ma: int,
+        long_ma: int,
+        ma_type: str,
+    ) -> dict:
+        """
+        Compute every enabled indicator from the stored price history once
+        its missing tail is fetched. Tickers that aren't stored yet fetch all
+        indicators concurrently, so the search takes as long as the slowest
+        upstream call.
+        """
+        try:
+            stored = await self.strategy_x_ma.sync_ohlcv(stock)
+        except Exception as e:
+            logger.error(f"Error syncing stored price history of {stock}: {e}")
+            stored = None
+        if stored is not None:
+            return await asyncio.to_thread(
+                self._compute_search, stock, checklist, short_ma, long_ma, ma_type
+            )
+
+        fetches = {}
+        if self.checklist.x_ma_val in checklist:
+            fetches[self.checklist.x_ma_val] = self.strategy_x_ma.fetch_cross_ma_signal(
+                stock, short_ma, long_ma, ma_type
+            )
+        if self.checklist.rsi_val in checklist:
+            fetches[self.checklist.rsi_val] = self.strategy_rsi.fetch_rsi_signal(stock)
+        if self.checklist.bb_val in checklist:
+            fetches[self.checklist.bb_val] = self.strategy_bb.fetch_bb_signal(stock)
+
+        results = await asyncio.gather(*fetches.values(), return_exceptions=True)
+        return dict(zip(fetches.keys(), results))
+
+    def _compute_search(
+        self,
+        stock: str,
+        checklist: list[str],
+        short_ma: int,
+        long_ma: int,
+        ma_type: str,
+    ) -> dict:
+        results = {}
+        if self.checklist.x_ma_val in checklist:
+            results[self.checklist.x_ma_val] = (
+                self.strategy_x_ma.compute_cross_ma_signal(
+                    stock, short_ma, long_ma, ma_type
+                )
+            )
+        if self.checklist.rsi_val in checklist:
+            results[self.checklist.rsi_val] = self.strategy_rsi.compute_rsi_signal(
+                stock
+            )
+        if self.checklist.bb_val in checklist:
+            results[self.checklist.bb_val] = self.strategy_bb.compute_bb_signal(stock)
+        return results
 
     def register_MA_plot_callbacks(self):
         @callback(
             Output(self.x_ma.crossing_ma_graph, "figure"),
             Output(self.x_ma.id_layout, "style"),
+            Output(self.x_ma.view_store, "data"),
             Input(self.x_ma.apply_crossing_ma_button, "n_clicks"),
-            Input("activate-search", "data"),
             Input(self.checklist.id, "value"),
             State("search-stock", "value"),
             State(self.x_ma.short_ma_input, "value"),
             State(self.x_ma.long_ma_input, "value"),
             State(self.x_ma.ma_types, "value"),
+            State(self.x_ma.view_store, "data"),
+            prevent_initial_call=True,
         )
         def plot_crossing_ma(
             _,
-            __,
             checklist,
             search_stock,
             short_ma: int = 20,
             long_ma: int = 50,
             ma_type: str = "SMA",
+            shown: dict | None = None,
         ):
             if self.checklist.x_ma_val not in checklist:
-                return self.not_display
+                return *self.not_display, None
 
             if search_stock:
                 try:
-                    df = asyncio.run(
-                        self.strategy_x_ma.fetch_cross_ma_signal(
-                            search_stock, short_ma, long_ma, ma_type
-                        )
+                    view = self._view(
+                        search_stock,
+                        short_ma=short_ma,
+                        long_ma=long_ma,
+                        ma_type=ma_type,
                     )
-                    if df is not None:
-                        return self.strategy_x_ma.show(df), self.display
+                    # New windows of the ticker already shown only swap the
+                    # overlay traces, in the window the graph is zoomed to
+                    if (
+                        ctx.triggered_id == self.x_ma.apply_crossing_ma_button
+                        and shown is not None
+                        and shown["stock"].upper() == search_stock.upper()
+                    ):
+                        view["window"] = shown.get("window")
+                        patch = self._patch_crossing_ma(view)
+                        if patch is not None:
+                            return patch, self.display, view
+                    fig = self._render_crossing_ma(view)
+                    if fig is not None:
+                        return fig, self.display, view
                 except Exception as e:
                     logger.error(f"Error plotting crossing MA: {e}")
-                    return self.not_display
-            return self.not_display
+                    return *self.not_display, None
+            return *self.not_display, None
 
     def register_best_performance_MA(self):
         @callback(
             Output(self.x_ma.crossing_ma_graph, "figure", allow_duplicate=True),
             Output(self.x_ma.id_layout, "style", allow_duplicate=True),
+            Output(self.x_ma.view_store, "data", allow_duplicate=True),
             Input(self.x_ma.bestperf_button, "n_clicks"),
             State("search-stock", "value"),
             State(self.x_ma.ma_types, "value"),
@@ -92,20 +500,20 @@ class RegisterCallbacks:
         ):
             if search_stock:
                 try:
-                    df = asyncio.run(
-                        self.strategy_x_ma.fetch_best_performance(search_stock, ma_type)
-                    )
-                    if df is not None:
-                        return self.strategy_x_ma.show(df), self.display
+                    view = self._view(search_stock, bestperf=True, ma_type=ma_type)
+                    fig = self._render_crossing_ma(view)
+                    if fig is not None:
+                        return fig, self.display, view
                 except Exception as e:
                     logger.error(f"Error plotting best performance crossing MA: {e}")
-                    return self.not_display
-            return self.not_display
+                    return *self.not_display, None
+            return *self.not_display, None
 
     def register_best_performance_RSI(self):
         @callback(
             Output(self.dash_rsi.rsi_graph_id, "figure", allow_duplicate=True),
             Output(self.dash_rsi.id_layout, "style", allow_duplicate=True),
+            Output(self.dash_rsi.view_store, "data", allow_duplicate=True),
             Input(self.dash_rsi.bestperf_button, "n_clicks"),
             State("search-stock", "value"),
             prevent_initial_call=True,
@@ -116,60 +524,62 @@ class RegisterCallbacks:
         ):
             if search_stock:
                 try:
-                    df = asyncio.run(
-                        self.strategy_rsi.fetch_best_performance(search_stock)
-                    )
-                    if df is not None:
-                        return self.strategy_rsi.show(df), self.display
+                    view = self._view(search_stock, bestperf=True)
+                    fig = self._render_rsi(view)
+                    if fig is not None:
+                        return fig, self.display, view
                 except Exception as e:
                     logger.error(f"Error plotting best performance RSI: {e}")
-                    return self.not_display
-            return self.not_display
+                    return *self.not_display, None
+            return *self.not_display, None
 
     def register_RSI_plot_callback(self):
         @callback(
             Output(self.dash_rsi.rsi_graph_id, "figure"),
             Output(self.dash_rsi.id_layout, "style"),
+            Output(self.dash_rsi.view_store, "data"),
             Input(self.checklist.id, "value"),
             State("search-stock", "value"),
+            prevent_initial_call=True,
         )
         def plot_rsi(checklist, search_stock):
-            if self.checklist.rsi_val in checklist:
+            if self.checklist.rsi_val in checklist and search_stock:
                 try:
-                    df_rsi = asyncio.run(
-                        self.strategy_rsi.fetch_rsi_signal(search_stock)
-                    )
-                    if df_rsi is not None:
-                        return self.strategy_rsi.show(df_rsi), self.display
+                    view = self._view(search_stock)
+                    fig = self._render_rsi(view)
+                    if fig is not None:
+                        return fig, self.display, view
                 except Exception as e:
                     logger.error(f"Error plotting RSI: {e}")
-                    return self.not_display
-            else:
-                return self.not_display
+                    return *self.not_display, None
+            return *self.not_display, None
 
     def register_BB_plot_callback(self):
         @callback(
             Output(self.dash_bb.bb_graph_id, "figure"),
             Output(self.dash_bb.id_layout, "style"),
+            Output(self.dash_bb.view_store, "data"),
             Input(self.checklist.id, "value"),
             State("search-stock", "value"),
+            prevent_initial_call=True,
         )
         def plot_bb(checklist, search_stock):
-            if self.checklist.bb_val in checklist:
+            if self.checklist.bb_val in checklist and search_stock:
                 try:
-                    df_bb = asyncio.run(self.strategy_bb.fetch_bb_signal(search_stock))
-                    if df_bb is not None:
-                        return self.strategy_bb.show(df_bb), self.display
+                    view = self._view(search_stock)
+                    fig = self._render_bb(view)
+                    if fig is not None:
+                        return fig, self.display, view
                 except Exception as e:
                     logger.error(f"Error plotting Bollinger Bands: {e}")
-                    return self.not_display
-            else:
-                return self.not_display
+                    return *self.not_display, None
+            return *self.not_display, None
 
     def register_best_performance_BB(self):
         @callback(
             Output(self.dash_bb.bb_graph_id, "figure", allow_duplicate=True),
             Output(self.dash_bb.id_layout, "style", allow_duplicate=True),
+            Output(self.dash_bb.view_store, "data", allow_duplicate=True),
             Input(self.dash_bb.bestperf_button, "n_clicks"),
             State("search-stock", "value"),
             prevent_initial_call=True,
@@ -180,32 +590,110 @@ class RegisterCallbacks:
         ):
             if search_stock:
                 try:
-                    df = asyncio.run(
-                        self.strategy_bb.fetch_best_performance(search_stock)
-                    )
-                    if df is not None:
-                        return self.strategy_bb.show(df), self.display
+                    view = self._view(search_stock, bestperf=True)
+                    fig = self._render_bb(view)
+                    if fig is not None:
+                        return fig, self.display, view
                 except Exception as e:
                     logger.error(f"Error plotting best performance BB: {e}")
-                    return self.not_display
-            return self.not_display
+                    return *self.not_display, None
+            return *self.not_display, None
+
+    def register_zoom_callbacks(self):
+        """
+        Re-render a graph for the window it was zoomed to, so the zoomed
+        range is shown at full resolution instead of the downsampled one
+        """
+        for graph, view_store, render in (
+            (
+                self.x_ma.crossing_ma_graph,
+                self.x_ma.view_store,
+                self._render_crossing_ma,
+            ),
+            (self.dash_rsi.rsi_graph_id, self.dash_rsi.view_store, self._render_rsi),
+            (self.dash_bb.bb_graph_id, self.dash_bb.view_store, self._render_bb),
+        ):
+            self._register_zoom_callback(graph, view_store, render)
+
+    def _register_zoom_callback(self, graph: str, view_store: str, render):
+        @callback(
+            Output(graph, "figure", allow_duplicate=True),
+            Output(view_store, "data", allow_duplicate=True),
+            Input(graph, "relayoutData"),
+            State(view_store, "data"),
+            prevent_initial_call=True,
+        )
+        def zoom(relayout, view):
+            if view is None or not downsample.is_zoom(relayout):
+                raise PreventUpdate
+            window = downsample.zoom_window(relayout)
+            try:
+                fig = render(view, window)
+            except Exception as e:
+                logger.error(f"Error zooming {graph}: {e}")
+                raise PreventUpdate
+            if fig is None:
+                raise PreventUpdate
+            view["window"] = None if window is None else [d.isoformat() for d in window]
+            return fig, view
+
+    def register_tab_content_callback(self):
+        @callback(
+            Output(self.tabs.fundamental_content_id, "children"),
+            Output(self.tabs.fundamental_rendered, "data"),
+            Input(self.tabs.id_layout, "value"),
+            State(self.tabs.fundamental_rendered, "data"),
+            prevent_initial_call=True,
+        )
+        def render_fundamental_tab(tab, rendered):
+            """
+            Mount the fundamental panels the first time their tab is opened,
+            their graph callbacks then draw from the statement store. They
+            stay mounted afterwards so switching tabs doesn't rebuild them.
+            """
+            if tab != self.tabs.fundamental_analysis_id or rendered:
+                raise PreventUpdate
+            return self.tabs.fundamental_layout(), True
+
+    def register_fundamental_fetch_callback(self):
+        @callback(
+            Output(FUNDAMENTAL_DATA_CACHE_ID, "data"),
+            Input(self.tabs.id_layout, "value"),
+            Input("activate-search", "data"),
+            State(FUNDAMENTAL_DATA_CACHE_ID, "data"),
+            prevent_initial_call=True,
+        )
+        def fetch_fundamental_data(tab, search_stock, shown_key):
+            """
+            Load the financial statement of the searched ticker only while the
+            fundamental tab is open, switching back to it is then instant
+            """
+            if tab != self.tabs.fundamental_analysis_id or not search_stock:
+                raise PreventUpdate
+            key = self.statements.key(search_stock)
+            if key == shown_key:
+                raise PreventUpdate
+            try:
+                if self._statement(key) is not None:
+                    return key
+            except Exception as e:
+                logger.error(f"Error fetching financial statement: {e}")
+            return None
 
     def register_fundamental_balance_sheet(self):
         @callback(
             Output(self.dash_balance_sheet.id_balance_sheet_graph, "figure"),
             Output(self.dash_balance_sheet.id_layout, "style"),
             Input(FUNDAMENTAL_DATA_CACHE_ID, "data"),
-            prevent_initial_call=True,
         )
-        def plot_fundamental_balance_sheet(data):
+        def plot_fundamental_balance_sheet(key):
             try:
-                if data is not None:
-                    validated_fs = self.financial_statement.model_validate(data)
-                    if validated_fs.balance_sheet:
-                        return (
-                            validated_fs.show_balance_sheet(),
-                            self.display,
-                        )
+                statement = self._statement(key)
+                if statement is not None and statement.balance_sheet:
+                    return (
+                        statement.show_balance_sheet(),
+                        self.display,
+                    )
             except Exception as e:
                 logger.error(f"Error showing balance sheet: {e}")
                 return self.not_display
@@ -216,17 +704,15 @@ class RegisterCallbacks:
             Output(self.dash_cash_flow.id_cash_flow_graph, "figure"),
             Output(self.dash_cash_flow.id_layout, "style"),
             Input(FUNDAMENTAL_DATA_CACHE_ID, "data"),
-            prevent_initial_call=True,
         )
-        def plot_fundamental_cash_flow(data):
+        def plot_fundamental_cash_flow(key):
             try:
-                if data is not None:
-                    validated_fs = self.financial_statement.model_validate(data)
-                    if validated_fs.cash_flow:
-                        return (
-                            validated_fs.show_cash_flow(),
-                            self.display,
-                        )
+                statement = self._statement(key)
+                if statement is not None and statement.cash_flow:
+                    return (
+                        statement.show_cash_flow(),
+                        self.display,
+                    )
             except Exception as e:
                 logger.error(f"Error showing cash flow: {e}")
                 return self.not_display
@@ -237,18 +723,195 @@ class RegisterCallbacks:
             Output(self.dash_income_statement.id_cash_flow_graph, "figure"),
             Output(self.dash_income_statement.id_layout, "style"),
             Input(FUNDAMENTAL_DATA_CACHE_ID, "data"),
-            prevent_initial_call=True,
         )
-        def plot_fundamental_income_statement(data):
+        def plot_fundamental_income_statement(key):
             try:
-                if data is not None:
-                    validated_fs = self.financial_statement.model_validate(data)
-                    if validated_fs.income_statement:
-                        return (
-                            validated_fs.show_income_statement(),
-                            self.display,
-                        )
+                statement = self._statement(key)
+                if statement is not None and statement.income_statement:
+                    return (
+                        statement.show_income_statement(),
+                        self.display,
+                    )
             except Exception as e:
                 logger.error(f"Error showing income statement: {e}")
                 return self.not_display
             return self.not_display
+
+    def _scan_paths(self, scan_id: str | None) -> tuple[str, str] | None:
+        """
+        Results and progress files of a scan, None for ids not made by
+        start_scan as they come from the browser
+        """
+        if not scan_id or not re.fullmatch(r"[0-9a-f]{32}", scan_id):
+            return None
+        output = os.path.join(self.scan_dir, f"scan-{scan_id}.parquet")
+        return output, output + ".progress.json"
+
+    def _remove_scan_files(self, *paths: str):
+        for path in paths:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"Error removing scan file {path}: {e}")
+
+    @staticmethod
+    def _scan_file_age(path: str) -> float:
+        try:
+            return time.time() - os.path.getmtime(path)
+        except OSError:
+            return float("inf")
+
+    def _prune_scan_files(self):
+        """
+        Remove the files of abandoned scans
+        """
+        try:
+            entries = list(os.scandir(self.scan_dir))
+        except OSError:
+            return
+        expired = time.time() - self.scan_file_ttl
+        for entry in entries:
+            try:
+                if entry.name.startswith("scan-") and entry.stat().st_mtime < expired:
+                    self._remove_scan_files(entry.path)
+            except OSError:
+                pass
+
+    def register_scanner_callbacks(self):
+        @callback(
+            Output(self.dash_scanner.interval, "disabled"),
+            Output(self.dash_scanner.progress, "children"),
+            Output(self.dash_scanner.scan_store, "data"),
+            Input(self.dash_scanner.run_button, "n_clicks"),
+            State(self.dash_scanner.tickers_input, "value"),
+            prevent_initial_call=True,
+        )
+        def start_scan(_, tickers):
+            """
+            Scan in the background, the interval polls the progress. Every
+            scan has its own files, so sessions don't overwrite each other.
+            """
+            tickers = [
+                t.strip().upper() for t in (tickers or "").replace(",", " ").split()
+            ]
+            tickers = list(dict.fromkeys(tickers))
+            if not tickers:
+                return True, "Enter tickers to scan", None
+            self._prune_scan_files()
+            os.makedirs(self.scan_dir, exist_ok=True)
+            scan_id = uuid.uuid4().hex
+            output, progress_path = self._scan_paths(scan_id)
+            progress = ScanProgress(len(tickers), progress_path)
+            progress.write()
+            get_runner().submit(run_scan(tickers, output, self.scanner, progress))
+            return False, f"Scanning {len(tickers)} tickers", scan_id
+
+        @callback(
+            Output(self.dash_scanner.table, "data"),
+            Output(self.dash_scanner.progress, "children", allow_duplicate=True),
+            Output(self.dash_scanner.interval, "disabled", allow_duplicate=True),
+            Input(self.dash_scanner.interval, "n_intervals"),
+            State(self.dash_scanner.scan_store, "data"),
+            prevent_initial_call=True,
+        )
+        def poll_scan(_, scan_id):
+            paths = self._scan_paths(scan_id)
+            if paths is None:
+                return no_update, no_update, True
+            output, progress_path = paths
+            stats = ScanProgress.read(progress_path)
+            if stats is None:
+                raise PreventUpdate
+            status = (
+                f"Scanned {stats['done']}/{stats['total']} tickers, "
+                f"{stats['failed']} failed, {stats['tickers_per_second']} tickers/s"
+            )
+            if not stats["finished"]:
+                return no_update, status, False
+            if not os.path.exists(output) and self._scan_file_age(progress_path) < 30:
+                # Progress is finished just before the results are written
+                return no_update, status, False
+            try:
+                results = pl.read_parquet(output)
+            except Exception as e:
+                logger.error(f"Error reading scan results: {e}")
+                return no_update, status, True
+            finally:
+                # The results are sent to the session, the files aren't needed
+                self._remove_scan_files(output, progress_path)
+            results = results.select(self.dash_scanner.columns).with_columns(
+                pl.col("last_date").cast(pl.String),
+                pl.col("close", "score").round(3),
+            )
+            return results.to_dicts(), f"{status} in {stats['seconds']}s", True
+
+    def register_stream_callbacks(self):
+        @callback(
+            Output(self.stream.interval, "disabled"),
+            Output(self.stream.status, "children"),
+            Output(self.stream.store, "data"),
+            Input(self.stream.live_switch, "value"),
+            Input("activate-search", "data"),
+            prevent_initial_call=True,
+        )
+        def toggle_stream(live, search_stock):
+            """
+            Follow the searched ticker on the price feed while live is on
+            """
+            stock = (search_stock or "").strip().upper()
+            if not live or not stock:
+                return True, "", None
+            get_runner().submit(self.feed.subscribe(stock))
+            return False, f"Streaming {stock}", {"stock": stock, "shown": {}}
+
+        @callback(
+            Output(self.x_ma.crossing_ma_graph, "figure", allow_duplicate=True),
+            Output(self.dash_bb.bb_graph_id, "figure", allow_duplicate=True),
+            Output(self.stream.store, "data", allow_duplicate=True),
+            Input(self.stream.interval, "n_intervals"),
+            # Written with every full render, which empties the live trace
+            Input(self.x_ma.view_store, "data"),
+            Input(self.dash_bb.view_store, "data"),
+            State(self.stream.store, "data"),
+            prevent_initial_call=True,
+        )
+        def stream_bars(_, x_ma_view, bb_view, streaming):
+            """
+            Patch the streamed bars into the price charts of the ticker. A
+            chart is only sent again once its bars changed or it was rendered
+            anew.
+            """
+            if not streaming:
+                raise PreventUpdate
+            shown = dict(streaming["shown"])
+            rendered = {
+                self.x_ma.view_store: "x_ma",
+                self.dash_bb.view_store: "bb",
+            }
+            for prop in ctx.triggered_prop_ids.values():
+                if prop in rendered:
+                    shown.pop(rendered[prop], None)
+            stock = streaming["stock"]
+            buffer = self.feed.buffer(stock)
+            if buffer is None:
+                # Live was switched on through another worker
+                get_runner().submit(self.feed.subscribe(stock))
+                raise PreventUpdate
+            if not len(buffer):
+                raise PreventUpdate
+
+            patches = []
+            for name, view in [("x_ma", x_ma_view), ("bb", bb_view)]:
+                state = [buffer.version, view]
+                if view is None or view["stock"].strip().upper() != stock:
+                    patches.append(no_update)
+                elif shown.get(name) == state:
+                    patches.append(no_update)
+                else:
+                    patches.append(self._patch_live(stock))
+                    shown[name] = state
+            if all(patch is no_update for patch in patches):
+                raise PreventUpdate
+            return *patches, {"stock": stock, "shown": shown}
@@ -1,2 +1,3 @@
 from .balance_sheet import BalanceSheet
 from .financial_statement import *
+from .statement_store import StatementStore
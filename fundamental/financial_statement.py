@@ -2,6 +2,7 @@ from pydantic import BaseModel, PrivateAttr
 from enum import Enum
 import plotly.graph_objects as go
 import numpy as np
+import polars as pl
 import os
 
 from .balance_sheet import BalanceSheet
@@ -15,6 +16,31 @@ class Period(Enum):
     QUARLY = "quarly"
 
 
+STATEMENTS: dict[str, type[BaseModel]] = {
+    "balance_sheet": BalanceSheet,
+    "cash_flow": CashFlow,
+    "income_statement": IncomeStatement,
+}
+
+
+def statement_frame(rows: list[dict], model: type[BaseModel]) -> pl.DataFrame:
+    """
+    One row per filing: its end date and the statement's amounts, missing
+    amounts default to 0 like in the pydantic models
+    """
+    fields = [name for name in model.model_fields if name != "financial_facts"]
+    schema = {name: pl.Int64 for name in fields}
+    schema["financial_facts"] = pl.Struct({"end_date": pl.String})
+    if rows:
+        df = pl.from_dicts(rows, schema=schema, strict=False)
+    else:
+        df = pl.DataFrame(schema=schema)
+    return df.select(
+        pl.col("financial_facts").struct.field("end_date"),
+        pl.col(fields).fill_null(0),
+    )
+
+
 class FinancialStatement(BaseModel):
     balance_sheet: list[BalanceSheet] | None = []
     cash_flow: list[CashFlow] | None = []
@@ -24,6 +50,28 @@ class FinancialStatement(BaseModel):
         default=os.getenv("FUNDAMENTAL_URL", "http://fundamental:3000")
     )
     _data_fetcher: CommunicationInterface = PrivateAttr(default=None)
+    _frames: dict[str, pl.DataFrame] = PrivateAttr(default_factory=dict)
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "FinancialStatement":
+        """
+        Validate a payload and build the statement frames straight from it
+        """
+        statement = cls.model_validate(payload)
+        for name, model in STATEMENTS.items():
+            statement._frames[name] = statement_frame(payload.get(name) or [], model)
+        return statement
+
+    def frame(self, name: str) -> pl.DataFrame:
+        """
+        Columnar view of a statement, built once
+        """
+        df = self._frames.get(name)
+        if df is None:
+            rows = [item.model_dump() for item in getattr(self, name) or []]
+            df = statement_frame(rows, STATEMENTS[name])
+            self._frames[name] = df
+        return df
 
     async def fetch_financial_statement(self, stock: str):
         endpoint = self._url + "/" + stock + "/" + "history"
@@ -34,17 +82,27 @@ class FinancialStatement(BaseModel):
             return None
 
     def show_balance_sheet(self) -> go.Figure | None:
-        if len(self.balance_sheet) == 0:
+        if not self.balance_sheet:
             return None
 
-        dates = [item.financial_facts.end_date for item in self.balance_sheet]
-        assets = [item.current_assets - item.inventory for item in self.balance_sheet]
-        inventory = [item.inventory for item in self.balance_sheet]
-        assets_plus_inventory = [a + i for a, i in zip(assets, inventory)]
-        liabilities = [item.current_liabilities for item in self.balance_sheet]
+        df = self.frame("balance_sheet").select(
+            "end_date",
+            "inventory",
+            "current_liabilities",
+            "total_assets",
+            "total_liabilities",
+            assets=pl.col("current_assets") - pl.col("inventory"),
+            # Base of the liabilities bar, stacked on assets and inventory
+            assets_plus_inventory=pl.col("current_assets"),
+        )
+        dates = df["end_date"].to_numpy()
+        assets = df["assets"].to_numpy()
+        inventory = df["inventory"].to_numpy()
+        assets_plus_inventory = df["assets_plus_inventory"].to_numpy()
+        liabilities = df["current_liabilities"].to_numpy()
 
-        total_assets = [item.total_assets for item in self.balance_sheet]
-        total_liabilities = [item.total_liabilities for item in self.balance_sheet]
+        total_assets = df["total_assets"].to_numpy()
+        total_liabilities = df["total_liabilities"].to_numpy()
 
         hover_template = "%{y:$,.2f}"
         fig = go.Figure()
@@ -116,13 +174,14 @@ class FinancialStatement(BaseModel):
         return fig
 
     def show_income_statement(self) -> go.Figure | None:
-        if len(self.income_statement) == 0:
+        if not self.income_statement:
             return None
 
-        dates = [item.financial_facts.end_date for item in self.income_statement]
-        cost_of_revenues = [item.cost_of_revenue for item in self.income_statement]
-        operating_expenses = [item.operating_expense for item in self.income_statement]
-        total_revenue = [item.total_revenue for item in self.income_statement]
+        df = self.frame("income_statement")
+        dates = df["end_date"].to_numpy()
+        cost_of_revenues = df["cost_of_revenue"].to_numpy()
+        operating_expenses = df["operating_expense"].to_numpy()
+        total_revenue = df["total_revenue"].to_numpy()
 
         hover_template = "%{y:$,.2f}"
         fig = go.Figure()
@@ -175,14 +234,15 @@ class FinancialStatement(BaseModel):
         return fig
 
     def show_cash_flow(self) -> go.Figure | None:
-        if len(self.cash_flow) == 0:
+        if not self.cash_flow:
             return None
 
-        dates = [item.financial_facts.end_date for item in self.cash_flow]
-        end_cash_flow = [item.end_cash_flow_position for item in self.cash_flow]
-        financing_cash_flow = [item.financing_cash_flow for item in self.cash_flow]
-        investing_cash_flow = [item.investing_cash_flow for item in self.cash_flow]
-        operating_cash_flow = [item.operating_cash_flow for item in self.cash_flow]
+        df = self.frame("cash_flow")
+        dates = df["end_date"].to_numpy()
+        end_cash_flow = df["end_cash_flow_position"].to_numpy()
+        financing_cash_flow = df["financing_cash_flow"].to_numpy()
+        investing_cash_flow = df["investing_cash_flow"].to_numpy()
+        operating_cash_flow = df["operating_cash_flow"].to_numpy()
 
         hover_template = "%{y:$,.2f}"
         fig = go.Figure()
@@ -259,14 +319,9 @@ class FinancialStatement(BaseModel):
         return fig
 
     @staticmethod
-    def _scale_sizes(nums, min_size=8, max_size=40):
-        abs_vals = np.abs(nums)
-        if abs_vals.max() == abs_vals.min():
-            return [min_size] * len(nums)
-        return [
-            min_size
-            + (v - abs_vals.min())
-            / (abs_vals.max() - abs_vals.min())
-            * (max_size - min_size)
-            for v in abs_vals
-        ]
+    def _scale_sizes(nums, min_size=8, max_size=40) -> np.ndarray:
+        abs_vals = np.abs(np.asarray(nums, dtype=np.float64))
+        low, high = abs_vals.min(), abs_vals.max()
+        if high == low:
+            return np.full(len(abs_vals), min_size, dtype=np.float64)
+        return min_size + (abs_vals - low) / (high - low) * (max_size - min_size)
@@ -0,0 +1,42 @@
+import os
+import threading
+from collections import OrderedDict
+
+from loguru import logger
+
+from .financial_statement import FinancialStatement
+
+
+class StatementStore:
+    """
+    Validated financial statements of recently searched tickers, kept on the
+    server so the browser store only holds the ticker. Payloads are
+    validated once and shared by every fundamental callback of the worker.
+    """
+
+    def __init__(self, max_entries: int = int(os.getenv("STATEMENT_STORE_SIZE", "64"))):
+        self.max_entries = max_entries
+        self._statements: OrderedDict[str, FinancialStatement] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(stock: str) -> str:
+        return stock.strip().upper()
+
+    def put(self, stock: str, payload: dict) -> FinancialStatement:
+        statement = FinancialStatement.from_payload(payload)
+        key = self.key(stock)
+        with self._lock:
+            self._statements[key] = statement
+            self._statements.move_to_end(key)
+            while len(self._statements) > self.max_entries:
+                self._statements.popitem(last=False)
+        logger.debug(f"Stored financial statement of {key}")
+        return statement
+
+    def get(self, key: str) -> FinancialStatement | None:
+        with self._lock:
+            statement = self._statements.get(key)
+            if statement is not None:
+                self._statements.move_to_end(key)
+            return statement
@@ -0,0 +1,8 @@
+# Picked up automatically by gunicorn from the working directory
+from utils.async_runner import shutdown_runner
+from utils.comm_interface import HttpComm
+
+
+def worker_exit(server, worker):
+    shutdown_runner()
+    HttpComm.shutdown()
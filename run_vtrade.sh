@@ -2,4 +2,4 @@
 
 cd $(dirname "$0")
 source .venv/bin/activate
-python3 scanner/scan.py
+python3 -m scanner.scan "$@"
@@ -0,0 +1 @@
+from .scan import Scanner, ScanProgress, read_watchlist, run_scan, write_results
@@ -0,0 +1,315 @@
+"""
+Batch scanner ranking a watchlist by its latest signals and best-performance
+scores. Price histories are fetched concurrently through the strategies'
+fetch methods, the indicators and parameter sweeps then run locally. Run
+headless from the repository root:
+
+    python -m scanner.scan --watchlist scanner/watchlist.txt --output scan.parquet
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import polars as pl
+from loguru import logger
+
+from strategy import StrategyCrossingMA, StrategyRSI, StrategyBollingerBands
+from strategy import optimizer
+from strategy.indicators import SIGNAL
+from utils.cached_comm import CachedComm
+from utils.comm_interface import CommunicationInterface, HttpComm
+from utils.rate_limited_comm import BATCH, RateLimitedComm, request_priority
+from utils.shared_cache import SharedCacheComm
+from utils.single_flight_comm import SingleFlightComm
+
+WATCHLIST = os.getenv(
+    "SCAN_WATCHLIST", os.path.join(os.path.dirname(__file__), "watchlist.txt")
+)
+OUTPUT = os.getenv("SCAN_OUTPUT", "scan_results.parquet")
+
+# Strategies a ticker is scored by, in the order of the result columns
+STRATEGIES = ["x_ma", "rsi", "bb"]
+
+
+def default_fetcher() -> CommunicationInterface:
+    upstream = RateLimitedComm(HttpComm)
+    if os.getenv("SHARED_CACHE", "1") == "1":
+        upstream = SharedCacheComm(upstream)
+    return CachedComm(SingleFlightComm(upstream))
+
+
+def read_watchlist(path: str) -> list[str]:
+    """
+    Tickers of a watchlist file, separated by new lines or commas. Lines
+    starting with # are comments, duplicates are dropped.
+    """
+    with open(path) as f:
+        text = "\n".join(
+            line for line in f.read().splitlines() if not line.lstrip().startswith("#")
+        )
+    tickers = [t.strip().upper() for t in text.replace(",", "\n").split()]
+    return list(dict.fromkeys(t for t in tickers if t))
+
+
+def latest_signal(df: pl.DataFrame, lookback: int) -> tuple[int, int | None]:
+    """
+    Latest non-zero signal within the last `lookback` bars and how many bars
+    ago it fired, (0, None) if there was none. -1 is a buy, 1 a sell.
+    """
+    signals = df[SIGNAL].fill_null(0.0).to_numpy()[-lookback:]
+    fired = signals.nonzero()[0]
+    if not len(fired):
+        return 0, None
+    return int(signals[fired[-1]]), int(len(signals) - 1 - fired[-1])
+
+
+def write_results(df: pl.DataFrame, path: str):
+    if path.endswith(".csv"):
+        df.write_csv(path)
+    else:
+        df.write_parquet(path)
+    logger.info(f"Wrote {len(df)} scan results to {path}")
+
+
+class ScanProgress:
+    """
+    Progress of a scan. Logged every `every` tickers and, if a path is
+    given, written as JSON so a dashboard in another process can poll it.
+    """
+
+    def __init__(self, total: int, path: str | None = None, every: int = 10):
+        self.total = total
+        self.path = path
+        self.every = every
+        self.done = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self.finished = False
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def throughput(self) -> float:
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+    def update(self, stock: str, ok: bool):
+        self.done += 1
+        self.failed += not ok
+        if self.done % self.every == 0 or self.done == self.total:
+            logger.info(
+                f"Scanned {self.done}/{self.total} tickers, {self.failed} failed "
+                f"({self.throughput:.1f} tickers/s), last {stock}"
+            )
+        self.write()
+
+    def finish(self):
+        self.finished = True
+        self.write()
+
+    def stats(self) -> dict:
+        return {
+            "total": self.total,
+            "done": self.done,
+            "failed": self.failed,
+            "seconds": round(self.elapsed, 3),
+            "tickers_per_second": round(self.throughput, 3),
+            "finished": self.finished,
+        }
+
+    def write(self):
+        if self.path is None:
+            return
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(self.stats(), f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.error(f"Error writing scan progress: {e}")
+
+    @staticmethod
+    def read(path: str) -> dict | None:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+class Scanner:
+    """
+    Scores every ticker of a watchlist with each strategy's best-performance
+    sweep and ranks them. At most `concurrency` tickers are fetched at once.
+    """
+
+    def __init__(
+        self,
+        data_fetcher: CommunicationInterface | None = None,
+        concurrency: int = int(os.getenv("SCAN_CONCURRENCY", "16")),
+        lookback: int = int(os.getenv("SCAN_SIGNAL_LOOKBACK", "5")),
+        ma_type: str = "sma",
+    ):
+        data_fetcher = default_fetcher() if data_fetcher is None else data_fetcher
+        self.x_ma = StrategyCrossingMA(data_fetcher)
+        self.rsi = StrategyRSI(data_fetcher)
+        self.bb = StrategyBollingerBands(data_fetcher)
+        self.concurrency = concurrency
+        self.lookback = lookback
+        self.ma_type = ma_type
+
+    async def history(self, stock: str) -> pl.DataFrame | None:
+        """
+        Price history of a ticker, the stored one topped up with its missing
+        tail or else fetched in full along with the crossing MA signal
+        """
+        ohlcv = await self.x_ma.sync_ohlcv(stock)
+        if ohlcv is None:
+            await self.x_ma.fetch_cross_ma_signal(stock, ma_type=self.ma_type)
+            ohlcv = await asyncio.to_thread(self.x_ma.ohlcv, stock)
+        return ohlcv
+
+    def score(self, stock: str, ohlcv: pl.DataFrame) -> dict:
+        """
+        Best-performance score and latest signal of every strategy
+        """
+        row = {
+            "stock": stock,
+            "last_date": ohlcv["datetime"][-1],
+            "close": ohlcv["close"][-1],
+            "bars": len(ohlcv),
+        }
+        sweeps = {
+            "x_ma": lambda: optimizer.sweep_crossing_ma(ohlcv, self.ma_type),
+            "rsi": lambda: optimizer.sweep_rsi(ohlcv),
+            "bb": lambda: optimizer.sweep_bollinger_bands(ohlcv),
+        }
+        for name in STRATEGIES:
+            df, surface = sweeps[name]()
+            best = optimizer.best_params(surface)
+            signal, age = latest_signal(df, self.lookback)
+            row[f"{name}_score"] = best.pop("score")
+            row[f"{name}_params"] = json.dumps(best)
+            row[f"{name}_signal"] = signal
+            row[f"{name}_signal_age"] = age
+        return row
+
+    async def scan_ticker(self, stock: str, semaphore: asyncio.Semaphore) -> dict:
+        try:
+            async with semaphore:
+                ohlcv = await self.history(stock)
+            if ohlcv is None or ohlcv.is_empty():
+                return {"stock": stock, "error": "no price history"}
+            # Sweeps are NumPy bound, keep them off the event loop
+            return await asyncio.to_thread(self.score, stock, ohlcv)
+        except Exception as e:
+            logger.error(f"Error scanning {stock}: {e}")
+            return {"stock": stock, "error": str(e)}
+
+    async def scan(
+        self, tickers: list[str], progress: ScanProgress | None = None
+    ) -> pl.DataFrame:
+        progress = ScanProgress(len(tickers)) if progress is None else progress
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(stock: str) -> dict:
+            row = await self.scan_ticker(stock, semaphore)
+            progress.update(stock, "error" not in row)
+            return row
+
+        # Interactive requests of the dashboard go before the scan's
+        with request_priority(BATCH):
+            rows = await asyncio.gather(*(run(stock) for stock in tickers))
+        progress.finish()
+        logger.info(f"Scan finished: {progress.stats()}")
+        return self.rank(rows)
+
+    @staticmethod
+    def rank(rows: list[dict]) -> pl.DataFrame:
+        """
+        Rank by the strategies' latest signals, most buys first, then by the
+        mean best-performance score. Failed tickers come last.
+        """
+        schema = {
+            "stock": pl.String,
+            "last_date": pl.Date,
+            "close": pl.Float64,
+            "bars": pl.Int64,
+            **{
+                col: dtype
+                for name in STRATEGIES
+                for col, dtype in [
+                    (f"{name}_score", pl.Float64),
+                    (f"{name}_params", pl.String),
+                    (f"{name}_signal", pl.Int64),
+                    (f"{name}_signal_age", pl.Int64),
+                ]
+            },
+            "error": pl.String,
+        }
+        df = pl.from_dicts(rows, schema=schema) if rows else pl.DataFrame(schema=schema)
+        df = df.with_columns(
+            (-pl.sum_horizontal(f"{name}_signal" for name in STRATEGIES)).alias(
+                "buy_votes"
+            ),
+            pl.mean_horizontal(f"{name}_score" for name in STRATEGIES).alias("score"),
+        )
+        df = df.sort(
+            [pl.col("error").is_not_null(), "buy_votes", "score"],
+            descending=[False, True, True],
+            nulls_last=True,
+        )
+        return df.with_row_index("rank", offset=1)
+
+
+async def run_scan(
+    tickers: list[str],
+    output: str | None = OUTPUT,
+    scanner: Scanner | None = None,
+    progress: ScanProgress | None = None,
+) -> tuple[pl.DataFrame, dict]:
+    """
+    Scan and write the ranked results, returns them and the scan's stats
+    """
+    scanner = Scanner() if scanner is None else scanner
+    progress = ScanProgress(len(tickers)) if progress is None else progress
+    results = await scanner.scan(tickers, progress)
+    if output:
+        write_results(results, output)
+    return results, progress.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--watchlist", default=WATCHLIST)
+    parser.add_argument("--tickers", help="Comma separated, instead of a watchlist")
+    parser.add_argument("--output", default=OUTPUT, help=".parquet or .csv")
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--ma-type", default="sma", choices=["sma", "ewma"])
+    args = parser.parse_args()
+
+    if args.tickers:
+        tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+    else:
+        tickers = read_watchlist(args.watchlist)
+    scanner = Scanner(ma_type=args.ma_type)
+    if args.concurrency:
+        scanner.concurrency = args.concurrency
+
+    async def scan():
+        try:
+            return await run_scan(tickers, args.output, scanner)
+        finally:
+            await HttpComm.close()
+
+    results, stats = asyncio.run(scan())
+    print(results.head(20))
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
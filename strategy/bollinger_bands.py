@@ -1,10 +1,14 @@
+import asyncio
+from datetime import date
 import plotly.graph_objects as go
 import polars as pl
 from loguru import logger
 
-from utils.utils import df_is_none
+from utils.utils import df_is_none, df_to_arrays
+from utils import downsample
 from utils.comm_interface import CommunicationInterface
 from strategy import Strategy
+from strategy import indicators, optimizer
 
 
 class StrategyBollingerBands(Strategy):
@@ -18,20 +22,53 @@ class StrategyBollingerBands(Strategy):
 
     async def fetch_bb_signal(self, stock: str) -> pl.DataFrame | None:
         url = self.url + "/bb/" + stock
-        response = await self._data_fetcher.get(url)
-        if response:
-            data = self.__process_response(response)
+        response = await self._fetch(url, "bb")
+        if response is not None:
+            data = self._process_response(response)
+            if data is not None:
+                # Store I/O may block on disk or another worker's lock
+                await asyncio.to_thread(self.remember_ohlcv, stock, data)
             return data
 
+    def compute_bb_signal(
+        self, stock: str, window: int = 20, num_std: float = 2.0
+    ) -> pl.DataFrame | None:
+        """
+        Calculate the Bollinger bands locally from the cached price history,
+        returns None if the ticker hasn't been fetched yet
+        """
+        ohlcv = self.ohlcv(stock)
+        if ohlcv is None:
+            return None
+        return indicators.bollinger_bands(ohlcv, window, num_std)
+
     async def fetch_best_performance(self, stock: str):
         prefix = "/bestperf/bb/"
         url = self.url + prefix + stock
-        response = await self._data_fetcher.get(url)
+        response = await self._fetch(url, "bestperf")
         if response is not None:
-            data = self.__process_response(response)
+            data = self._process_response(response)
             return data
 
-    def show(self, df: pl.DataFrame) -> go.Figure | None:
+    def sweep_best_performance(
+        self, stock: str
+    ) -> tuple[pl.DataFrame, pl.DataFrame] | None:
+        """
+        Search the best window and band width locally on the cached price
+        history. Returns the best Bollinger bands frame and the score of every
+        combination, or None if the ticker hasn't been fetched yet
+        """
+        ohlcv = self.ohlcv(stock)
+        if ohlcv is None:
+            return None
+        return optimizer.sweep_bollinger_bands(ohlcv)
+
+    def show(
+        self,
+        df: pl.DataFrame,
+        stock: str = "",
+        window: tuple[date, date] | None = None,
+    ) -> go.Figure | None:
         if df_is_none(df):
             logger.error("Invalid DataFrame")
             return None
@@ -40,42 +77,38 @@ class StrategyBollingerBands(Strategy):
             logger.error("Invalid DataFrame")
             return None
 
-        overbound = df.filter((pl.col("high") > pl.col(self.upper_band)))
-        underbound = df.filter((pl.col("low") < pl.col(self.lower_band)))
-
-        fig = go.Figure()
-        fig.update_layout(template="plotly_dark", xaxis_rangeslider_visible=False)
-        # Remove horizontal lines if exist
-        # self.fig.layout.pop('shapes')
-
-        fig.add_trace(
-            go.Candlestick(
-                x=df["datetime"].to_list(),
-                open=df["open"].to_list(),
-                close=df["close"].to_list(),
-                high=df["high"].to_list(),
-                low=df["low"].to_list(),
-                name=self.title,
-            )
+        df = self.zoom(df, window)
+        arrays = df_to_arrays(
+            df,
+            ["datetime", "high", "low"]
+            + [self.moving_avg, self.upper_band, self.lower_band],
         )
+        dates = arrays["datetime"]
+        overbound = arrays["high"] > arrays[self.upper_band]
+        underbound = arrays["low"] < arrays[self.lower_band]
+        # The bands share the points picked on the moving average, so the
+        # area between them stays filled evenly
+        keep = downsample.lttb(arrays[self.moving_avg], self.max_points)
+
+        fig = self.show_stock_price(df, arrays, stock)
         fig.add_trace(
             go.Scatter(
-                x=df["datetime"].to_list(),
-                y=df[self.moving_avg].to_list(),
+                x=dates[keep],
+                y=arrays[self.moving_avg][keep],
                 name=self.moving_avg,
             )
         )
         fig.add_trace(
             go.Scatter(
-                x=df["datetime"].to_list(),
-                y=df[self.lower_band].to_list(),
+                x=dates[keep],
+                y=arrays[self.lower_band][keep],
                 name=self.lower_band,
             )
         )
         fig.add_trace(
             go.Scatter(
-                x=df["datetime"].to_list(),
-                y=df[self.upper_band].to_list(),
+                x=dates[keep],
+                y=arrays[self.upper_band][keep],
                 name=self.upper_band,
                 fill="tonexty",
                 fillcolor="rgba(255, 255, 255, 0.2)",
@@ -83,8 +116,8 @@ class StrategyBollingerBands(Strategy):
         )
         fig.add_trace(
             go.Scatter(
-                x=overbound["datetime"].to_list(),
-                y=overbound["high"].to_list(),
+                x=dates[overbound],
+                y=arrays["high"][overbound],
                 name="Over bought",
                 mode="markers",
                 marker=dict(size=5),
@@ -92,18 +125,19 @@ class StrategyBollingerBands(Strategy):
         )
         fig.add_trace(
             go.Scatter(
-                x=underbound["datetime"].to_list(),
-                y=underbound["low"].to_list(),
+                x=dates[underbound],
+                y=arrays["low"][underbound],
                 name="Over sell",
                 mode="markers",
                 marker=dict(size=5),
             )
         )
+        fig.add_trace(self.live_layer())
         fig.update_layout(
             title={"text": self.title, "xanchor": "center", "x": 0.5},
             font=dict(size=18),
         )
-        return fig
+        return self.apply_window(fig, stock, window)
 
     def __columns_exist(self, df: pl.DataFrame) -> bool:
         for col in df.columns:
@@ -124,19 +158,3 @@ class StrategyBollingerBands(Strategy):
         ):
             return False
         return True
-
-    @staticmethod
-    def __process_response(data: dict) -> pl.DataFrame | None:
-        if "data" in data and "columns" in data:
-            df = pl.DataFrame(data["data"])
-            df = df.with_columns(
-                pl.col(df.columns[0]).str.strptime(pl.Datetime).cast(pl.Date),
-                *[pl.col(i).cast(pl.Float64) for i in df.columns[1:]],  # Unpack list
-            )
-            new_names = data["columns"]["column_names"]
-            rename_dict = dict(zip(df.columns, new_names))
-            df = df.rename(rename_dict)
-            df = df.sort(by=pl.col("datetime"), descending=False)
-            return df
-        else:
-            return None
@@ -1,10 +1,13 @@
+import asyncio
+from datetime import date
 import polars as pl
 import plotly.graph_objects as go
 from loguru import logger
 
-from utils.utils import df_is_none
+from utils.utils import df_is_none, df_to_arrays
 from utils.comm_interface import CommunicationInterface
 from strategy import Strategy
+from strategy import indicators, optimizer
 
 
 class StrategyCrossingMA(Strategy):
@@ -31,11 +34,30 @@ class StrategyCrossingMA(Strategy):
         endpoint = (
             self.url + ma_type + stock + f"?short_ma={short_ma}&long_ma={long_ma}"
         )
-        response = await self._data_fetcher.get(endpoint)
+        response = await self._fetch(endpoint, ma_type.strip("/"))
         if response is not None:
-            data = self.__process_response(response)
+            data = self._process_response(response)
+            if data is not None:
+                # Store I/O may block on disk or another worker's lock
+                await asyncio.to_thread(self.remember_ohlcv, stock, data)
             return data
 
+    def compute_cross_ma_signal(
+        self,
+        stock: str,
+        short_ma: int = 20,
+        long_ma: int = 50,
+        ma_type: str = "sma",
+    ) -> pl.DataFrame | None:
+        """
+        Calculate the crossing MA signal locally from the cached price history,
+        returns None if the ticker hasn't been fetched yet
+        """
+        ohlcv = self.ohlcv(stock)
+        if ohlcv is None or not short_ma or not long_ma:
+            return None
+        return indicators.crossing_ma(ohlcv, int(short_ma), int(long_ma), ma_type)
+
     async def fetch_best_performance(
         self,
         stock: str,
@@ -43,12 +65,55 @@ class StrategyCrossingMA(Strategy):
     ):
         prefix = "/bestperf/" + ma_type.lower() + "/"
         url = self.url + prefix + stock
-        response = await self._data_fetcher.get(url)
+        response = await self._fetch(url, "bestperf")
         if response is not None:
-            data = self.__process_response(response)
+            data = self._process_response(response)
             return data
 
-    def show(self, df: pl.DataFrame) -> go.Figure | None:
+    def sweep_best_performance(
+        self, stock: str, ma_type: str = "sma"
+    ) -> tuple[pl.DataFrame, pl.DataFrame] | None:
+        """
+        Search the best MA windows locally on the cached price history.
+        Returns the best crossing MA frame and the score of every window pair,
+        or None if the ticker hasn't been fetched yet
+        """
+        ohlcv = self.ohlcv(stock)
+        if ohlcv is None:
+            return None
+        return optimizer.sweep_crossing_ma(ohlcv, ma_type)
+
+    def show(
+        self,
+        df: pl.DataFrame,
+        stock: str = "",
+        window: tuple[date, date] | None = None,
+    ) -> go.Figure | None:
+        arrays = self.__overlay_arrays(df, window)
+        if arrays is None:
+            return
+
+        fig = self.show_stock_price(self.zoom(df, window), arrays, stock)
+        fig.add_traces(self.__overlay(arrays))
+        fig.add_trace(self.live_layer())
+        fig.update_layout(title={"text": "Crossing MA", "x": 0.5}, font=dict(size=18))
+        return self.apply_window(fig, stock, window)
+
+    def show_overlay(
+        self, df: pl.DataFrame, window: tuple[date, date] | None = None
+    ) -> list[go.Scatter] | None:
+        """
+        Moving average and signal traces without the price layer, in the
+        order show() adds them after the candlestick
+        """
+        arrays = self.__overlay_arrays(df, window)
+        if arrays is None:
+            return
+        return self.__overlay(arrays)
+
+    def __overlay_arrays(
+        self, df: pl.DataFrame, window: tuple[date, date] | None
+    ) -> dict | None:
         if df_is_none(df):
             logger.error("Dataframe for MA calculation is None")
             return
@@ -57,55 +122,44 @@ class StrategyCrossingMA(Strategy):
             logger.error("Columns in DataFrame for MA calculation are missing")
             return
 
-        signal_buy = df.filter(df[self.signal] == -1)
-        signal_sell = df.filter(df[self.signal] == 1)
-
-        fig = go.Figure()
-        fig.update_layout(template="plotly_dark", xaxis_rangeslider_visible=False)
+        return df_to_arrays(
+            self.zoom(df, window),
+            ["datetime", self.short_ma_type, self.long_ma_type, self.signal],
+        )
 
-        fig = self.show_stock_price(df)
+    def __overlay(self, arrays: dict) -> list[go.Scatter]:
+        dates = arrays["datetime"]
+        short_ma = arrays[self.short_ma_type]
+        signal_buy = arrays[self.signal] == -1
+        signal_sell = arrays[self.signal] == 1
 
-        fig.add_trace(
+        return [
             go.Scatter(
-                x=df["datetime"].to_list(),
-                y=df[f"{self.short_ma_type}"].to_list(),
+                **self.line(dates, short_ma),
                 name=f"{self.short_ma_type}",
                 line=dict(color="#FFFF00", width=2),
-            )
-        )
-
-        fig.add_trace(
+            ),
             go.Scatter(
-                x=df["datetime"].to_list(),
-                y=df[f"{self.long_ma_type}"].to_list(),
+                **self.line(dates, arrays[self.long_ma_type]),
                 name=f"{self.long_ma_type}",
                 fill="tonexty",
                 line=dict(color="white", width=2),
-            )
-        )
-
-        fig.add_trace(
+            ),
             go.Scatter(
-                x=signal_buy["datetime"].to_list(),
-                y=signal_buy[self.short_ma_type].to_list(),
+                x=dates[signal_buy],
+                y=short_ma[signal_buy],
                 mode="markers",
                 marker=dict(size=12, symbol="triangle-up", color="lawngreen"),
                 name="Buying signal",
-            )
-        )
-
-        fig.add_trace(
+            ),
             go.Scatter(
-                x=signal_sell["datetime"].to_list(),
-                y=signal_sell[self.short_ma_type].to_list(),
+                x=dates[signal_sell],
+                y=short_ma[signal_sell],
                 mode="markers",
                 marker=dict(size=12, symbol="triangle-down", color="red"),
                 name="Selling signal",
-            )
-        )
-
-        fig.update_layout(title={"text": "Crossing MA", "x": 0.5}, font=dict(size=18))
-        return fig
+            ),
+        ]
 
     def __columns_exist(self, df: pl.DataFrame) -> bool:
         ma_cols = []
@@ -114,45 +168,23 @@ class StrategyCrossingMA(Strategy):
                 self.signal = col
             elif "SMA" in col or "EWMA" in col:
                 ma_cols.append(col)
-        ma_cols = sorted(ma_cols)
+        # By window, as names sort "SMA_20" before "SMA_5"
+        ma_cols = sorted(ma_cols, key=self._ma_window)
         self.short_ma_type = ma_cols[0]
         self.long_ma_type = ma_cols[1]
         if self.short_ma_type == "" or self.long_ma_type == "" or self.signal == "":
             return False
         return True
 
-    def __process_response(self, data: dict) -> pl.DataFrame | None:
-        if "data" in data and "columns" in data:
-            df = pl.DataFrame(data["data"])
-            ma_window_1 = "ma_window_1"
-            ma_window_2 = "ma_window_2"
-            ma_windows = "ma_windows"
-
-            df = df.with_columns(
-                [
-                    pl.col(ma_windows)
-                    .map_elements(lambda x: x[0] if len(x) > 0 else None)
-                    .alias(ma_window_1),
-                    pl.col(ma_windows)
-                    .map_elements(lambda x: x[1] if len(x) > 1 else None)
-                    .alias(ma_window_2),
-                ]
-            )
-
-            df = df.drop(ma_windows)
-
-            df = df.with_columns(
-                pl.col(df.columns[0]).str.strptime(pl.Datetime).cast(pl.Date),
-                *[pl.col(i).cast(pl.Float64) for i in df.columns[1:]],  # Unpack list
-            )
-
-            new_pos_cols = self.columns + [ma_window_1, ma_window_2, "signal"]
-            df = df.select(new_pos_cols)
-
-            new_names = data["columns"]["column_names"]
-            rename_dict = dict(zip(df.columns, new_names))
-            df = df.rename(rename_dict)
-            df = df.sort(by=pl.col("datetime"), descending=False)
-            return df
-        else:
-            return None
+    @staticmethod
+    def _ma_window(col: str) -> tuple[int, str]:
+        window = col.rsplit("_", 1)[-1]
+        return int(window) if window.isdigit() else 0, col
+
+    def _arrange_columns(self, df: pl.DataFrame) -> pl.DataFrame:
+        return df.select(
+            *self.columns,
+            pl.col("ma_windows_0").alias("ma_window_1"),
+            pl.col("ma_windows_1").alias("ma_window_2"),
+            "signal",
+        )
@@ -0,0 +1,180 @@
+"""
+Incremental counterparts of the indicator engine. Each calculator keeps the
+state needed to fold in the next close in amortized constant time, so
+streamed bars don't recompute the whole history. Values match the batch
+functions of strategy.indicators, None where those are null. The state is
+plain JSON, calculators are checkpointed with state() and resumed with
+IncrementalIndicator.from_state().
+"""
+
+import copy
+import math
+from abc import ABC, abstractmethod
+
+
+class IncrementalIndicator(ABC):
+    """
+    Base of the calculators. Every attribute is part of the state and must
+    be JSON serializable.
+    """
+
+    _types: dict[str, type] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        IncrementalIndicator._types[cls.__name__] = cls
+
+    @abstractmethod
+    def update(self, close: float):
+        """
+        Fold in the next close and return the indicator's value
+        """
+
+    def run(self, closes) -> list:
+        """
+        Fold in a series of closes, returns the value after each one
+        """
+        return [self.update(float(close)) for close in closes]
+
+    def state(self) -> dict:
+        return {"type": type(self).__name__, **copy.deepcopy(vars(self))}
+
+    @staticmethod
+    def from_state(state: dict) -> "IncrementalIndicator":
+        state = dict(state)
+        cls = IncrementalIndicator._types[state.pop("type")]
+        indicator = cls.__new__(cls)
+        vars(indicator).update(copy.deepcopy(state))
+        return indicator
+
+
+class RollingSMA(IncrementalIndicator):
+    """
+    Simple moving average over a ring buffer of the last `window` closes.
+    The running sum is recomputed from the buffer once per cycle, so
+    rounding errors can't accumulate.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = [0.0] * window
+        self.pos = 0
+        self.count = 0
+        self.total = 0.0
+
+    def update(self, close: float) -> float | None:
+        self.total += close - self.values[self.pos]
+        self.values[self.pos] = close
+        self.pos = (self.pos + 1) % self.window
+        self.count += 1
+        if self.pos == 0:
+            self.total = math.fsum(self.values)
+        if self.count < self.window:
+            return None
+        return self.total / self.window
+
+
+class EWMA(IncrementalIndicator):
+    """
+    Exponentially weighted moving average with alpha = 2 / (span + 1),
+    seeded with the first close and null for the first span - 1 bars
+    """
+
+    def __init__(self, span: int):
+        self.span = span
+        self.alpha = 2 / (span + 1)
+        self.value: float | None = None
+        self.count = 0
+
+    def update(self, close: float) -> float | None:
+        if self.value is None:
+            self.value = close
+        else:
+            self.value = (1 - self.alpha) * self.value + self.alpha * close
+        self.count += 1
+        return self.value if self.count >= self.span else None
+
+
+def moving_average(window: int, ma_type: str = "sma") -> IncrementalIndicator:
+    if ma_type.lower() == "ewma":
+        return EWMA(window)
+    return RollingSMA(window)
+
+
+class WilderRSI(IncrementalIndicator):
+    """
+    Relative strength index with Wilder's smoothing. The average gain and
+    loss are seeded with the simple mean of the first `period` changes.
+    """
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close: float | None = None
+        self.changes = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def update(self, close: float) -> float | None:
+        prev, self.prev_close = self.prev_close, close
+        if prev is None:
+            return None
+        delta = close - prev
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        self.changes += 1
+        if self.changes <= self.period:
+            # Sums until the seed, then their means
+            self.avg_gain += gain
+            self.avg_loss += loss
+            if self.changes < self.period:
+                return None
+            self.avg_gain /= self.period
+            self.avg_loss /= self.period
+        else:
+            self.avg_gain += (gain - self.avg_gain) / self.period
+            self.avg_loss += (loss - self.avg_loss) / self.period
+        if self.avg_loss == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss)
+
+
+class RollingBollinger(IncrementalIndicator):
+    """
+    Bollinger bands from a rolling Welford mean and sum of squared
+    deviations. A close entering the window replaces the oldest one in a
+    single update, both are recomputed from the buffer once per cycle.
+    Returns the moving average, upper and lower band.
+    """
+
+    def __init__(self, window: int = 20, num_std: float = 2.0):
+        self.window = window
+        self.num_std = num_std
+        self.values = [0.0] * window
+        self.pos = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, close: float) -> tuple[float, float, float] | None:
+        if self.count < self.window:
+            self.count += 1
+            delta = close - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (close - self.mean)
+        else:
+            old = self.values[self.pos]
+            mean = self.mean + (close - old) / self.window
+            self.m2 += (close - old) * (close - mean + old - self.mean)
+            self.mean = mean
+        self.values[self.pos] = close
+        self.pos = (self.pos + 1) % self.window
+        if self.count < self.window:
+            return None
+        if self.pos == 0:
+            self.mean = math.fsum(self.values) / self.window
+            self.m2 = math.fsum((v - self.mean) ** 2 for v in self.values)
+        std = math.sqrt(max(self.m2, 0.0) / self.window)
+        return (
+            self.mean,
+            self.mean + self.num_std * std,
+            self.mean - self.num_std * std,
+        )
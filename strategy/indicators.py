@@ -0,0 +1,113 @@
+"""
+In-process indicator engine. Every function takes an OHLC frame sorted by
+datetime and returns it extended with the same indicator columns the
+strategy-processor responses carry, so the strategies' show() methods can
+plot local and upstream results alike.
+"""
+
+import numpy as np
+import polars as pl
+
+SIGNAL = "Signal"
+
+
+def moving_average(close: pl.Expr, window: int, ma_type: str = "sma") -> pl.Expr:
+    if ma_type.lower() == "ewma":
+        return close.ewm_mean(span=window, adjust=False, min_samples=window)
+    return close.rolling_mean(window_size=window)
+
+
+def crossing_ma(
+    ohlcv: pl.DataFrame,
+    short_ma: int = 20,
+    long_ma: int = 50,
+    ma_type: str = "sma",
+) -> pl.DataFrame:
+    """
+    Short and long moving averages of the close price. The signal is -1 on
+    the bar where the short average crosses above the long one (buy) and 1
+    where it crosses below (sell).
+    """
+    short_col = f"{ma_type.upper()}_{short_ma}"
+    long_col = f"{ma_type.upper()}_{long_ma}"
+    df = ohlcv.with_columns(
+        moving_average(pl.col("close"), short_ma, ma_type).alias(short_col),
+        moving_average(pl.col("close"), long_ma, ma_type).alias(long_col),
+    )
+    below = (pl.col(long_col) > pl.col(short_col)).cast(pl.Float64)
+    return df.with_columns(below.diff().fill_null(0.0).alias(SIGNAL))
+
+
+def wilder_mean(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder's smoothing: seeded with the simple mean of the first `period`
+    values, then averaged with alpha = 1 / period
+    """
+    out = np.full(len(values), np.nan)
+    if len(values) < period:
+        return out
+    seeded = values[period - 1 :].copy()
+    seeded[0] = values[:period].mean()
+    out[period - 1 :] = (
+        pl.Series(seeded).ewm_mean(alpha=1 / period, adjust=False).to_numpy()
+    )
+    return out
+
+
+def rsi(
+    ohlcv: pl.DataFrame,
+    period: int = 14,
+    upper_bound: float = 80,
+    lower_bound: float = 20,
+) -> pl.DataFrame:
+    """
+    Wilder's relative strength index. The signal is 1 while overbought and
+    -1 while oversold.
+    """
+    rsi_col = f"RSI_{period}"
+    delta = np.diff(ohlcv["close"].to_numpy().astype(np.float64))
+    avg_gain = wilder_mean(np.clip(delta, 0, None), period)
+    avg_loss = wilder_mean(np.clip(-delta, 0, None), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = np.where(
+            avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        )
+    values = np.concatenate(([np.nan], values))
+
+    df = ohlcv.with_columns(pl.Series(rsi_col, values, dtype=pl.Float64).fill_nan(None))
+    return df.with_columns(
+        pl.when(pl.col(rsi_col) > upper_bound)
+        .then(1.0)
+        .when(pl.col(rsi_col) < lower_bound)
+        .then(-1.0)
+        .otherwise(0.0)
+        .alias(SIGNAL)
+    )
+
+
+def bollinger_bands(
+    ohlcv: pl.DataFrame, window: int = 20, num_std: float = 2.0
+) -> pl.DataFrame:
+    """
+    Simple moving average with bands `num_std` population standard
+    deviations away. The signal is 1 when the high breaks the upper band and
+    -1 when the low breaks the lower band.
+    """
+    sma_col = f"SMA_{window}"
+    upper_col = f"Upper_{window}"
+    lower_col = f"Lower_{window}"
+    sma = pl.col("close").rolling_mean(window_size=window)
+    std = pl.col("close").rolling_std(window_size=window, ddof=0)
+    df = ohlcv.with_columns(
+        sma.alias(sma_col),
+        (sma + num_std * std).alias(upper_col),
+        (sma - num_std * std).alias(lower_col),
+    )
+    return df.with_columns(
+        pl.when(pl.col("high") > pl.col(upper_col))
+        .then(1.0)
+        .when(pl.col("low") < pl.col(lower_col))
+        .then(-1.0)
+        .otherwise(0.0)
+        .alias(SIGNAL)
+    )
@@ -0,0 +1,132 @@
+import fcntl
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import polars as pl
+from loguru import logger
+
+
+def last_trading_day(today: date) -> date:
+    """
+    Latest weekday before today, the last bar a complete history must hold
+    """
+    day = today - timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+class OhlcvStore:
+    """
+    Price history per ticker kept as Parquet files on disk, so warm starts
+    and later searches only need the bars past the last stored date. Files
+    are replaced atomically, so workers sharing the directory never read a
+    partial write, and merges of a ticker are serialized by a file lock
+    across processes.
+    """
+
+    def __init__(
+        self,
+        root: str = os.getenv(
+            "OHLCV_STORE_DIR", os.path.join(tempfile.gettempdir(), "vtrade-ohlcv")
+        ),
+    ):
+        self.root = root
+
+    def path(self, stock: str) -> str:
+        name = re.sub(r"[^A-Z0-9._-]", "_", stock.strip().upper())
+        return os.path.join(self.root, f"{name}.parquet")
+
+    def load(self, stock: str) -> pl.DataFrame | None:
+        path = self.path(stock)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pl.read_parquet(path)
+        except Exception as e:
+            logger.error(f"Error reading stored price history of {stock}: {e}")
+            return None
+
+    def last_date(self, stock: str) -> date | None:
+        df = self.load(stock)
+        if df is None or df.is_empty():
+            return None
+        return df[df.columns[0]][-1]
+
+    def stored_on(self, stock: str) -> date | None:
+        try:
+            return datetime.fromtimestamp(os.path.getmtime(self.path(stock))).date()
+        except OSError:
+            return None
+
+    @staticmethod
+    def is_current(
+        last: date | None, today: date | None = None, stored_on: date | None = None
+    ) -> bool:
+        """
+        Whether a history ending on `last` can't miss or hold a forming bar.
+        Never on weekdays, today's bar may be forming. On weekends the last
+        trading day's bar must have been stored after that day.
+        """
+        today = today or date.today()
+        if last is None or stored_on is None or today.weekday() < 5:
+            return False
+        return last >= last_trading_day(today) and stored_on > last
+
+    @contextmanager
+    def _locked(self, stock: str):
+        """
+        Exclusive lock of a ticker's history, held across worker processes
+        """
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.path(stock) + ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def append(self, stock: str, df: pl.DataFrame) -> pl.DataFrame:
+        """
+        Merge bars into a ticker's stored history and return the whole of it.
+        Bars from the first date of df on are replaced by df, e.g. the still
+        forming bar of the previous fetch. Nothing is written if df adds no
+        newer bars and leaves the stored ones unchanged.
+        """
+        date_col = df.columns[0]
+        with self._locked(stock):
+            stored = self.load(stock)
+            if stored is not None and stored.columns == df.columns and len(df):
+                dates = pl.col(date_col)
+                df = pl.concat(
+                    [
+                        stored.filter(dates < df[date_col][0]),
+                        df,
+                        # Kept when df is an older window than the stored one
+                        stored.filter(dates > df[date_col][-1]),
+                    ]
+                )
+                if df.equals(stored):
+                    return stored
+            self._write(stock, df)
+        return df
+
+    def _write(self, stock: str, df: pl.DataFrame):
+        path = self.path(stock)
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            os.close(fd)
+        except OSError as e:
+            logger.error(f"Error storing price history of {stock}: {e}")
+            return
+        try:
+            df.write_parquet(tmp)
+            os.replace(tmp, path)
+            logger.debug(f"Stored {len(df)} bars of {stock} up to {df[-1, 0]}")
+        except Exception as e:
+            os.unlink(tmp)
+            logger.error(f"Error storing price history of {stock}: {e}")
@@ -0,0 +1,208 @@
+"""
+Local best-performance parameter sweeps. The indicator of every window is
+computed once, rolling means from cumulative sums and recursive averages
+(EWMA, Wilder's RSI) with one polars pass per window. Every parameter
+combination is then scored at once by NumPy broadcasting. A score is the
+total return of the long-only strategy the parameters describe.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+import numpy as np
+import polars as pl
+from numpy.lib.stride_tricks import sliding_window_view
+
+from strategy import indicators
+
+MA_SHORT_WINDOWS = list(range(5, 55, 5))
+MA_LONG_WINDOWS = list(range(20, 210, 10))
+RSI_PERIODS = list(range(6, 30, 2))
+RSI_UPPER_BOUNDS = [65, 70, 75, 80, 85]
+RSI_LOWER_BOUNDS = [15, 20, 25, 30, 35]
+BB_WINDOWS = list(range(10, 55, 5))
+BB_NUM_STDS = [1.0, 1.5, 2.0, 2.5, 3.0]
+
+# Grids with more cells than this (combinations x bars) are split across
+# processes when a pool size is given
+PARALLEL_THRESHOLD = 5_000_000
+
+
+def rolling_means(values: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    """
+    Rolling means of every window at once, shape (len(windows), len(values)),
+    NaN until a window is filled
+    """
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    idx = np.arange(len(values))
+    start = idx[None, :] + 1 - windows[:, None]
+    valid = start >= 0
+    sums = csum[idx + 1][None, :] - csum[np.where(valid, start, 0)]
+    return np.where(valid, sums / windows[:, None], np.nan)
+
+
+def rolling_stds(values: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    """
+    Population standard deviations matching rolling_means. Deviations are
+    taken from each window's own mean, E[x²] - E[x]² over cumulative sums
+    loses precision on long or high-priced series.
+    """
+    out = np.full((len(windows), len(values)), np.nan)
+    for i, window in enumerate(windows):
+        if window <= len(values):
+            out[i, window - 1 :] = sliding_window_view(values, window).std(axis=1)
+    return out
+
+
+def ewm_means(values: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    close = pl.Series(values)
+    return np.stack(
+        [
+            close.ewm_mean(span=int(w), adjust=False, min_samples=int(w)).to_numpy()
+            for w in windows
+        ]
+    )
+
+
+def hold_positions(enter: np.ndarray, leave: np.ndarray) -> np.ndarray:
+    """
+    1 from an entry bar until the next exit bar along the last axis. Forward
+    fills the latest event index instead of looping over the bars.
+    """
+    idx = np.arange(enter.shape[-1])
+    events = np.where(enter | leave, idx, -1)
+    last = np.maximum.accumulate(events, axis=-1)
+    held = np.take_along_axis(enter, np.clip(last, 0, None), axis=-1)
+    return (held & (last >= 0)).astype(np.float64)
+
+
+def total_returns(positions: np.ndarray, log_returns: np.ndarray) -> np.ndarray:
+    """
+    Total return of positions taken at each close and held over the next bar
+    """
+    return np.expm1((positions[..., :-1] * log_returns[1:]).sum(axis=-1))
+
+
+def _score_ma(close, short_windows, long_windows, ma_type) -> np.ndarray:
+    averages = ewm_means if ma_type.lower() == "ewma" else rolling_means
+    short = averages(close, short_windows)
+    long = averages(close, long_windows)
+    log_returns = np.diff(np.log(close), prepend=np.nan)
+    positions = (short[:, None, :] > long[None, :, :]).astype(np.float64)
+    scores = total_returns(positions, log_returns)
+    return np.where(short_windows[:, None] < long_windows[None, :], scores, np.nan)
+
+
+def _split(windows: list[int], processes: int, cells: int) -> list[np.ndarray]:
+    if processes <= 1 or cells < PARALLEL_THRESHOLD:
+        return [np.asarray(windows)]
+    return [c for c in np.array_split(np.asarray(windows), processes) if len(c)]
+
+
+def _surface(scores: np.ndarray, names: list[str], axes: list[list]) -> pl.DataFrame:
+    grid = np.meshgrid(*axes, indexing="ij")
+    return pl.DataFrame(
+        {
+            **{name: axis.ravel() for name, axis in zip(names, grid)},
+            "score": scores.ravel(),
+        }
+    ).with_columns(pl.col("score").fill_nan(None))
+
+
+def best_params(surface: pl.DataFrame) -> dict:
+    scored = surface.drop_nulls("score")
+    if scored.is_empty():
+        raise ValueError("Price history is too short for the parameter grid")
+    return scored.sort("score", descending=True).row(0, named=True)
+
+
+def sweep_crossing_ma(
+    ohlcv: pl.DataFrame,
+    ma_type: str = "sma",
+    short_windows: list[int] = MA_SHORT_WINDOWS,
+    long_windows: list[int] = MA_LONG_WINDOWS,
+    processes: int = int(os.getenv("SWEEP_PROCESSES", "0")),
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """
+    Score every short/long window pair. Returns the crossing MA frame of the
+    best pair and the full score surface.
+    """
+    close = ohlcv["close"].to_numpy().astype(np.float64)
+    long_arr = np.asarray(long_windows)
+    chunks = _split(
+        short_windows, processes, len(short_windows) * len(long_windows) * len(close)
+    )
+    if len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parts = pool.map(
+                _score_ma,
+                [close] * len(chunks),
+                chunks,
+                [long_arr] * len(chunks),
+                [ma_type] * len(chunks),
+            )
+            scores = np.concatenate(list(parts))
+    else:
+        scores = _score_ma(close, chunks[0], long_arr, ma_type)
+
+    surface = _surface(scores, ["short_ma", "long_ma"], [short_windows, long_windows])
+    best = best_params(surface)
+    df = indicators.crossing_ma(ohlcv, best["short_ma"], best["long_ma"], ma_type)
+    return df, surface
+
+
+def sweep_rsi(
+    ohlcv: pl.DataFrame,
+    periods: list[int] = RSI_PERIODS,
+    upper_bounds: list[float] = RSI_UPPER_BOUNDS,
+    lower_bounds: list[float] = RSI_LOWER_BOUNDS,
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """
+    Score every period and bound combination of an RSI mean reversion: buy
+    when oversold, sell when overbought
+    """
+    close = ohlcv["close"].to_numpy().astype(np.float64)
+    log_returns = np.diff(np.log(close), prepend=np.nan)
+    upper = np.asarray(upper_bounds, dtype=np.float64)[:, None, None]
+    lower = np.asarray(lower_bounds, dtype=np.float64)[None, :, None]
+
+    scores = []
+    for period in periods:
+        values = indicators.rsi(ohlcv, period)[f"RSI_{period}"].to_numpy()
+        values = np.nan_to_num(values.astype(np.float64), nan=50.0)[None, None, :]
+        enter, leave = np.broadcast_arrays(values < lower, values > upper)
+        scores.append(total_returns(hold_positions(enter, leave), log_returns))
+
+    surface = _surface(
+        np.stack(scores),
+        ["period", "upper_bound", "lower_bound"],
+        [periods, upper_bounds, lower_bounds],
+    )
+    best = best_params(surface)
+    df = indicators.rsi(ohlcv, best["period"], best["upper_bound"], best["lower_bound"])
+    return df, surface
+
+
+def sweep_bollinger_bands(
+    ohlcv: pl.DataFrame,
+    windows: list[int] = BB_WINDOWS,
+    num_stds: list[float] = BB_NUM_STDS,
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """
+    Score every window and band width of a Bollinger mean reversion: buy
+    below the lower band, sell above the upper band
+    """
+    close = ohlcv["close"].to_numpy().astype(np.float64)
+    log_returns = np.diff(np.log(close), prepend=np.nan)
+    window_arr = np.asarray(windows)
+    stds = np.asarray(num_stds, dtype=np.float64)[None, :, None]
+
+    means = rolling_means(close, window_arr)[:, None, :]
+    deviations = rolling_stds(close, window_arr)[:, None, :]
+    enter = close < means - stds * deviations
+    leave = close > means + stds * deviations
+    scores = total_returns(hold_positions(enter, leave), log_returns)
+
+    surface = _surface(scores, ["window", "num_std"], [windows, num_stds])
+    best = best_params(surface)
+    df = indicators.bollinger_bands(ohlcv, best["window"], best["num_std"])
+    return df, surface
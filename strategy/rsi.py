@@ -1,10 +1,13 @@
+import asyncio
+from datetime import date
 import polars as pl
 import plotly.graph_objects as go
 from loguru import logger
 
-from utils.utils import check_list_substr_in_str
+from utils.utils import check_list_substr_in_str, df_to_arrays
 from utils.comm_interface import *
 from strategy import Strategy
+from strategy import indicators, optimizer
 
 
 class StrategyRSI(Strategy):
@@ -24,20 +27,63 @@ class StrategyRSI(Strategy):
 
     async def fetch_rsi_signal(self, stock: str) -> pl.DataFrame | None:
         url = self.url + "/rsi/" + stock
-        response = await self._data_fetcher.get(url)
-        if response:
-            data = self.__process_response(response)
+        response = await self._fetch(url, "rsi")
+        if response is not None:
+            data = self._process_response(response)
+            if data is not None:
+                # Store I/O may block on disk or another worker's lock
+                await asyncio.to_thread(self.remember_ohlcv, stock, data)
             return data
 
+    def compute_rsi_signal(
+        self,
+        stock: str,
+        period: int | None = None,
+        upper_bound: float | None = None,
+        lower_bound: float | None = None,
+    ) -> pl.DataFrame | None:
+        """
+        Calculate the RSI locally from the cached price history, returns None
+        if the ticker hasn't been fetched yet. Parameters default to the
+        strategy's own.
+        """
+        ohlcv = self.ohlcv(stock)
+        if ohlcv is None:
+            return None
+        return indicators.rsi(
+            ohlcv,
+            period or self.period,
+            self.upper_bound if upper_bound is None else upper_bound,
+            self.lower_bound if lower_bound is None else lower_bound,
+        )
+
     async def fetch_best_performance(self, stock: str) -> pl.DataFrame | None:
         url = self.url + "/bestperf/rsi/" + stock
-        response = await self._data_fetcher.get(url)
-        if response:
-            data = self.__process_response(response)
+        response = await self._fetch(url, "bestperf")
+        if response is not None:
+            data = self._process_response(response)
             return data
 
+    def sweep_best_performance(
+        self, stock: str
+    ) -> tuple[pl.DataFrame, pl.DataFrame] | None:
+        """
+        Search the best RSI period and bounds locally on the cached price
+        history. Returns the best RSI frame and the score of every combination,
+        or None if the ticker hasn't been fetched yet
+        """
+        ohlcv = self.ohlcv(stock)
+        if ohlcv is None:
+            return None
+        return optimizer.sweep_rsi(ohlcv)
+
     def show(
-        self, df: pl.DataFrame, upper_bound=80, lower_bound=20
+        self,
+        df: pl.DataFrame,
+        stock: str = "",
+        window: tuple[date, date] | None = None,
+        upper_bound=80,
+        lower_bound=20,
     ) -> go.Figure | None:
         if not check_list_substr_in_str(["rsi", "datetime"], df.columns):
             logger.debug("Dataframe columns do not contain RSI")
@@ -46,13 +92,17 @@ class StrategyRSI(Strategy):
         if not self.__columns_exist(df):
             logger.error("Columns in DataFrame for MA calculation are missing")
             return
+        df = self.zoom(df, window)
+        arrays = df_to_arrays(df, ["datetime", self.RSI])
+        dates = arrays["datetime"]
+        rsi = arrays[self.RSI]
+
         fig = go.Figure()
         fig.update_layout(template="plotly_dark", xaxis_rangeslider_visible=False)
 
         fig.add_trace(
             go.Scatter(
-                y=df[self.RSI].to_list(),
-                x=df["datetime"].to_list(),
+                **self.line(dates, rsi),
                 name=self.RSI,
                 marker=dict(color="antiquewhite"),
             )
@@ -62,20 +112,20 @@ class StrategyRSI(Strategy):
         # Add the filled region
         fig.add_shape(
             type="rect",
-            x0=min(df["datetime"].to_list()),
-            x1=max(df["datetime"].to_list()),
+            x0=dates.min(),
+            x1=dates.max(),
             y0=lower_bound,
             y1=upper_bound,
             fillcolor="rgba(255, 0, 0, 0.1)",  # Red with 20% opacity
             line_width=0,
         )
 
-        overbougt = df.filter(pl.col(self.RSI) > upper_bound)
-        oversold = df.filter(pl.col(self.RSI) < lower_bound)
+        overbougt = rsi > upper_bound
+        oversold = rsi < lower_bound
         fig.add_trace(
             go.Scatter(
-                y=overbougt[self.RSI].to_list(),
-                x=overbougt["datetime"].to_list(),
+                y=rsi[overbougt],
+                x=dates[overbougt],
                 mode="markers",
                 marker=dict(color="red"),
                 name="Over bought",
@@ -83,8 +133,8 @@ class StrategyRSI(Strategy):
         )
         fig.add_trace(
             go.Scatter(
-                y=oversold[self.RSI].to_list(),
-                x=oversold["datetime"].to_list(),
+                y=rsi[oversold],
+                x=dates[oversold],
                 mode="markers",
                 marker=dict(color="green"),
                 name="Over sold",
@@ -95,7 +145,7 @@ class StrategyRSI(Strategy):
             title={"text": "Relative strength index (RSI) plot", "x": 0.5},
             font=dict(size=18),
         )
-        return fig
+        return self.apply_window(fig, stock, window)
 
     def __columns_exist(self, df: pl.DataFrame) -> bool:
         for col in df.columns:
@@ -107,19 +157,3 @@ class StrategyRSI(Strategy):
         if self.RSI == "" or self.signal == "":
             return False
         return True
-
-    @staticmethod
-    def __process_response(data: dict) -> pl.DataFrame | None:
-        if "data" in data and "columns" in data:
-            df = pl.DataFrame(data["data"])
-            df = df.with_columns(
-                pl.col(df.columns[0]).str.strptime(pl.Datetime).cast(pl.Date),
-                *[pl.col(i).cast(pl.Float64) for i in df.columns[1:]],  # Unpack list
-            )
-            new_names = data["columns"]["column_names"]
-            rename_dict = dict(zip(df.columns, new_names))
-            df = df.rename(rename_dict)
-            df = df.sort(by=pl.col("datetime"), descending=False)
-            return df
-        else:
-            return None
@@ -1,37 +1,396 @@
+from datetime import date
+import asyncio
+import numpy as np
 import polars as pl
 import plotly.graph_objects as go
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+import threading
+import time
 import os
 
-from utils.comm_interface import CommunicationInterface
+from utils.comm_interface import CommunicationInterface, WIRE_FORMATS, parse_families
+from utils.utils import df_fingerprint, df_to_arrays
+from utils import downsample
+from loguru import logger
+from strategy.ohlcv_store import OhlcvStore
+
+# Date formats tried on the first row of a payload, anything else is inferred
+DATE_FORMATS = ["%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]
+
+
+def epoch_unit(epochs: pl.Series) -> str:
+    """
+    Guess the unit of int64 epoch timestamps from their magnitude
+    """
+    largest = epochs.abs().max() or 0
+    if largest < 10**11:
+        return "s"
+    if largest < 10**14:
+        return "ms"
+    if largest < 10**17:
+        return "us"
+    return "ns"
 
 
 class Strategy(ABC):
+    # Schemas and date formats of upstream payloads, keyed by column names
+    _schema_cache: OrderedDict[tuple, tuple[dict, str | None]] = OrderedDict()
+    _schema_lock = threading.Lock()
+    schema_cache_size = int(os.getenv("SCHEMA_CACHE_SIZE", "128"))
+
+    # OHLC frames of recently fetched tickers, shared by all strategies
+    _ohlcv_cache: OrderedDict[str, pl.DataFrame] = OrderedDict()
+    _ohlcv_lock = threading.Lock()
+    ohlcv_cache_size = int(os.getenv("OHLCV_CACHE_SIZE", "64"))
+
+    # Price history persisted per ticker, topped up with the missing tail
+    ohlcv_store = OhlcvStore() if os.getenv("OHLCV_STORE", "1") == "1" else None
+    # Upstream endpoint serving the bars of a ticker from a start date on
+    ohlcv_tail_endpoint = os.getenv(
+        "OHLCV_TAIL_ENDPOINT", "/ohlcv/{stock}?start={start}"
+    )
+    # Tails of a ticker are not asked for again until then after upstream
+    # failed one
+    _tail_retry_at: dict[str, float] = {}
+    tail_retry_after = float(os.getenv("OHLCV_TAIL_RETRY_AFTER", "3600"))
+
+    # Candlestick layers keyed by ticker and data version, shared by all
+    # strategies so a ticker's price layer is built once
+    _price_layers: OrderedDict[tuple[str, str], go.Candlestick] = OrderedDict()
+    _price_layer_lock = threading.Lock()
+    price_layer_cache_size = int(os.getenv("PRICE_LAYER_CACHE_SIZE", "32"))
+
+    # Points per series sent to the browser, longer series are downsampled
+    max_points = int(os.getenv("CHART_MAX_POINTS", "2000"))
+
     def __init__(self, data_fetcher: CommunicationInterface) -> None:
         self.url = os.getenv("STRATEGY_PROCESSOR_URL", "http://strategy-processor:8000")
         self.columns = ["datetime", "high", "low", "open", "close"]
         self.signal = "signal"
         self.bin_signal = {"buy": 1, "sell": 0}
         self._data_fetcher = data_fetcher
+        # Wire format per endpoint family ("sma", "rsi", "bestperf", ...), e.g.
+        # STRATEGY_WIRE_FORMATS="bestperf=parquet,rsi=arrow"
+        self.wire_format = os.getenv("STRATEGY_WIRE_FORMAT", "json")
+        self.wire_formats = parse_families(os.getenv("STRATEGY_WIRE_FORMATS", ""), str)
+
+    async def _fetch(self, url: str, family: str):
+        """
+        Fetch from strategy-processor, negotiating the endpoint family's format
+        """
+        wire_format = self.wire_formats.get(family, self.wire_format)
+        return await self._data_fetcher.get(url, WIRE_FORMATS.get(wire_format))
+
+    def _process_response(self, data: dict | pl.DataFrame) -> pl.DataFrame | None:
+        """
+        Parse a strategy-processor response into a typed frame sorted by date.
+        JSON payloads hold either rows ({"data": [{...}, ...]}) or columns
+        ({"data": {"datetime": [...], ...}}) plus the final column names. Rows
+        are turned into columns first, as polars builds those fastest. Arrow
+        and Parquet payloads come typed and already named.
+        """
+        if isinstance(data, pl.DataFrame):
+            return self._normalize(data, None)
+        if "data" not in data or "columns" not in data or not data["data"]:
+            return None
+
+        payload = data["data"]
+        if isinstance(payload, dict):
+            names = tuple(payload)
+            columns = payload
+        else:
+            names = tuple(payload[0])
+            columns = {name: [row.get(name) for row in payload] for name in names}
+        columns = self._expand_lists(columns)
+
+        # Dates may come as ISO strings or epochs under the same column names
+        dates = next(iter(columns.values()))
+        key = (names, type(dates[0]) if len(dates) else None)
+        with self._schema_lock:
+            schema, date_format = self._schema_cache.get(key, (None, None))
+            if schema is not None:
+                self._schema_cache.move_to_end(key)
+        df = pl.DataFrame(columns, schema=schema, strict=False)
+        if schema is None:
+            schema, date_format = self._learn_schema(df)
+            # All-null columns don't tell their type, a later payload may
+            if pl.Null not in df.schema.values():
+                with self._schema_lock:
+                    self._schema_cache[key] = (schema, date_format)
+                    while len(self._schema_cache) > self.schema_cache_size:
+                        self._schema_cache.popitem(last=False)
+            df = df.cast(schema, strict=False)
+
+        df = self._arrange_columns(df)
+        new_names = data["columns"]["column_names"]
+        df = df.rename(dict(zip(df.columns, new_names)))
+        return self._normalize(df, date_format)
+
+    @staticmethod
+    def _expand_lists(columns: dict[str, list]) -> dict[str, list]:
+        """
+        Split list valued columns into one column per position ("ma_windows"
+        into "ma_windows_0", "ma_windows_1", ...), which polars builds much
+        faster than list columns
+        """
+        expanded = {}
+        for name, values in columns.items():
+            first = next((v for v in values if v is not None), None)
+            if not isinstance(first, list):
+                expanded[name] = values
+                continue
+            for i in range(len(first)):
+                expanded[f"{name}_{i}"] = [
+                    v[i] if v is not None and len(v) > i else None for v in values
+                ]
+        return expanded
+
+    def _arrange_columns(self, df: pl.DataFrame) -> pl.DataFrame:
+        """
+        Bring raw payload columns into the order of the response's column names
+        """
+        return df
+
+    @staticmethod
+    def _learn_schema(df: pl.DataFrame) -> tuple[dict, str | None]:
+        """
+        Schema used for later payloads with the same columns, so they skip
+        type inference. Numbers are read as floats right away and the date
+        format is detected once. All-null values are taken as floats.
+        """
+        schema = {}
+        for col, dtype in df.schema.items():
+            numeric = dtype.is_numeric() or dtype == pl.Null
+            schema[col] = pl.Float64 if numeric else dtype
+        schema[df.columns[0]] = df.schema[df.columns[0]]
+
+        date_format = None
+        first = df[df.columns[0]].drop_nulls().head(1)
+        if df.schema[df.columns[0]] == pl.String and len(first):
+            for fmt in DATE_FORMATS:
+                if first.str.strptime(pl.Datetime, fmt, strict=False).null_count() == 0:
+                    date_format = fmt
+                    break
+        return schema, date_format
+
+    @staticmethod
+    def _normalize(df: pl.DataFrame, date_format: str | None) -> pl.DataFrame:
+        """
+        Decode the date column (strings or int64 epochs), cast the numbers to
+        floats and sort by date unless the rows already are in order
+        """
+        date_col = df.columns[0]
+        dtype = df.schema[date_col]
+        date = pl.col(date_col)
+        if dtype == pl.String:
+            date = date.str.strptime(pl.Datetime, date_format)
+        elif dtype.is_integer():
+            date = pl.from_epoch(date, time_unit=epoch_unit(df[date_col]))
+        df = df.with_columns(
+            date.cast(pl.Date),
+            *[
+                pl.col(col).cast(pl.Float64)
+                for col, dtype in list(df.schema.items())[1:]
+                if dtype.is_numeric() and dtype != pl.Float64
+            ],
+        )
+
+        dates = df[date_col]
+        if dates.is_sorted():
+            return df
+        if dates.is_sorted(descending=True):
+            return df.reverse()
+        return df.sort(by=pl.col(date_col), descending=False)
+
+    def remember_ohlcv(self, stock: str, df: pl.DataFrame) -> pl.DataFrame:
+        """
+        Keep the price columns of a fetched frame for local indicator runs,
+        merged into the ticker's stored history
+        """
+        ohlcv = df.select(self.columns)
+        if self.ohlcv_store is not None:
+            ohlcv = self.ohlcv_store.append(stock, ohlcv)
+        self._cache_ohlcv(stock, ohlcv)
+        return ohlcv
+
+    def _cache_ohlcv(self, stock: str, ohlcv: pl.DataFrame):
+        with self._ohlcv_lock:
+            self._ohlcv_cache[stock.upper()] = ohlcv
+            self._ohlcv_cache.move_to_end(stock.upper())
+            while len(self._ohlcv_cache) > self.ohlcv_cache_size:
+                self._ohlcv_cache.popitem(last=False)
+
+    def ohlcv(self, stock: str) -> pl.DataFrame | None:
+        with self._ohlcv_lock:
+            ohlcv = self._ohlcv_cache.get(stock.upper())
+        if ohlcv is None and self.ohlcv_store is not None:
+            ohlcv = self.ohlcv_store.load(stock)
+            if ohlcv is not None:
+                self._cache_ohlcv(stock, ohlcv)
+        return ohlcv
+
+    async def sync_ohlcv(self, stock: str) -> pl.DataFrame | None:
+        """
+        Stored price history of a ticker, topped up with the bars upstream
+        has past its last date. None if the ticker isn't stored yet or the
+        tail endpoint is missing, callers then fetch the full history. The
+        stored history is returned as it is if upstream fails. The store is
+        accessed from a thread, it may block on disk or another worker.
+        """
+        ohlcv = await asyncio.to_thread(self.ohlcv, stock)
+        if ohlcv is None or ohlcv.is_empty():
+            return None
+        last = ohlcv[self.columns[0]][-1]
+        stored_on = None
+        if self.ohlcv_store is not None:
+            stored_on = await asyncio.to_thread(self.ohlcv_store.stored_on, stock)
+        if OhlcvStore.is_current(last, stored_on=stored_on):
+            return ohlcv
+
+        try:
+            tail = await self.fetch_ohlcv_tail(stock, last)
+        except Exception as e:
+            # The stored bars beat no chart while upstream is failing
+            logger.warning(f"Error fetching price tail of {stock}: {e}")
+            return ohlcv
+        if tail is None:
+            return None
+        if tail.is_empty():
+            return ohlcv
+        return await asyncio.to_thread(self.remember_ohlcv, stock, tail)
+
+    async def fetch_ohlcv_tail(self, stock: str, last: date) -> pl.DataFrame | None:
+        """
+        Bars of a ticker from its last stored date on. The last stored bar is
+        fetched again as it may still have been forming.
+        """
+        if time.monotonic() < Strategy._tail_retry_at.get(stock.upper(), 0.0):
+            return None
+        endpoint = self.url + self.ohlcv_tail_endpoint.format(
+            stock=stock, start=last.isoformat()
+        )
+        response = await self._fetch(endpoint, "ohlcv")
+        if response is None:
+            # Don't ask again for every search of the ticker, upstream may
+            # not know it or have no such endpoint
+            Strategy._tail_retry_at[stock.upper()] = (
+                time.monotonic() + self.tail_retry_after
+            )
+            logger.warning(f"No price tail of {stock}, fetching its full history")
+            return None
+        data = self._process_response(response)
+        if data is None:
+            # No bars past the last stored one
+            return pl.DataFrame()
+        if not set(self.columns) <= set(data.columns):
+            return None
+        return data.select(self.columns).filter(pl.col(self.columns[0]) >= last)
 
     @abstractmethod
-    def show(self, df: pl.DataFrame) -> go.Figure | None:
+    def show(
+        self,
+        df: pl.DataFrame,
+        stock: str = "",
+        window: tuple[date, date] | None = None,
+    ) -> go.Figure | None:
         return
 
-    def show_stock_price(self, df: pl.DataFrame) -> go.Figure:
-        fig = go.Figure()
-        fig.update_layout(template="plotly_dark", xaxis_rangeslider_visible=False)
+    def price_layer(
+        self,
+        df: pl.DataFrame,
+        stock: str = "",
+        arrays: dict[str, np.ndarray] | None = None,
+    ) -> go.Candlestick:
+        """
+        Candlestick trace of a ticker's prices, built once per data version.
+        Already converted columns can be passed in arrays.
+        """
+        key = (stock.upper(), df_fingerprint(df, self.columns))
+        with self._price_layer_lock:
+            layer = self._price_layers.get(key)
+            if layer is not None:
+                self._price_layers.move_to_end(key)
+                return layer
 
-        fig.add_trace(
-            go.Candlestick(
-                x=df["datetime"].to_list(),
-                open=df["open"].to_list(),
-                close=df["close"].to_list(),
-                high=df["high"].to_list(),
-                low=df["low"].to_list(),
-                name="Close price",
-            )
+        arrays = arrays or {}
+        missing = [col for col in self.columns if col not in arrays]
+        arrays = {**arrays, **df_to_arrays(df, missing)}
+        arrays = downsample.ohlc_buckets(arrays, self.max_points)
+        layer = go.Candlestick(
+            x=arrays["datetime"],
+            open=arrays["open"],
+            close=arrays["close"],
+            high=arrays["high"],
+            low=arrays["low"],
+            name="Close price",
+        )
+        with self._price_layer_lock:
+            self._price_layers[key] = layer
+            while len(self._price_layers) > self.price_layer_cache_size:
+                self._price_layers.popitem(last=False)
+        return layer
+
+    @staticmethod
+    def live_layer(arrays: dict[str, np.ndarray] | None = None) -> go.Candlestick:
+        """
+        Candlestick of streamed bars, the last trace of every price chart so
+        it can be patched in place as bars arrive
+        """
+        arrays = arrays or {}
+        return go.Candlestick(
+            x=arrays.get("datetime", []),
+            open=arrays.get("open", []),
+            high=arrays.get("high", []),
+            low=arrays.get("low", []),
+            close=arrays.get("close", []),
+            name="Live",
+            increasing_line_color="deepskyblue",
+            decreasing_line_color="orange",
+            showlegend=False,
         )
+
+    @staticmethod
+    def zoom(df: pl.DataFrame, window: tuple[date, date] | None) -> pl.DataFrame:
+        """
+        Bars inside a zoomed window plus one bar on each side, so lines run
+        on to the window's edges
+        """
+        if window is None:
+            return df
+        dates = df["datetime"]
+        start = max(dates.search_sorted(window[0], side="left") - 1, 0)
+        end = dates.search_sorted(window[1], side="right") + 1
+        return df.slice(start, end - start)
+
+    def line(self, dates: np.ndarray, values: np.ndarray) -> dict[str, np.ndarray]:
+        """
+        Downsampled line series as x and y keyword arguments of a trace
+        """
+        keep = downsample.lttb(values, self.max_points)
+        return {"x": dates[keep], "y": values[keep]}
+
+    @staticmethod
+    def apply_window(
+        fig: go.Figure, stock: str, window: tuple[date, date] | None
+    ) -> go.Figure:
+        """
+        Keep the zoom of a re-rendered figure, until another ticker is shown
+        """
+        fig.update_layout(uirevision=stock.upper())
+        if window is not None:
+            fig.update_xaxes(range=[window[0].isoformat(), window[1].isoformat()])
+        return fig
+
+    def show_stock_price(
+        self,
+        df: pl.DataFrame,
+        arrays: dict[str, np.ndarray] | None = None,
+        stock: str = "",
+    ) -> go.Figure:
+        fig = go.Figure()
+        fig.update_layout(template="plotly_dark", xaxis_rangeslider_visible=False)
+        fig.add_trace(self.price_layer(df, stock, arrays))
         fig.update_layout(
             title={"text": "Stock Price", "x": 0.5},
             font=dict(size=18),
@@ -0,0 +1,14 @@
+import pytest
+
+from strategy import Strategy
+from strategy.ohlcv_store import OhlcvStore
+
+
+@pytest.fixture(autouse=True)
+def ohlcv_store(tmp_path, monkeypatch):
+    """
+    Keep stored price histories of a test out of the shared store directory
+    """
+    store = OhlcvStore(str(tmp_path / "ohlcv"))
+    monkeypatch.setattr(Strategy, "ohlcv_store", store)
+    return store
@@ -0,0 +1,89 @@
+import asyncio
+
+from utils.comm_interface import CommunicationInterface
+from utils.cached_comm import CachedComm
+
+
+class CountingComm(CommunicationInterface):
+    def __init__(self):
+        self.calls = 0
+
+    async def get(self, endpoint: str, accept: str | None = None):
+        self.calls += 1
+        return {"endpoint": endpoint, "version": self.calls}
+
+
+def test_cached_comm_serves_hits_from_cache():
+    upstream = CountingComm()
+    cache = CachedComm(upstream, default_ttl=60)
+
+    async def run():
+        first = await cache.get("http://sp/rsi/AAPL")
+        second = await cache.get("http://sp/rsi/AAPL")
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first is second
+    assert upstream.calls == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cached_comm_evicts_least_recently_used():
+    upstream = CountingComm()
+    cache = CachedComm(upstream, max_entries=2, default_ttl=60)
+
+    async def run():
+        await cache.get("http://sp/rsi/A")
+        await cache.get("http://sp/rsi/B")
+        await cache.get("http://sp/rsi/A")
+        await cache.get("http://sp/rsi/C")
+        await cache.get("http://sp/rsi/A")
+        await cache.get("http://sp/rsi/B")
+
+    asyncio.run(run())
+    # B was evicted by C, A stayed as most recently used
+    assert upstream.calls == 4
+    assert cache.stats()["evictions"] == 2
+
+
+def test_cached_comm_serves_stale_and_revalidates():
+    upstream = CountingComm()
+    cache = CachedComm(upstream, default_ttl=0, stale_ttl=60)
+
+    async def run():
+        first = await cache.get("http://sp/bb/AAPL")
+        stale = await cache.get("http://sp/bb/AAPL")
+        await asyncio.gather(*cache._tasks)
+        return first, stale
+
+    first, stale = asyncio.run(run())
+    assert stale is first
+    assert upstream.calls == 2
+    assert cache._entries["http://sp/bb/AAPL"][1]["version"] == 2
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_cached_comm_ttl_per_endpoint_family():
+    cache = CachedComm(CountingComm(), default_ttl=10, ttls={"/bestperf/": 100})
+    assert cache.ttl_for("http://sp/bestperf/sma/AAPL") == 100
+    assert cache.ttl_for("http://sp/sma/AAPL?short_ma=20") == 10
+
+
+def test_cached_comm_serves_expired_response_when_upstream_fails():
+    upstream = CountingComm()
+    cache = CachedComm(upstream, default_ttl=0, stale_ttl=0)
+
+    async def failing(endpoint, accept=None):
+        raise ConnectionError("circuit open")
+
+    async def run():
+        first = await cache.get("http://sp/rsi/AAPL")
+        upstream.get = failing
+        return first, await cache.get("http://sp/rsi/AAPL")
+
+    first, fallback = asyncio.run(run())
+    assert fallback is first
+    # The fallback counts once, as a stale hit
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["stale_hits"] == 1
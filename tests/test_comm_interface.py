@@ -0,0 +1,334 @@
+import asyncio
+import io
+import threading
+import time
+import pytest
+import polars as pl
+from aiohttp import web
+
+from strategy import StrategyRSI
+from utils.comm_interface import HttpComm, WIRE_FORMATS, ARROW_STREAM, PARQUET
+from utils import async_runner
+from utils.async_runner import AsyncRunner
+from utils.rate_limited_comm import RateLimitedComm
+from utils.resilience import CircuitOpenError, LatencyTracker
+
+
+async def start_server(routes: dict) -> tuple[web.AppRunner, str]:
+    """
+    Start a local stand-in for the upstream services
+    """
+    app = web.Application()
+    for path, handler in routes.items():
+        app.router.add_get(path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_http_comm_reuses_pooled_session():
+    """
+    Test consecutive requests share one session and its connections
+    """
+    peers = set()
+
+    async def handler(request):
+        peers.add(request.transport.get_extra_info("peername"))
+        return web.json_response({"ok": True})
+
+    async def run():
+        runner, url = await start_server({"/ping": handler})
+        try:
+            first = await HttpComm.get(url + "/ping")
+            session = HttpComm._get_session()
+            second = await HttpComm.get(url + "/ping")
+            assert first == second == {"ok": True}
+            assert HttpComm._get_session() is session
+            assert len(peers) == 1
+        finally:
+            await HttpComm.close()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_http_comm_returns_none_on_error_status():
+    async def handler(request):
+        return web.json_response({}, status=500)
+
+    async def run():
+        runner, url = await start_server({"/fail": handler})
+        try:
+            assert await HttpComm.get(url + "/fail") is None
+        finally:
+            await HttpComm.close()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_async_runner_keeps_session_between_calls():
+    """
+    Test the background loop keeps the pooled session alive across callbacks
+    """
+
+    async def handler(request):
+        return web.json_response({"ok": True})
+
+    async def current_session():
+        return HttpComm._get_session()
+
+    runner = AsyncRunner(timeout=5)
+    try:
+        server, url = runner.run(start_server({"/ping": handler}))
+        assert runner.run(HttpComm.get(url + "/ping")) == {"ok": True}
+        session = runner.run(current_session())
+        assert runner.run(HttpComm.get(url + "/ping")) == {"ok": True}
+        assert runner.run(current_session()) is session
+        runner.run(server.cleanup())
+    finally:
+        runner.stop()
+
+
+def test_async_runner_cancels_on_timeout():
+    cancelled = threading.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    runner = AsyncRunner()
+    try:
+        with pytest.raises(TimeoutError):
+            runner.run(slow(), timeout=0.1)
+        assert cancelled.wait(1)
+    finally:
+        runner.stop()
+
+
+def test_concurrent_callers_share_one_runner(monkeypatch):
+    class SlowRunner(AsyncRunner):
+        def __init__(self, timeout: float = 10.0):
+            # Widen the window between the check and the assignment
+            time.sleep(0.05)
+            super().__init__(timeout)
+
+    monkeypatch.setattr(async_runner, "AsyncRunner", SlowRunner)
+    monkeypatch.setattr(async_runner, "_runner", None)
+    runners = []
+    threads = [
+        threading.Thread(target=lambda: runners.append(async_runner.get_runner()))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(runner) for runner in runners}) == 1
+
+
+def test_http_comm_negotiates_columnar_formats():
+    """
+    Test Arrow IPC and Parquet bodies are decoded into polars, JSON otherwise
+    """
+    frame = pl.DataFrame(
+        {
+            "datetime": ["2024-01-03T00:00:00", "2024-01-02T00:00:00"],
+            "high": [2, 1],
+            "low": [1, 0],
+            "open": [1.5, 0.5],
+            "close": [1.8, 0.8],
+            "RSI_14": [55.0, 45.0],
+            "Signal": [0, 0],
+        }
+    )
+
+    async def handler(request):
+        accept = request.headers.get("Accept", "")
+        body = io.BytesIO()
+        if ARROW_STREAM in accept:
+            frame.write_ipc_stream(body)
+            return web.Response(body=body.getvalue(), content_type=ARROW_STREAM)
+        if PARQUET in accept:
+            frame.write_parquet(body)
+            return web.Response(body=body.getvalue(), content_type=PARQUET)
+        return web.json_response({"format": "json"})
+
+    async def run():
+        runner, url = await start_server({"/rsi/{stock}": handler})
+        try:
+            arrow = await HttpComm.get(url + "/rsi/A", WIRE_FORMATS["arrow"])
+            parquet = await HttpComm.get(url + "/rsi/A", WIRE_FORMATS["parquet"])
+            json = await HttpComm.get(url + "/rsi/A")
+            strategy = StrategyRSI(HttpComm)
+            strategy.url = url
+            strategy.wire_formats = {"rsi": "arrow"}
+            df = await strategy.fetch_rsi_signal("A")
+        finally:
+            await HttpComm.close()
+            await runner.cleanup()
+        return arrow, parquet, json, df
+
+    arrow, parquet, json, df = asyncio.run(run())
+    assert arrow.equals(frame)
+    assert parquet.equals(frame)
+    assert json == {"format": "json"}
+    assert df.schema["datetime"] == pl.Date
+    assert df["datetime"].is_sorted()
+    assert df.schema["Signal"] == pl.Float64
+
+
+def test_http_comm_retries_transient_failures(monkeypatch):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.path)
+        if len(calls) < 3:
+            return web.json_response({}, status=503)
+        return web.json_response({"ok": True})
+
+    monkeypatch.setattr(HttpComm, "retry_backoff", 0.01)
+
+    async def run():
+        runner, url = await start_server({"/flaky": handler})
+        try:
+            return await HttpComm.get(url + "/flaky")
+        finally:
+            await HttpComm.close()
+            await runner.cleanup()
+
+    assert asyncio.run(run()) == {"ok": True}
+    assert len(calls) == 3
+
+
+def test_http_comm_retries_stop_at_the_deadline(monkeypatch):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.path)
+        return web.json_response({}, status=503)
+
+    monkeypatch.setattr(HttpComm, "retries", 100)
+    monkeypatch.setattr(HttpComm, "retry_backoff", 0.05)
+    monkeypatch.setattr(HttpComm, "deadline", 0.3)
+
+    async def run():
+        runner, url = await start_server({"/down": handler})
+        HttpComm.breaker(url).failures = 1000
+        try:
+            start = time.monotonic()
+            data = await HttpComm.get(url + "/down")
+            return data, time.monotonic() - start
+        finally:
+            await HttpComm.close()
+            await runner.cleanup()
+
+    data, elapsed = asyncio.run(run())
+    assert data is None
+    assert elapsed < 0.5
+    assert 1 < len(calls) < 100
+
+
+def test_http_comm_negative_retries_request_once(monkeypatch):
+    async def handler(request):
+        return web.json_response({"ok": True})
+
+    monkeypatch.setattr(HttpComm, "retries", -1)
+
+    async def run():
+        runner, url = await start_server({"/once": handler})
+        try:
+            return await HttpComm.get(url + "/once")
+        finally:
+            await HttpComm.close()
+            await runner.cleanup()
+
+    assert asyncio.run(run()) == {"ok": True}
+
+
+def test_http_comm_circuit_fails_fast_on_slow_upstream(monkeypatch):
+    async def handler(request):
+        await asyncio.sleep(0.3)
+        return web.json_response({"ok": True})
+
+    monkeypatch.setattr(HttpComm, "timeouts", {"slow": 0.05})
+    monkeypatch.setattr(HttpComm, "retries", 0)
+
+    async def run():
+        runner, url = await start_server({"/slow": handler})
+        breaker = HttpComm.breaker(url)
+        breaker.failures = 2
+        try:
+            for _ in range(2):
+                with pytest.raises(asyncio.TimeoutError):
+                    await HttpComm.get(url + "/slow")
+            assert breaker.state == "open"
+            with pytest.raises(CircuitOpenError):
+                await HttpComm.get(url + "/slow")
+        finally:
+            await HttpComm.close()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_http_comm_hedges_slow_requests(monkeypatch):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.path)
+        # The first request stalls, the hedged second one answers quickly
+        await asyncio.sleep(0.5 if len(calls) == 1 else 0)
+        return web.json_response({"call": len(calls)})
+
+    monkeypatch.setattr(HttpComm, "hedge_percentile", 95)
+    monkeypatch.setattr(HttpComm, "_latencies", LatencyTracker(min_samples=1))
+    HttpComm._latencies.record("hedge", 0.05)
+
+    async def run():
+        runner, url = await start_server({"/hedge": handler})
+        try:
+            return await asyncio.wait_for(HttpComm.get(url + "/hedge"), 0.4)
+        finally:
+            await HttpComm.close()
+            await runner.cleanup()
+
+    assert asyncio.run(run()) == {"call": 2}
+    assert len(calls) == 2
+
+
+def test_retries_and_hedges_take_rate_limit_tokens(monkeypatch):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.path)
+        if len(calls) == 1:
+            return web.json_response({}, status=503)
+        # The retry stalls, its hedge answers quickly
+        await asyncio.sleep(0.5 if len(calls) == 2 else 0)
+        return web.json_response({"call": len(calls)})
+
+    monkeypatch.setattr(HttpComm, "retry_backoff", 0.01)
+    monkeypatch.setattr(HttpComm, "hedge_percentile", 95)
+    monkeypatch.setattr(HttpComm, "_latencies", LatencyTracker(min_samples=1))
+    HttpComm._latencies.record("metered", 0.05)
+    comm = RateLimitedComm(HttpComm, rate=1000, burst=10, hosts=None)
+
+    async def run():
+        runner, url = await start_server({"/metered": handler})
+        try:
+            return await asyncio.wait_for(comm.get(url + "/metered"), 0.4)
+        finally:
+            await HttpComm.close()
+            await runner.cleanup()
+
+    assert asyncio.run(run()) == {"call": 3}
+    # The first attempt, its retry and the retry's hedge took a token each
+    assert len(calls) == 3
+    assert comm.stats()["interactive"]["requests"] == 3
@@ -0,0 +1,53 @@
+from datetime import date
+import numpy as np
+
+from strategy import StrategyCrossingMA, StrategyRSI, indicators
+from utils import downsample
+from utils.comm_interface import HttpComm
+from .test_indicators import make_ohlcv
+
+
+def test_ohlc_buckets_keep_price_extremes():
+    ohlcv = make_ohlcv(1000)
+    arrays = {col: ohlcv[col].to_numpy() for col in ohlcv.columns}
+    buckets = downsample.ohlc_buckets(arrays, 100)
+
+    assert len(buckets["close"]) == 100
+    assert buckets["open"][0] == arrays["open"][0]
+    assert buckets["close"][-1] == arrays["close"][-1]
+    assert buckets["high"].max() == arrays["high"].max()
+    assert buckets["low"].min() == arrays["low"].min()
+
+
+def test_lttb_keeps_edges_and_peaks():
+    values = np.sin(np.linspace(0, 20, 10_000))
+    values[:10] = np.nan
+    keep = downsample.lttb(values, 500)
+
+    assert len(keep) == 500
+    assert keep[0] == 10 and keep[-1] == len(values) - 1
+    assert np.all(np.diff(keep) > 0)
+    assert values[keep].max() > 0.999
+
+
+def test_zoom_window_from_relayout_data():
+    assert downsample.zoom_window({"xaxis.autorange": True}) is None
+    assert downsample.zoom_window(
+        {"xaxis.range[0]": "2020-02-01 06:00", "xaxis.range[1]": "2020-03-01"}
+    ) == (date(2020, 2, 1), date(2020, 3, 1))
+    assert not downsample.is_zoom({"dragmode": "pan"})
+
+
+def test_show_bounds_points_and_zooms_to_window():
+    ohlcv = make_ohlcv(5000)
+    x_ma = StrategyCrossingMA(HttpComm)
+    x_ma.max_points = 500
+    fig = x_ma.show(indicators.crossing_ma(ohlcv, 20, 50), "ZOOM")
+    assert all(len(trace.x) <= 500 for trace in fig.data)
+
+    rsi = StrategyRSI(HttpComm)
+    window = (date(2020, 3, 1), date(2020, 3, 31))
+    fig = rsi.show(indicators.rsi(ohlcv), "ZOOM", window)
+    assert fig.data[0].x[0] == "2020-02-29"
+    assert fig.data[0].x[-1] == "2020-04-01"
+    assert fig.layout.xaxis.range == ("2020-03-01", "2020-03-31")
@@ -0,0 +1,111 @@
+import asyncio
+import json
+from datetime import datetime, time
+from zoneinfo import ZoneInfo
+
+from websockets.asyncio.server import serve
+
+from strategy import StrategyCrossingMA, indicators
+from utils.comm_interface import HttpComm
+from utils.feed_client import BarBuffer, FeedClient
+
+from .test_indicators import make_ohlcv
+
+
+def test_ticks_are_aggregated_into_daily_bars_of_the_exchange():
+    buffer = BarBuffer(max_bars=2, tz="America/New_York")
+    # From the open of 2024-01-02 to after hours, which is 2024-01-03 in UTC
+    for timestamp, price in [
+        (1704205800, 10.0),
+        (1704215000, 12.0),
+        (1704229200, 9.0),
+        (1704250800, 11.0),
+    ]:
+        buffer.add_tick(timestamp, price)
+    buffer.add_tick(1704292200, 11.5)
+    # A late tick of a finished bar is dropped
+    buffer.add_tick(1704215000, 100.0)
+
+    arrays = buffer.arrays()
+    assert list(arrays["datetime"]) == ["2024-01-02", "2024-01-03"]
+    assert arrays["open"].tolist() == [10.0, 11.5]
+    assert arrays["high"].tolist() == [12.0, 11.5]
+    assert arrays["low"].tolist() == [9.0, 11.5]
+    assert arrays["close"].tolist() == [11.0, 11.5]
+    assert buffer.version == 5
+
+    # An intraday bar in UTC joins the forming bar of its trading day
+    buffer.add_bar(
+        "2024-01-03T20:00:00", {"open": 11, "high": 13, "low": 11, "close": 12}
+    )
+    assert buffer.arrays()["high"].tolist() == [12.0, 13.0]
+    assert buffer.arrays()["close"].tolist() == [11.0, 12.0]
+
+    buffer.add_tick(1704292200 + 86400, 12.0)
+    assert len(buffer) == 2
+    assert buffer.arrays()["datetime"][0] == "2024-01-03"
+
+
+def test_streamed_bar_lines_up_with_the_last_historical_bar():
+    x_ma = StrategyCrossingMA(HttpComm)
+    ohlcv = make_ohlcv(60, seed=3)
+    fig = x_ma.show(indicators.crossing_ma(ohlcv, 5, 10, "sma"), "LIVE")
+    last = ohlcv["datetime"][-1]
+
+    buffer = BarBuffer(tz="America/New_York")
+    # Late in the exchange's day, already the next day in UTC
+    close = datetime.combine(last, time(23), ZoneInfo("America/New_York"))
+    buffer.add_tick(close.timestamp(), 1.0)
+    layer = x_ma.live_layer(buffer.arrays())
+
+    assert list(layer.x) == [fig.data[0].x[-1]] == [last.isoformat()]
+
+
+def test_client_buffers_streamed_bars_of_subscribed_tickers():
+    received = []
+
+    async def feed(ws):
+        async for message in ws:
+            request = json.loads(message)
+            received.append(request)
+            for symbol in request["symbols"]:
+                bars = [
+                    {"type": "bar", "symbol": symbol, "datetime": day, "open": 1}
+                    | {"high": 2, "low": 0.5, "close": close}
+                    for day, close in [("2024-01-02", 1.5), ("2024-01-03", 1.8)]
+                ]
+                # The forming bar is sent again as it changes
+                bars.append(bars[-1] | {"close": 1.9})
+                bars.append({"type": "bar", "symbol": "OTHER", "datetime": "x"})
+                for bar in bars:
+                    await ws.send(json.dumps(bar))
+
+    async def run():
+        async with serve(feed, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            client = FeedClient(f"ws://127.0.0.1:{port}")
+            await client.subscribe("aapl")
+            await asyncio.wait_for(client.connected.wait(), 5)
+            buffer = client.buffer("AAPL")
+            for _ in range(100):
+                if buffer.version >= 3:
+                    break
+                await asyncio.sleep(0.01)
+            await client.stop()
+            return buffer
+
+    buffer = asyncio.run(run())
+    assert received == [{"action": "subscribe", "symbols": ["AAPL"]}]
+    arrays = buffer.arrays()
+    assert list(arrays["datetime"]) == ["2024-01-02", "2024-01-03"]
+    assert arrays["close"].tolist() == [1.5, 1.9]
+
+
+def test_live_layer_is_the_last_trace_of_price_charts():
+    x_ma = StrategyCrossingMA(HttpComm)
+    buffer = BarBuffer()
+    buffer.add_bar("2024-01-02", {"open": 1, "high": 2, "low": 0.5, "close": 1.5})
+    layer = x_ma.live_layer(buffer.arrays())
+    assert layer.name == "Live"
+    assert list(layer.x) == ["2024-01-02"]
+    assert list(x_ma.live_layer().x) == []
@@ -0,0 +1,47 @@
+import plotly.graph_objects as go
+
+from utils.figure_cache import FigureCache
+
+
+def make_figure(n: int) -> go.Figure:
+    return go.Figure(go.Scatter(x=list(range(n)), y=list(range(n))))
+
+
+def test_figure_cache_serves_serialized_figure():
+    cache = FigureCache()
+    fig = make_figure(10)
+    assert cache.get(("RSI", "AAPL", ())) is None
+    cache.put(("RSI", "AAPL", ()), fig)
+
+    cached = cache.get(("RSI", "AAPL", ()))
+    assert go.Figure(cached) == fig
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_figure_cache_evicts_by_size():
+    size = len(make_figure(100).to_json())
+    cache = FigureCache(max_bytes=2 * size + size // 2)
+    for key in "ABC":
+        cache.put(key, make_figure(100))
+    cache.get("A")
+
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 1
+    assert cache.get("A") is None
+    assert cache.size <= cache.max_bytes
+
+    cache.put("D", make_figure(10_000))
+    assert cache.get("D") is None
+
+
+def test_figure_cache_expires_entries():
+    cache = FigureCache(ttl=0)
+    cache.put("A", make_figure(10))
+    assert cache.get("A") is None
+    assert cache.stats()["entries"] == 0
+    assert cache.size == 0
+
+    cache.ttl = 60
+    cache.put("A", make_figure(20))
+    assert go.Figure(cache.get("A")) == make_figure(20)
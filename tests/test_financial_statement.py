@@ -0,0 +1,61 @@
+import numpy as np
+
+from fundamental import FinancialStatement
+
+
+def make_payload(n: int = 40) -> dict:
+    facts = [
+        {"end_date": f"{2000 + i // 4}-{3 * (i % 4) + 1:02d}-01"} for i in range(n)
+    ]
+    return {
+        "balance_sheet": [
+            {
+                "current_assets": 100 + i,
+                "current_liabilities": 50,
+                "inventory": i,
+                "total_assets": 300,
+                "total_liabilities": 200,
+                "financial_facts": facts[i],
+            }
+            for i in range(n)
+        ],
+        "cash_flow": [
+            {
+                "end_cash_flow_position": 10 * i,
+                "financing_cash_flow": -5 * i,
+                "financial_facts": facts[i],
+            }
+            for i in range(n)
+        ],
+        "income_statement": [
+            {"total_revenue": "1000", "financial_facts": facts[i]} for i in range(n)
+        ],
+    }
+
+
+def test_statement_frames_match_models():
+    payload = make_payload()
+    from_payload = FinancialStatement.from_payload(payload)
+    from_models = FinancialStatement.model_validate(payload)
+    for name in ("balance_sheet", "cash_flow", "income_statement"):
+        assert from_payload.frame(name).equals(from_models.frame(name))
+
+    df = from_payload.frame("income_statement")
+    assert df["total_revenue"].to_list() == [1000] * 40
+    assert df["operating_expense"].to_list() == [0] * 40
+    assert df["end_date"][5] == "2001-04-01"
+
+
+def test_statement_figures_from_frames():
+    statement = FinancialStatement.from_payload(make_payload())
+    balance_sheet = statement.show_balance_sheet()
+    assert np.array_equal(balance_sheet.data[0].y, np.arange(100, 140) - np.arange(40))
+    assert np.array_equal(balance_sheet.data[2].base, np.arange(100, 140))
+    assert statement.show_cash_flow().data[0].marker.size[-1] == 40
+    assert FinancialStatement().show_income_statement() is None
+
+
+def test_scale_sizes_is_linear_in_magnitude():
+    sizes = FinancialStatement._scale_sizes([-10, 0, 5, 10])
+    assert np.allclose(sizes, [40, 8, 24, 40])
+    assert np.all(FinancialStatement._scale_sizes([3, -3]) == 8)
@@ -0,0 +1,84 @@
+import json
+
+import numpy as np
+import pytest
+
+from strategy import indicators
+from strategy.incremental import (
+    EWMA,
+    IncrementalIndicator,
+    RollingBollinger,
+    RollingSMA,
+    WilderRSI,
+    moving_average,
+)
+from tests.test_indicators import make_ohlcv
+
+
+def values(df, col) -> list:
+    return df[col].to_list()
+
+
+def assert_matches(incremental: list, batch: list):
+    assert [v is None for v in incremental] == [v is None for v in batch]
+    np.testing.assert_allclose(
+        [v for v in incremental if v is not None],
+        [v for v in batch if v is not None],
+        rtol=1e-9,
+    )
+
+
+@pytest.mark.parametrize("ma_type", ["sma", "ewma"])
+def test_moving_averages_match_batch(ma_type):
+    ohlcv = make_ohlcv(n=1000)
+    df = indicators.crossing_ma(ohlcv, 10, 30, ma_type)
+    for window in [10, 30]:
+        ma = moving_average(window, ma_type)
+        assert isinstance(ma, EWMA if ma_type == "ewma" else RollingSMA)
+        assert_matches(
+            ma.run(ohlcv["close"]), values(df, f"{ma_type.upper()}_{window}")
+        )
+
+
+def test_rsi_matches_batch():
+    ohlcv = make_ohlcv(n=500)
+    df = indicators.rsi(ohlcv, 14)
+    assert_matches(WilderRSI(14).run(ohlcv["close"]), values(df, "RSI_14"))
+
+
+def test_rsi_without_losses_is_100():
+    assert WilderRSI(3).run([1, 2, 3, 4, 5])[-2:] == [100.0, 100.0]
+
+
+def test_bollinger_bands_match_batch():
+    ohlcv = make_ohlcv(n=1000)
+    df = indicators.bollinger_bands(ohlcv, 20, 2.0)
+    bands = RollingBollinger(20, 2.0).run(ohlcv["close"])
+    for i, col in enumerate(["SMA_20", "Upper_20", "Lower_20"]):
+        assert_matches([b and b[i] for b in bands], values(df, col))
+
+
+@pytest.mark.parametrize(
+    "make",
+    [
+        lambda: RollingSMA(20),
+        lambda: EWMA(20),
+        lambda: WilderRSI(14),
+        lambda: RollingBollinger(20, 2.0),
+    ],
+)
+def test_resumed_state_continues_exactly(make):
+    closes = make_ohlcv(n=200)["close"].to_list()
+    full = make().run(closes)
+
+    first = make()
+    first.run(closes[:77])
+    checkpoint = json.dumps(first.state())
+    resumed = IncrementalIndicator.from_state(json.loads(checkpoint))
+    assert type(resumed) is type(first)
+    assert resumed.run(closes[77:]) == full[77:]
+
+
+def test_base_calculator_is_abstract():
+    with pytest.raises(TypeError):
+        IncrementalIndicator()
@@ -0,0 +1,113 @@
+from datetime import date, timedelta
+import numpy as np
+import polars as pl
+
+from strategy import (
+    StrategyCrossingMA,
+    StrategyRSI,
+    StrategyBollingerBands,
+    indicators,
+)
+from utils.comm_interface import HttpComm
+
+
+def make_ohlcv(n: int = 300, seed: int = 0) -> pl.DataFrame:
+    close = np.cumprod(1 + np.random.default_rng(seed).normal(0, 0.02, n)) * 100
+    return pl.DataFrame(
+        {
+            "datetime": [date(2020, 1, 1) + timedelta(days=i) for i in range(n)],
+            "high": close * 1.01,
+            "low": close * 0.99,
+            "open": close,
+            "close": close,
+        }
+    )
+
+
+def test_crossing_ma_matches_reference():
+    ohlcv = make_ohlcv()
+    df = indicators.crossing_ma(ohlcv, 5, 20)
+    close = ohlcv["close"].to_numpy()
+    expected = np.convolve(close, np.ones(20) / 20, mode="valid")
+    assert np.allclose(df["SMA_20"].to_numpy()[19:], expected)
+
+    below = df["SMA_20"].to_numpy() > df["SMA_5"].to_numpy()
+    crossings = np.flatnonzero(np.diff(below[19:].astype(int))) + 20
+    assert set(np.flatnonzero(df["Signal"].to_numpy())) == set(crossings)
+
+
+def test_rsi_matches_wilder_reference():
+    ohlcv = make_ohlcv()
+    df = indicators.rsi(ohlcv, period=14)
+    delta = np.diff(ohlcv["close"].to_numpy())
+    gain, loss = np.clip(delta, 0, None), np.clip(-delta, 0, None)
+    avg_gain, avg_loss = gain[:14].mean(), loss[:14].mean()
+    for i in range(14, len(delta)):
+        avg_gain = (avg_gain * 13 + gain[i]) / 14
+        avg_loss = (avg_loss * 13 + loss[i]) / 14
+    assert df["RSI_14"][:14].null_count() == 14
+    assert np.isclose(df["RSI_14"][-1], 100 - 100 / (1 + avg_gain / avg_loss))
+
+
+def test_bollinger_bands_matches_reference():
+    ohlcv = make_ohlcv()
+    df = indicators.bollinger_bands(ohlcv, window=20, num_std=2)
+    window = ohlcv["close"].to_numpy()[-20:]
+    assert np.isclose(df["Upper_20"][-1], window.mean() + 2 * window.std())
+    assert np.isclose(df["Lower_20"][-1], window.mean() - 2 * window.std())
+
+
+def test_local_signals_are_plottable():
+    ohlcv = make_ohlcv()
+    x_ma = StrategyCrossingMA(HttpComm)
+    rsi = StrategyRSI(HttpComm)
+    bb = StrategyBollingerBands(HttpComm)
+    assert x_ma.compute_cross_ma_signal("LOCAL", 20, 50) is None
+
+    x_ma.remember_ohlcv("LOCAL", ohlcv)
+    assert x_ma.show(x_ma.compute_cross_ma_signal("local", 20, 50, "ewma"))
+    assert rsi.show(rsi.compute_rsi_signal("LOCAL"))
+    assert bb.show(bb.compute_bb_signal("LOCAL"))
+
+
+def test_figures_serialize_typed_arrays():
+    df = indicators.bollinger_bands(make_ohlcv())
+    candles = StrategyBollingerBands(HttpComm).show(df).to_plotly_json()["data"][0]
+    assert candles["close"]["dtype"] == "f8"
+    assert "bdata" in candles["close"]
+    assert candles["x"][0] == "2020-01-01"
+
+
+def test_price_layer_is_shared_per_ticker_and_version():
+    ohlcv = make_ohlcv()
+    x_ma = StrategyCrossingMA(HttpComm)
+    bb = StrategyBollingerBands(HttpComm)
+    layer = x_ma.price_layer(ohlcv, "aapl")
+    assert bb.price_layer(indicators.bollinger_bands(ohlcv), "AAPL") is layer
+    assert x_ma.price_layer(make_ohlcv(seed=1), "AAPL") is not layer
+
+    fig = bb.show(indicators.bollinger_bands(ohlcv), "AAPL")
+    assert fig.data[0].name == "Close price"
+    # Five band traces and the live candlestick
+    assert len(fig.data) == 7
+    assert fig.data[-1].name == "Live"
+
+
+def test_crossing_ma_short_average_is_the_smaller_window():
+    x_ma = StrategyCrossingMA(HttpComm)
+    df = indicators.crossing_ma(make_ohlcv(), 5, 20)
+    fig = x_ma.show(df, "WINDOWS")
+    assert [t.name for t in fig.data[1:3]] == ["SMA_5", "SMA_20"]
+    buys = df.filter(pl.col(indicators.SIGNAL) == -1)
+    # Buy markers sit on the short average
+    assert np.allclose(fig.data[3].y, buys["SMA_5"].to_numpy())
+
+
+def test_crossing_ma_overlay_matches_figure_traces():
+    x_ma = StrategyCrossingMA(HttpComm)
+    df = indicators.crossing_ma(make_ohlcv(), 10, 30)
+    fig = x_ma.show(df, "OVERLAY")
+    overlay = x_ma.show_overlay(df)
+    assert [trace.name for trace in overlay] == [t.name for t in fig.data[1:-1]]
+    assert fig.data[-1].name == "Live"
+    assert np.array_equal(overlay[0].y, fig.data[1].y)
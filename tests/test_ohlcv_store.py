@@ -0,0 +1,106 @@
+import asyncio
+import os
+from datetime import date, timedelta
+
+import polars as pl
+
+from strategy import StrategyRSI
+from strategy.ohlcv_store import OhlcvStore, last_trading_day
+from utils.comm_interface import CommunicationInterface
+from .test_indicators import make_ohlcv
+
+
+class TailComm(CommunicationInterface):
+    def __init__(self, tail: pl.DataFrame):
+        self.tail = tail
+        self.endpoints = []
+
+    async def get(self, endpoint: str, accept: str | None = None):
+        self.endpoints.append(endpoint)
+        return self.tail
+
+
+def test_append_keeps_history_and_replaces_overlap(ohlcv_store):
+    ohlcv = make_ohlcv(100)
+    ohlcv_store.append("AAPL", ohlcv[:60])
+    # The last stored bar is revised by the tail
+    tail = ohlcv[59:].with_columns(pl.col("close") + 1)
+    merged = ohlcv_store.append("aapl", tail)
+
+    assert len(merged) == 100
+    assert merged["close"][58] == ohlcv["close"][58]
+    assert merged["close"][59] == ohlcv["close"][59] + 1
+    assert ohlcv_store.load("AAPL").equals(merged)
+    assert ohlcv_store.last_date("AAPL") == ohlcv["datetime"][-1]
+
+
+def test_append_of_known_bars_skips_the_write(ohlcv_store):
+    ohlcv = make_ohlcv(50)
+    ohlcv_store.append("AAPL", ohlcv)
+    written = os.stat(ohlcv_store.path("AAPL")).st_mtime_ns
+    assert ohlcv_store.append("AAPL", ohlcv[10:20]).equals(ohlcv)
+    assert os.stat(ohlcv_store.path("AAPL")).st_mtime_ns == written
+
+
+def test_last_trading_day_skips_weekends():
+    monday = date(2024, 6, 3)
+    friday, saturday = date(2024, 5, 31), date(2024, 6, 1)
+    assert last_trading_day(monday) == friday
+    # Today's bar may be forming on a trading day
+    assert not OhlcvStore.is_current(monday, monday, stored_on=monday)
+    assert OhlcvStore.is_current(friday, saturday, stored_on=saturday)
+    # Friday's bar stored on Friday may have been forming
+    assert not OhlcvStore.is_current(friday, saturday, stored_on=friday)
+    assert not OhlcvStore.is_current(date(2024, 5, 30), saturday, stored_on=saturday)
+
+
+class FailingComm(CommunicationInterface):
+    async def get(self, endpoint: str, accept: str | None = None):
+        raise ConnectionError("upstream down")
+
+
+def test_sync_serves_stored_history_when_the_tail_fails(ohlcv_store):
+    ohlcv = make_ohlcv(100)
+    ohlcv_store.append("IBM", ohlcv)
+    synced = asyncio.run(StrategyRSI(FailingComm()).sync_ohlcv("IBM"))
+    assert synced.equals(ohlcv)
+
+
+def test_sync_fetches_only_the_missing_tail(ohlcv_store):
+    ohlcv = make_ohlcv(100)
+    ohlcv_store.append("MSFT", ohlcv[:80])
+    upstream = TailComm(ohlcv[79:])
+    rsi = StrategyRSI(upstream)
+
+    synced = asyncio.run(rsi.sync_ohlcv("MSFT"))
+    assert synced.equals(ohlcv)
+    assert upstream.endpoints == [
+        f"{rsi.url}/ohlcv/MSFT?start={ohlcv['datetime'][79].isoformat()}"
+    ]
+    assert ohlcv_store.load("MSFT").equals(ohlcv)
+
+
+def test_missing_tail_backs_off_only_its_ticker(ohlcv_store):
+    ohlcv = make_ohlcv(100)
+    for stock in ["GONE", "KEPT"]:
+        ohlcv_store.append(stock, ohlcv[:80])
+
+    class PartialComm(TailComm):
+        async def get(self, endpoint: str, accept: str | None = None):
+            self.endpoints.append(endpoint)
+            return None if "/GONE" in endpoint else self.tail
+
+    upstream = PartialComm(ohlcv[79:])
+    rsi = StrategyRSI(upstream)
+
+    async def run():
+        return [await rsi.sync_ohlcv(s) for s in ["GONE", "KEPT", "GONE"]]
+
+    gone, kept, again = asyncio.run(run())
+    assert gone is None and again is None
+    assert kept.equals(ohlcv)
+    # The failed ticker isn't asked again, the other one still syncs
+    assert [e.split("/")[-1].split("?")[0] for e in upstream.endpoints] == [
+        "GONE",
+        "KEPT",
+    ]
@@ -0,0 +1,88 @@
+import numpy as np
+import polars as pl
+
+from strategy import StrategyCrossingMA, indicators, optimizer
+from utils.comm_interface import HttpComm
+from .test_indicators import make_ohlcv
+
+
+def strategy_return(close: np.ndarray, positions: np.ndarray) -> float:
+    return np.prod(1 + positions[:-1] * (close[1:] / close[:-1] - 1)) - 1
+
+
+def test_rolling_means_match_polars():
+    close = make_ohlcv()["close"]
+    means = optimizer.rolling_means(close.to_numpy(), np.array([5, 20]))
+    assert np.allclose(means[1], close.rolling_mean(20).to_numpy(), equal_nan=True)
+
+
+def test_rolling_stds_match_polars_on_high_prices():
+    noise = np.random.default_rng(0).normal(0, 0.01, 20_000)
+    close = pl.Series(1e6 + np.cumsum(noise))
+    stds = optimizer.rolling_stds(close.to_numpy(), np.array([5, 20, 50_000]))
+    expected = close.rolling_std(20, ddof=0).to_numpy()
+    assert np.allclose(stds[1], expected, rtol=1e-6, equal_nan=True)
+    assert np.isnan(stds[2]).all()
+
+
+def test_best_crossing_ma_pair_is_shown_short_first():
+    ohlcv = make_ohlcv(500)
+    df, _ = optimizer.sweep_crossing_ma(ohlcv, short_windows=[5], long_windows=[20])
+    fig = StrategyCrossingMA(HttpComm).show(df, "SWEEP")
+    assert [t.name for t in fig.data[1:3]] == ["SMA_5", "SMA_20"]
+
+
+def test_sweep_crossing_ma_scores_match_loop():
+    ohlcv = make_ohlcv(1000)
+    df, surface = optimizer.sweep_crossing_ma(ohlcv)
+    close = ohlcv["close"].to_numpy()
+
+    frame = indicators.crossing_ma(ohlcv, 10, 50)
+    positions = (frame["SMA_10"].to_numpy() > frame["SMA_50"].to_numpy()).astype(float)
+    score = surface.filter(short_ma=10, long_ma=50)["score"][0]
+    assert np.isclose(score, strategy_return(close, positions))
+
+    # Pairs with a short window not below the long one are not scored
+    assert surface.filter(short_ma=50, long_ma=20)["score"][0] is None
+    best = optimizer.best_params(surface)
+    assert df.columns[-3:] == [
+        f"SMA_{best['short_ma']}",
+        f"SMA_{best['long_ma']}",
+        "Signal",
+    ]
+
+
+def test_sweep_bollinger_bands_scores_match_loop():
+    ohlcv = make_ohlcv(1000)
+    _, surface = optimizer.sweep_bollinger_bands(ohlcv)
+    close = ohlcv["close"].to_numpy()
+
+    frame = indicators.bollinger_bands(ohlcv, 20, 2.0)
+    upper, lower = frame["Upper_20"].to_numpy(), frame["Lower_20"].to_numpy()
+    positions, held = [], 0.0
+    for price, up, low in zip(close, upper, lower):
+        if price < low:
+            held = 1.0
+        elif price > up:
+            held = 0.0
+        positions.append(held)
+    score = surface.filter(window=20, num_std=2.0)["score"][0]
+    assert np.isclose(score, strategy_return(close, np.array(positions)))
+
+
+def test_sweep_rsi_returns_full_surface():
+    df, surface = optimizer.sweep_rsi(make_ohlcv(500))
+    assert surface.height == (
+        len(optimizer.RSI_PERIODS)
+        * len(optimizer.RSI_UPPER_BOUNDS)
+        * len(optimizer.RSI_LOWER_BOUNDS)
+    )
+    assert f"RSI_{optimizer.best_params(surface)['period']}" in df.columns
+
+
+def test_sweep_crossing_ma_process_pool_matches(monkeypatch):
+    ohlcv = make_ohlcv(500)
+    _, serial = optimizer.sweep_crossing_ma(ohlcv)
+    monkeypatch.setattr(optimizer, "PARALLEL_THRESHOLD", 0)
+    _, parallel = optimizer.sweep_crossing_ma(ohlcv, processes=2)
+    assert parallel.equals(serial)
@@ -0,0 +1,97 @@
+import random
+import time
+from collections import OrderedDict
+
+from strategy import Strategy, StrategyCrossingMA, StrategyRSI
+from utils.comm_interface import HttpComm
+from benchmarks.bench_process_response import (
+    legacy_process_response,
+    legacy_process_ma_response,
+    make_rows,
+    to_columns,
+    to_epochs,
+)
+
+RSI_NAMES = {"column_names": ["datetime", "high", "low", "open", "close"]}
+RSI_NAMES["column_names"] += ["Signal", "RSI_14"]
+
+
+def test_row_payload_matches_legacy_parser():
+    random.seed(1)
+    rows = make_rows(500)
+    random.shuffle(rows)
+    payload = {"data": rows, "columns": RSI_NAMES}
+    strategy = StrategyRSI(HttpComm)
+    expected = legacy_process_response(payload)
+    # The first call learns the schema, the second one uses the cached schema
+    assert strategy._process_response(payload).equals(expected)
+    assert strategy._process_response(payload).equals(expected)
+
+
+def test_column_and_epoch_payloads_match_row_payload():
+    random.seed(2)
+    rows = make_rows(500)
+    strategy = StrategyRSI(HttpComm)
+    expected = strategy._process_response({"data": rows, "columns": RSI_NAMES})
+    columns = {"data": to_columns(rows), "columns": RSI_NAMES}
+    epochs = {"data": to_epochs(rows), "columns": RSI_NAMES}
+    assert strategy._process_response(columns).equals(expected)
+    assert strategy._process_response(epochs).equals(expected)
+
+
+def test_epoch_payloads_are_utc_on_any_host(monkeypatch):
+    monkeypatch.setenv("TZ", "Asia/Tokyo")
+    time.tzset()
+    try:
+        test_column_and_epoch_payloads_match_row_payload()
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+def test_schema_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(Strategy, "_schema_cache", OrderedDict())
+    monkeypatch.setattr(Strategy, "schema_cache_size", 2)
+    random.seed(6)
+    strategy = StrategyRSI(HttpComm)
+    rows = make_rows(5)
+    for extra in ["a", "b", "c"]:
+        payload = [row | {extra: 1.0} for row in rows]
+        names = {"column_names": RSI_NAMES["column_names"] + [extra]}
+        strategy._process_response({"data": payload, "columns": names})
+    assert len(Strategy._schema_cache) == 2
+
+
+def test_descending_payload_is_reversed():
+    random.seed(3)
+    rows = make_rows(100)[::-1]
+    df = StrategyRSI(HttpComm)._process_response({"data": rows, "columns": RSI_NAMES})
+    assert df["datetime"].is_sorted()
+
+
+def test_crossing_ma_payload_matches_legacy_parser():
+    random.seed(4)
+    strategy = StrategyCrossingMA(HttpComm)
+    names = {"column_names": strategy.columns + ["SMA_20", "SMA_50", "Signal"]}
+    payload = {"data": make_rows(300, ma=True), "columns": names}
+    expected = legacy_process_ma_response(payload, strategy.columns)
+    assert strategy._process_response(payload).equals(expected)
+
+
+def test_empty_payload_is_ignored():
+    strategy = StrategyRSI(HttpComm)
+    assert strategy._process_response({"data": [], "columns": RSI_NAMES}) is None
+    assert strategy._process_response({"message": "not found"}) is None
+
+
+def test_all_null_column_does_not_fix_the_schema(monkeypatch):
+    monkeypatch.setattr(Strategy, "_schema_cache", OrderedDict())
+    random.seed(5)
+    strategy = StrategyRSI(HttpComm)
+    warming_up = [row | {"rsi": None} for row in make_rows(10)]
+    df = strategy._process_response({"data": warming_up, "columns": RSI_NAMES})
+    assert df["RSI_14"].null_count() == 10
+
+    rows = make_rows(10)
+    df = strategy._process_response({"data": rows, "columns": RSI_NAMES})
+    assert df["RSI_14"].to_list() == [row["rsi"] for row in rows]
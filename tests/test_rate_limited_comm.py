@@ -0,0 +1,69 @@
+import asyncio
+
+from utils.comm_interface import CommunicationInterface
+from utils.rate_limited_comm import BATCH, RateLimitedComm, request_priority
+
+
+class OrderComm(CommunicationInterface):
+    def __init__(self):
+        self.order = []
+
+    async def get(self, endpoint: str, accept: str | None = None):
+        self.order.append(endpoint)
+        return endpoint
+
+
+def test_interactive_requests_jump_ahead_of_batch():
+    upstream = OrderComm()
+    comm = RateLimitedComm(upstream, rate=50, burst=1, hosts=None)
+
+    async def batch(i):
+        with request_priority(BATCH):
+            return await comm.get(f"batch-{i}")
+
+    async def run():
+        batches = [asyncio.create_task(batch(i)) for i in range(4)]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(comm.get("interactive"))
+        await asyncio.gather(*batches, interactive)
+
+    asyncio.run(run())
+    # The first batch request took the only token of the burst
+    assert upstream.order[:2] == ["batch-0", "interactive"]
+    assert upstream.order[2:] == ["batch-1", "batch-2", "batch-3"]
+
+    stats = comm.stats()
+    assert stats["batch"]["requests"] == 4
+    assert stats["interactive"]["requests"] == 1
+    assert stats["batch"]["max_wait"] > stats["interactive"]["max_wait"] > 0
+
+
+def test_cancelled_waiters_leave_the_queue():
+    upstream = OrderComm()
+    comm = RateLimitedComm(upstream, rate=20, burst=1, hosts=None)
+
+    async def run():
+        await comm.get("first")
+        waiting = asyncio.create_task(comm.get("cancelled"))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await comm.get("second")
+
+    asyncio.run(run())
+    assert upstream.order == ["first", "second"]
+    assert comm.stats()["queued"] == 0
+
+
+def test_only_metered_hosts_take_tokens():
+    upstream = OrderComm()
+    comm = RateLimitedComm(upstream, rate=1, burst=1, hosts={"sp:8000"})
+
+    async def run():
+        await comm.get("http://sp:8000/rsi/AAPL")
+        # The bucket is empty, unmetered hosts don't wait for it
+        for stock in ["AAPL", "MSFT", "IBM"]:
+            await asyncio.wait_for(comm.get(f"http://fundamental/{stock}"), 0.1)
+
+    asyncio.run(run())
+    assert len(upstream.order) == 4
+    assert comm.stats()["interactive"]["requests"] == 1
@@ -0,0 +1,42 @@
+from dash_components.register_callbacks import RegisterCallbacks
+from strategy import optimizer
+
+from .test_indicators import make_ohlcv
+
+
+def test_zoomed_best_performance_views_reuse_the_swept_params(monkeypatch):
+    rc = RegisterCallbacks()
+    sweeps = []
+
+    def counted(sweep):
+        def run(*args, **kwargs):
+            sweeps.append(sweep.__name__)
+            return sweep(*args, **kwargs)
+
+        return run
+
+    for name in ["sweep_crossing_ma", "sweep_rsi", "sweep_bollinger_bands"]:
+        monkeypatch.setattr(optimizer, name, counted(getattr(optimizer, name)))
+
+    for strategy, render, view in [
+        (
+            rc.strategy_x_ma,
+            rc._render_crossing_ma,
+            rc._view("ZOOMX", True, ma_type="SMA"),
+        ),
+        (rc.strategy_rsi, rc._render_rsi, rc._view("ZOOMR", True)),
+        (rc.strategy_bb, rc._render_bb, rc._view("ZOOMB", True)),
+    ]:
+        ohlcv = make_ohlcv(300, seed=7)
+        strategy.remember_ohlcv(view["stock"], ohlcv)
+        sweeps.clear()
+        assert render(view) is not None
+        best = view["best"]
+        assert "score" not in best
+        assert len(sweeps) == 1
+
+        window = (ohlcv["datetime"][100], ohlcv["datetime"][200])
+        zoomed = render(view, window)
+        assert zoomed is not None
+        assert len(sweeps) == 1
+        assert view["best"] == best
@@ -0,0 +1,39 @@
+import asyncio
+
+from scanner import Scanner, ScanProgress, read_watchlist
+from utils.comm_interface import CommunicationInterface
+from .test_indicators import make_ohlcv
+
+
+class HistoryComm(CommunicationInterface):
+    def __init__(self):
+        self.calls = 0
+
+    async def get(self, endpoint: str, accept: str | None = None):
+        self.calls += 1
+        if "FAIL" in endpoint:
+            return None
+        return make_ohlcv(seed=self.calls)
+
+
+def test_read_watchlist(tmp_path):
+    path = tmp_path / "watchlist.txt"
+    path.write_text("# tech\naapl, msft\nNVDA\n\nAAPL\n")
+    assert read_watchlist(str(path)) == ["AAPL", "MSFT", "NVDA"]
+
+
+def test_scan_ranks_tickers_and_reports_progress(tmp_path):
+    upstream = HistoryComm()
+    scanner = Scanner(upstream, concurrency=2)
+    progress = ScanProgress(4, str(tmp_path / "progress.json"))
+    results = asyncio.run(scanner.scan(["A", "B", "FAIL", "C"], progress))
+
+    assert results["rank"].to_list() == [1, 2, 3, 4]
+    assert results["stock"][-1] == "FAIL"
+    assert results["error"][-1] == "no price history"
+    ranked = results.drop_nulls("score")
+    assert ranked["buy_votes"].is_sorted(descending=True)
+    assert ranked["x_ma_score"].is_not_null().all()
+
+    stats = ScanProgress.read(progress.path)
+    assert stats["done"] == 4 and stats["failed"] == 1 and stats["finished"]
@@ -0,0 +1,90 @@
+import asyncio
+import multiprocessing
+
+import polars as pl
+
+from utils.cached_comm import CachedComm
+from utils.shared_cache import SharedCache, SharedCacheComm
+from utils.single_flight_comm import SingleFlightComm
+from .test_cached_comm import CountingComm
+
+
+def test_shared_cache_round_trips_frames_and_json(tmp_path):
+    cache = SharedCache(str(tmp_path / "cache.sqlite"))
+    df = pl.DataFrame({"datetime": ["2024-01-02"], "close": [1.5]})
+    cache.put("ohlcv", df)
+    cache.put("statement", {"balance_sheet": [{"total_assets": 1}]})
+
+    _, cached_df = cache.get("ohlcv")
+    _, cached_json = cache.get("statement")
+    assert cached_df.equals(df)
+    assert cached_json == {"balance_sheet": [{"total_assets": 1}]}
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 2
+
+
+def test_shared_cache_evicts_least_recently_used(tmp_path):
+    cache = SharedCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    cache.put("A", {"v": 1})
+    cache.put("B", {"v": 2})
+    cache.get("A")
+    cache.put("C", {"v": 3})
+    assert cache.get("B") is None
+    assert cache.get("A") is not None
+    assert cache.stats()["entries"] == 2
+
+
+def _put(path: str):
+    SharedCache(path).put("http://sp/rsi/AAPL", {"from": "other worker"})
+
+
+def test_shared_cache_is_shared_across_processes(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    process = multiprocessing.get_context("spawn").Process(target=_put, args=(path,))
+    process.start()
+    process.join(30)
+
+    upstream = CountingComm()
+    comm = SharedCacheComm(upstream, SharedCache(path), default_ttl=60)
+    data = asyncio.run(comm.get("http://sp/rsi/AAPL"))
+    assert data == {"from": "other worker"}
+    assert upstream.calls == 0
+
+
+def test_shared_cache_comm_refetches_expired_entries(tmp_path):
+    upstream = CountingComm()
+    comm = SharedCacheComm(
+        upstream, SharedCache(str(tmp_path / "c.sqlite")), default_ttl=0
+    )
+
+    async def run():
+        await comm.get("http://sp/bb/AAPL")
+        return await comm.get("http://sp/bb/AAPL")
+
+    assert asyncio.run(run())["version"] == 2
+    assert upstream.calls == 2
+
+
+def test_cached_comm_keeps_the_age_of_shared_responses(tmp_path):
+    cache = SharedCache(str(tmp_path / "c.sqlite"))
+    cache.put("http://sp/rsi/AAPL", {"from": "other worker"})
+    # Stored by another worker 50 seconds ago
+    cache._connection().execute("UPDATE entries SET stored_at = stored_at - 50")
+
+    upstream = CountingComm()
+    comm = CachedComm(
+        SingleFlightComm(SharedCacheComm(upstream, cache, default_ttl=60)),
+        default_ttl=40,
+        stale_ttl=0,
+    )
+
+    async def run():
+        first = await comm.get("http://sp/rsi/AAPL")
+        # Already older than the in-process TTL, looked up again below
+        second = await comm.get("http://sp/rsi/AAPL")
+        return first, second
+
+    assert asyncio.run(run()) == ({"from": "other worker"},) * 2
+    assert upstream.calls == 0
+    assert comm.stats()["hits"] == 0
+    assert comm.stats()["misses"] == 2
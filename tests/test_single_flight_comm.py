@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import pytest
+
+from utils.comm_interface import CommunicationInterface
+from utils.single_flight_comm import SingleFlightComm
+
+
+class SlowComm(CommunicationInterface):
+    def __init__(self, delay: float = 0.1, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def get(self, endpoint: str, accept: str | None = None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("upstream down")
+        return {"endpoint": endpoint}
+
+
+def test_single_flight_coalesces_concurrent_requests():
+    upstream = SlowComm()
+    comm = SingleFlightComm(upstream)
+
+    async def run():
+        return await asyncio.gather(
+            comm.get("http://sp/rsi/AAPL"),
+            comm.get("http://sp/rsi/AAPL"),
+            comm.get("http://sp/bb/AAPL"),
+        )
+
+    rsi, rsi_again, bb = asyncio.run(run())
+    assert rsi is rsi_again
+    assert bb == {"endpoint": "http://sp/bb/AAPL"}
+    assert upstream.calls == 2
+    assert comm.coalesced == 1
+    assert comm._inflight == {}
+
+
+def test_single_flight_coalesces_across_threads():
+    upstream = SlowComm(delay=0.3)
+    comm = SingleFlightComm(upstream)
+    results = []
+
+    def worker():
+        results.append(asyncio.run(comm.get("http://sp/rsi/AAPL")))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 4
+    assert upstream.calls == 1
+
+
+def test_single_flight_shares_errors():
+    upstream = SlowComm(fail=True)
+    comm = SingleFlightComm(upstream)
+
+    async def run():
+        return await asyncio.gather(
+            comm.get("http://sp/rsi/AAPL"),
+            comm.get("http://sp/rsi/AAPL"),
+            return_exceptions=True,
+        )
+
+    errors = asyncio.run(run())
+    assert all(isinstance(e, ConnectionError) for e in errors)
+    assert upstream.calls == 1
+    with pytest.raises(ConnectionError):
+        asyncio.run(comm.get("http://sp/rsi/AAPL"))
+    assert upstream.calls == 2
@@ -0,0 +1,27 @@
+from fundamental import FinancialStatement, StatementStore
+
+PAYLOAD = {
+    "balance_sheet": [
+        {"current_assets": 10, "financial_facts": {"end_date": "2024-12-31"}}
+    ],
+    "cash_flow": [],
+    "income_statement": [],
+}
+
+
+def test_statement_store_validates_once_per_ticker():
+    store = StatementStore(max_entries=2)
+    statement = store.put(" aapl", PAYLOAD)
+    assert isinstance(statement, FinancialStatement)
+    assert store.get(store.key("AAPL ")) is statement
+    assert statement.balance_sheet[0].current_assets == 10
+
+
+def test_statement_store_evicts_least_recently_used():
+    store = StatementStore(max_entries=2)
+    for stock in ("A", "B"):
+        store.put(stock, PAYLOAD)
+    store.get("A")
+    store.put("C", PAYLOAD)
+    assert store.get("B") is None
+    assert store.get("A") is not None
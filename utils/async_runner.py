@@ -0,0 +1,125 @@
+import asyncio
+import atexit
+import concurrent.futures
+import os
+import threading
+from typing import Any, Coroutine
+
+from loguru import logger
+
+from utils.comm_interface import HttpComm
+
+
+class AsyncRunner:
+    """
+    Dedicated event loop running in a daemon thread. Synchronous code (Dash
+    callbacks) submits coroutines to it, so sessions and caches bound to the
+    loop survive from one callback to the next.
+    """
+
+    def __init__(self, timeout: float = 10.0):
+        self.timeout = timeout
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self.start()
+        return self._loop
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.is_running():
+                return
+            self._loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(self._loop)
+                self._loop.call_soon(ready.set)
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(
+                target=run_loop, name="vtrade-event-loop", daemon=True
+            )
+            self._thread.start()
+            ready.wait()
+            logger.debug("Started background event loop")
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """
+        Schedule a coroutine on the loop without waiting for it
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: float | None = None) -> Any:
+        """
+        Run a coroutine on the loop and block until it finishes. The coroutine
+        is cancelled if it does not finish within the timeout.
+        """
+        future = self.submit(coro)
+        try:
+            return future.result(timeout or self.timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Coroutine timed out after {timeout or self.timeout}s")
+
+    def stop(self):
+        with self._lock:
+            if not self.is_running():
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(HttpComm.close(), self._loop).result(5)
+            except Exception as e:
+                logger.error(f"Error closing HTTP session: {e}")
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(5)
+            self._loop.close()
+            self._thread = None
+            logger.debug("Stopped background event loop")
+
+
+_runner: AsyncRunner | None = None
+_runner_pid: int | None = None
+_runner_lock = threading.Lock()
+
+
+def _reset_runner_lock():
+    # A fork may copy the lock while another thread holds it
+    global _runner_lock
+    _runner_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_runner_lock)
+
+
+def get_runner() -> AsyncRunner:
+    """
+    Return the runner of the current process. A forked gunicorn worker gets
+    its own loop thread instead of the parent's.
+    """
+    global _runner, _runner_pid
+    if _runner is None or _runner_pid != os.getpid():
+        with _runner_lock:
+            if _runner is None or _runner_pid != os.getpid():
+                _runner = AsyncRunner(
+                    timeout=float(os.getenv("CALLBACK_TIMEOUT", "10"))
+                )
+                _runner_pid = os.getpid()
+    return _runner
+
+
+def run_async(coro: Coroutine, timeout: float | None = None) -> Any:
+    return get_runner().run(coro, timeout)
+
+
+def shutdown_runner():
+    if _runner is not None and _runner_pid == os.getpid():
+        _runner.stop()
+
+
+atexit.register(shutdown_runner)
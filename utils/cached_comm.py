@@ -0,0 +1,149 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from loguru import logger
+
+from utils.comm_interface import CommunicationInterface, cache_key, fetch_entry
+from utils.rate_limited_comm import BACKGROUND, request_priority
+
+# Time to live in seconds per endpoint family, matched against the URL path
+DEFAULT_TTLS = {
+    "/bestperf/": 6 * 3600,
+    "/history": 24 * 3600,
+}
+
+
+def ttl_for(endpoint: str, ttls: dict[str, float], default_ttl: float) -> float:
+    path = urlsplit(endpoint).path
+    for family, ttl in ttls.items():
+        if family in path:
+            return ttl
+    return default_ttl
+
+
+class CachedComm(CommunicationInterface):
+    """
+    Caching decorator around another CommunicationInterface. Responses are
+    kept in a bounded LRU keyed by URL. Expired entries are still served for
+    a stale window while a background task refreshes them.
+    """
+
+    def __init__(
+        self,
+        data_fetcher: CommunicationInterface,
+        max_entries: int = int(os.getenv("CACHE_MAX_ENTRIES", "512")),
+        default_ttl: float = float(os.getenv("CACHE_DEFAULT_TTL", "900")),
+        stale_ttl: float = float(os.getenv("CACHE_STALE_TTL", "3600")),
+        ttls: dict[str, float] | None = None,
+    ):
+        self._data_fetcher = data_fetcher
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+
+        self._entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def ttl_for(self, endpoint: str) -> float:
+        return ttl_for(endpoint, self.ttls, self.default_ttl)
+
+    async def get(self, endpoint: str, accept: str | None = None):
+        key = cache_key(endpoint, accept)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is not None:
+            fetched_at, data = entry
+            age = time.monotonic() - fetched_at
+            ttl = self.ttl_for(endpoint)
+            if age < ttl:
+                self.hits += 1
+                return data
+            if age < ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._schedule_refresh(endpoint, accept)
+                return data
+
+        try:
+            data = await self._fetch(endpoint, accept)
+        except Exception as e:
+            if entry is None:
+                self.misses += 1
+                raise
+            # Upstream is failing, an outdated response beats none
+            logger.warning(f"Serving expired response of {endpoint}: {e}")
+            self.stale_hits += 1
+            return entry[1]
+        self.misses += 1
+        return data
+
+    def invalidate(self, endpoint: str | None = None, accept: str | None = None):
+        with self._lock:
+            if endpoint is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(cache_key(endpoint, accept), None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
+
+    async def _fetch(self, endpoint: str, accept: str | None = None):
+        fetched_at, data = await fetch_entry(self._data_fetcher, endpoint, accept)
+        if data is not None:
+            # A response served by a cache below is as old as it was there
+            age = max(time.time() - fetched_at, 0.0)
+            self._store(cache_key(endpoint, accept), data, time.monotonic() - age)
+        return data
+
+    def _store(self, key: str, data, fetched_at: float):
+        with self._lock:
+            self._entries[key] = (fetched_at, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _schedule_refresh(self, endpoint: str, accept: str | None = None):
+        key = cache_key(endpoint, accept)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                with request_priority(BACKGROUND):
+                    await self._fetch(endpoint, accept)
+                logger.debug(f"Revalidated cached response of {endpoint}")
+            except Exception as e:
+                logger.error(f"Error revalidating {endpoint}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
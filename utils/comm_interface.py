@@ -1,26 +1,295 @@
 from abc import ABC, abstractmethod
+import asyncio
+import io
+import os
+import time
 import aiohttp
+from urllib.parse import urlsplit
+import polars as pl
 
 from loguru import logger
 
+from utils.resilience import (
+    CircuitBreaker,
+    LatencyTracker,
+    backoff,
+    endpoint_family,
+    take_attempt_token,
+)
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+ARROW_FILE = "application/vnd.apache.arrow.file"
+PARQUET = "application/vnd.apache.parquet"
+
+# Accept headers per wire format, JSON stays acceptable as a fallback
+WIRE_FORMATS = {
+    "json": None,
+    "arrow": f"{ARROW_STREAM}, {ARROW_FILE}, application/json;q=0.5",
+    "parquet": f"{PARQUET}, application/json;q=0.5",
+}
+
 
 class CommunicationInterface(ABC):
     @abstractmethod
-    async def get(endpoint: str):
+    async def get(endpoint: str, accept: str | None = None):
         pass
 
 
+def cache_key(endpoint: str, accept: str | None = None) -> str:
+    return endpoint if accept is None else f"{endpoint} [{accept}]"
+
+
+async def fetch_entry(
+    data_fetcher: CommunicationInterface, endpoint: str, accept: str | None = None
+) -> tuple[float, object]:
+    """
+    Response of a fetcher and the wall-clock time it was fetched at. Caches
+    with a get_entry() report when they stored the response they served.
+    """
+    get_entry = getattr(data_fetcher, "get_entry", None)
+    if get_entry is None:
+        return time.time(), await data_fetcher.get(endpoint, accept)
+    return await get_entry(endpoint, accept)
+
+
+def decode_columnar(content_type: str, body: bytes) -> pl.DataFrame | None:
+    """
+    Decode an Arrow IPC or Parquet body straight into polars, returns None
+    for other content types
+    """
+    if content_type == ARROW_STREAM:
+        return pl.read_ipc_stream(body)
+    if content_type == ARROW_FILE:
+        return pl.read_ipc(body, memory_map=False)
+    if content_type in (PARQUET, "application/x-parquet"):
+        return pl.read_parquet(io.BytesIO(body))
+    return None
+
+
+def parse_families(value: str, cast=float) -> dict:
+    """
+    Per endpoint family settings like "bestperf=10,history=8"
+    """
+    return {
+        family.strip(): cast(setting.strip())
+        for family, _, setting in (
+            item.partition("=") for item in value.split(",") if "=" in item
+        )
+    }
+
+
 class HttpComm(CommunicationInterface):
-    @staticmethod
-    async def get(endpoint: str):
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                endpoint, timeout=aiohttp.ClientTimeout(total=5)
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    logger.debug(f"Received response from {endpoint}")
-                    return data
+    """
+    HTTP client backed by one pooled aiohttp session per event loop, so
+    keep-alive connections and DNS lookups are reused across requests.
+    GETs time out per endpoint family and are retried with jittered backoff
+    on timeouts, connection errors and 5xx/429 responses. Optionally a
+    second request is hedged once the first one is slower than a latency
+    percentile. Each upstream host has a circuit breaker, while it is open
+    calls fail fast with CircuitOpenError.
+    """
+
+    pool_limit = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+    pool_limit_per_host = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "20"))
+    keepalive_timeout = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+    dns_cache_ttl = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+
+    timeout = float(os.getenv("HTTP_TIMEOUT", "5"))
+    # Timeouts per endpoint family, e.g. HTTP_TIMEOUTS="bestperf=10,rsi=3"
+    timeouts = parse_families(os.getenv("HTTP_TIMEOUTS", ""))
+    retries = max(int(os.getenv("HTTP_RETRIES", "2")), 0)
+    # Budget of a GET and its retries, never past the callback awaiting it
+    deadline = min(
+        float(os.getenv("HTTP_DEADLINE", "inf")),
+        float(os.getenv("CALLBACK_TIMEOUT", "10")),
+    )
+    retry_backoff = float(os.getenv("HTTP_RETRY_BACKOFF", "0.1"))
+    retry_backoff_cap = float(os.getenv("HTTP_RETRY_BACKOFF_CAP", "1"))
+    # Latency percentile after which a hedged request is sent, 0 disables
+    hedge_percentile = float(os.getenv("HTTP_HEDGE_PERCENTILE", "0"))
+
+    _sessions: dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+    _breakers: dict[str, CircuitBreaker] = {}
+    _latencies = LatencyTracker()
+    hedges = 0
+
+    @classmethod
+    def _get_session(cls) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        # Sessions bound to loops that are already gone can't be reused
+        for stale_loop in [lp for lp in cls._sessions if lp.is_closed()]:
+            cls._sessions.pop(stale_loop)
+
+        session = cls._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=cls.pool_limit,
+                limit_per_host=cls.pool_limit_per_host,
+                keepalive_timeout=cls.keepalive_timeout,
+                ttl_dns_cache=cls.dns_cache_ttl,
+                use_dns_cache=True,
+            )
+            session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=cls.timeout)
+            )
+            cls._sessions[loop] = session
+            logger.debug("Created pooled HTTP session")
+        return session
+
+    @classmethod
+    async def close(cls):
+        """
+        Close the pooled session of the running event loop
+        """
+        session = cls._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+            logger.debug("Closed pooled HTTP session")
+
+    @classmethod
+    def shutdown(cls):
+        """
+        Close every pooled session from synchronous code, e.g. on worker exit
+        """
+        for loop, session in list(cls._sessions.items()):
+            cls._sessions.pop(loop, None)
+            if loop.is_closed() or session.closed:
+                continue
+            try:
+                if loop.is_running():
+                    asyncio.run_coroutine_threadsafe(session.close(), loop).result(5)
                 else:
-                    logger.debug(f"Failed to fetch data from {endpoint}")
-                    return None
+                    loop.run_until_complete(session.close())
+            except Exception as e:
+                logger.error(f"Error closing HTTP session: {e}")
+
+    @classmethod
+    def breaker(cls, endpoint: str) -> CircuitBreaker:
+        host = urlsplit(endpoint).netloc
+        breaker = cls._breakers.get(host)
+        if breaker is None:
+            breaker = cls._breakers.setdefault(host, CircuitBreaker(host))
+        return breaker
+
+    @classmethod
+    def breaker_states(cls) -> dict[str, str]:
+        return {host: breaker.state for host, breaker in cls._breakers.items()}
+
+    @classmethod
+    def timeout_for(cls, endpoint: str) -> float:
+        return cls.timeouts.get(endpoint_family(endpoint), cls.timeout)
+
+    @classmethod
+    async def get(cls, endpoint: str, accept: str | None = None):
+        breaker = cls.breaker(endpoint)
+        breaker.check()
+        try:
+            status, data = await cls._get_with_retries(endpoint, accept)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        if status >= 500 or status == 429:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return data
+
+    @classmethod
+    async def _get_with_retries(cls, endpoint: str, accept: str | None = None):
+        """
+        Attempts of a GET within the deadline. No retry is started that
+        couldn't begin before the deadline, the last outcome is returned or
+        raised instead.
+        """
+        retries = max(cls.retries, 0)
+        deadline = time.monotonic() + cls.deadline
+        attempt = 0
+        while True:
+            error = None
+            try:
+                status, data = await asyncio.wait_for(
+                    cls._attempt(endpoint, accept, attempt > 0),
+                    deadline - time.monotonic(),
+                )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error, reason = e, type(e).__name__
+            else:
+                if status < 500 and status != 429:
+                    return status, data
+                reason = f"status {status}"
+
+            delay = backoff(attempt, cls.retry_backoff, cls.retry_backoff_cap)
+            if attempt >= retries or time.monotonic() + delay >= deadline:
+                if error is not None:
+                    raise error
+                return status, data
+            logger.debug(f"Retrying {endpoint} after {reason}")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    @classmethod
+    async def _attempt(cls, endpoint: str, accept: str | None, retry: bool):
+        if retry:
+            await take_attempt_token()
+        return await cls._hedged(endpoint, accept)
+
+    @classmethod
+    async def _hedged(cls, endpoint: str, accept: str | None = None):
+        """
+        Request once, and a second time if the first is slower than the
+        hedge percentile of its family. The first response wins.
+        """
+        delay = None
+        if cls.hedge_percentile > 0:
+            delay = cls._latencies.percentile(
+                endpoint_family(endpoint), cls.hedge_percentile
+            )
+        if delay is None:
+            return await cls._request(endpoint, accept)
+
+        first = asyncio.ensure_future(cls._request(endpoint, accept))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+        await take_attempt_token()
+        if first.done():
+            return first.result()
+        cls.hedges += 1
+        logger.debug(f"Hedging {endpoint} after {delay * 1000:.0f}ms")
+        pending = {first, asyncio.ensure_future(cls._request(endpoint, accept))}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None or not pending:
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @classmethod
+    async def _request(cls, endpoint: str, accept: str | None = None):
+        session = cls._get_session()
+        headers = {"Accept": accept} if accept else None
+        timeout = aiohttp.ClientTimeout(total=cls.timeout_for(endpoint))
+        start = time.monotonic()
+        async with session.get(endpoint, headers=headers, timeout=timeout) as response:
+            if response.status == 200:
+                data = decode_columnar(response.content_type, await response.read())
+                if data is None:
+                    data = await response.json()
+                cls._latencies.record(
+                    endpoint_family(endpoint), time.monotonic() - start
+                )
+                logger.debug(f"Received {response.content_type} from {endpoint}")
+                return response.status, data
+            else:
+                logger.debug(
+                    f"Failed to fetch data from {endpoint}: status {response.status}"
+                )
+                return response.status, None
@@ -0,0 +1,92 @@
+"""
+Downsampling of chart series, so the browser receives a bounded number of
+points however long the price history is. Candlesticks are aggregated into
+OHLC buckets, line series are thinned with Largest-Triangle-Three-Buckets.
+"""
+
+from datetime import date
+
+import numpy as np
+
+
+def ohlc_buckets(
+    arrays: dict[str, np.ndarray], max_points: int
+) -> dict[str, np.ndarray]:
+    """
+    Aggregate consecutive bars into at most max_points buckets: first open,
+    highest high, lowest low and last close, dated by the first bar
+    """
+    n = len(arrays["close"])
+    if n <= max_points:
+        return arrays
+    size = -(-n // max_points)
+    starts = np.arange(0, n, size)
+    ends = np.minimum(starts + size, n) - 1
+    return {
+        **arrays,
+        "datetime": arrays["datetime"][starts],
+        "open": arrays["open"][starts],
+        "high": np.maximum.reduceat(arrays["high"], starts),
+        "low": np.minimum.reduceat(arrays["low"], starts),
+        "close": arrays["close"][ends],
+    }
+
+
+def lttb(values: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Indices of the points of a line that Largest-Triangle-Three-Buckets
+    keeps. NaN points, e.g. the warm-up of a moving average, are dropped.
+    """
+    finite = np.flatnonzero(np.isfinite(values))
+    n = len(finite)
+    if n <= max_points or max_points < 3:
+        return finite
+
+    x = finite.astype(np.float64)
+    y = values[finite].astype(np.float64)
+    # First and last points are kept, the rest is split into equal buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    bounds = np.append(edges, n)
+    counts = np.diff(bounds)
+    mean_x = np.add.reduceat(x, bounds[:-1]) / counts
+    mean_y = np.add.reduceat(y, bounds[:-1]) / counts
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Triangle areas against the previous pick and the next bucket's mean
+        areas = np.abs(
+            (x[a] - mean_x[i + 1]) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (mean_y[i + 1] - y[a])
+        )
+        a = lo + int(areas.argmax())
+        selected[i + 1] = a
+    return finite[selected]
+
+
+def zoom_window(relayout: dict | None) -> tuple[date, date] | None:
+    """
+    Dates of the x-axis window a graph's relayoutData zoomed to, None when
+    it was reset to the full range
+    """
+    if not relayout or relayout.get("xaxis.autorange"):
+        return None
+    if "xaxis.range" in relayout:
+        start, end = relayout["xaxis.range"]
+    elif "xaxis.range[0]" in relayout and "xaxis.range[1]" in relayout:
+        start, end = relayout["xaxis.range[0]"], relayout["xaxis.range[1]"]
+    else:
+        return None
+    return date.fromisoformat(str(start)[:10]), date.fromisoformat(str(end)[:10])
+
+
+def is_zoom(relayout: dict | None) -> bool:
+    """
+    Whether relayoutData changed the x-axis range, other layout changes
+    like a drag mode switch don't need a re-render
+    """
+    return bool(relayout) and any(
+        key.startswith("xaxis.range") or key == "xaxis.autorange" for key in relayout
+    )
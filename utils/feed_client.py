@@ -0,0 +1,223 @@
+"""
+Streaming price feed over a websocket. The client subscribes to tickers and
+folds the bars and ticks it receives into a bounded buffer per ticker, which
+the charts read to extend themselves instead of refetching. Bars are daily
+like the charts' history, dated in the exchange's time zone.
+
+Messages are JSON objects. The client sends
+    {"action": "subscribe" | "unsubscribe", "symbols": ["AAPL", ...]}
+and receives bars
+    {"type": "bar", "symbol": "AAPL", "datetime": "...", "open": ..., ...}
+or trades
+    {"type": "tick", "symbol": "AAPL", "timestamp": epoch seconds, "price": ...}
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from loguru import logger
+from websockets.asyncio.client import connect
+
+from utils.resilience import backoff
+
+PRICE_FIELDS = ["open", "high", "low", "close"]
+# Time zone of the exchange, a trading day ends at its local midnight
+EXCHANGE_TZ = os.getenv("STREAM_TIMEZONE", "America/New_York")
+
+
+class BarBuffer:
+    """
+    Most recent daily bars of one ticker, dated "%Y-%m-%d" like the price
+    history so the forming bar lines up with the chart's last one. Ticks and
+    intraday bars are folded into the bar of their trading day in `tz`. The
+    version increases with every change, so readers can skip unchanged
+    buffers.
+    """
+
+    def __init__(
+        self,
+        max_bars: int = int(os.getenv("STREAM_BUFFER_BARS", "500")),
+        tz: str = EXCHANGE_TZ,
+    ):
+        self.tz = ZoneInfo(tz)
+        self.version = 0
+        self._bars: deque[dict] = deque(maxlen=max_bars)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._bars)
+
+    def trading_day(self, when: str | float) -> str:
+        """
+        Exchange date of an epoch timestamp or an ISO date or time. Times
+        without a zone are UTC.
+        """
+        if isinstance(when, str):
+            if len(when) <= 10:
+                return when
+            moment = datetime.fromisoformat(when)
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+        else:
+            moment = datetime.fromtimestamp(when, timezone.utc)
+        return moment.astimezone(self.tz).strftime("%Y-%m-%d")
+
+    def add_bar(self, when: str, bar: dict):
+        self._fold(self.trading_day(when), {f: float(bar[f]) for f in PRICE_FIELDS})
+
+    def add_tick(self, timestamp: float, price: float):
+        self._fold(self.trading_day(timestamp), dict.fromkeys(PRICE_FIELDS, price))
+
+    def _fold(self, day: str, bar: dict):
+        with self._lock:
+            last = self._bars[-1] if self._bars else None
+            if last is not None and last["datetime"] == day:
+                last["high"] = max(last["high"], bar["high"])
+                last["low"] = min(last["low"], bar["low"])
+                last["close"] = bar["close"]
+            elif last is None or last["datetime"] < day:
+                self._bars.append({"datetime": day, **bar})
+            else:
+                # Late bars of the past are left to the REST history
+                return
+            self.version += 1
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        with self._lock:
+            bars = list(self._bars)
+        return {
+            "datetime": np.array([b["datetime"] for b in bars], dtype=object),
+            **{
+                f: np.array([b[f] for b in bars], dtype=np.float64)
+                for f in PRICE_FIELDS
+            },
+        }
+
+
+class FeedClient:
+    """
+    Websocket client running on the background event loop. It reconnects
+    with jittered backoff and resubscribes the tickers it follows. Tickers
+    whose buffer wasn't read for `idle_after` seconds are unsubscribed on
+    the next subscription, as several sessions may follow the same ticker.
+    """
+
+    def __init__(
+        self,
+        url: str = os.getenv("STREAM_URL", "ws://strategy-processor:8000/ws"),
+        max_bars: int = int(os.getenv("STREAM_BUFFER_BARS", "500")),
+        tz: str = EXCHANGE_TZ,
+        idle_after: float = float(os.getenv("STREAM_IDLE_SECONDS", "600")),
+    ):
+        self.url = url
+        self.max_bars = max_bars
+        self.tz = tz
+        self.idle_after = idle_after
+        self.buffers: dict[str, BarBuffer] = {}
+        self._read: dict[str, float] = {}
+        self.symbols: set[str] = set()
+        self.connected = asyncio.Event()
+        self._ws = None
+        self._task: asyncio.Task | None = None
+        self._lock = threading.Lock()
+
+    def buffer(self, stock: str) -> BarBuffer | None:
+        stock = stock.strip().upper()
+        buffer = self.buffers.get(stock)
+        if buffer is not None:
+            self._read[stock] = time.monotonic()
+        return buffer
+
+    async def subscribe(self, stock: str):
+        stock = stock.strip().upper()
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                s
+                for s in self.symbols
+                if s != stock and now - self._read.get(s, now) > self.idle_after
+            ]
+            self.symbols.add(stock)
+            self.buffers.setdefault(stock, BarBuffer(self.max_bars, self.tz))
+            self._read[stock] = now
+        self.start()
+        await self._send("subscribe", [stock])
+        for s in idle:
+            await self.unsubscribe(s)
+
+    async def unsubscribe(self, stock: str):
+        stock = stock.strip().upper()
+        with self._lock:
+            self.symbols.discard(stock)
+            self.buffers.pop(stock, None)
+            self._read.pop(stock, None)
+        await self._send("unsubscribe", [stock])
+
+    def start(self):
+        """
+        Start the connection task on the running loop unless it runs already
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self):
+        attempt = 0
+        while True:
+            try:
+                async with connect(self.url) as ws:
+                    self._ws = ws
+                    attempt = 0
+                    if self.symbols:
+                        await self._send("subscribe", sorted(self.symbols))
+                    self.connected.set()
+                    logger.info(f"Connected to price feed {self.url}")
+                    async for message in ws:
+                        self.handle(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Price feed connection failed: {e}")
+            finally:
+                self._ws = None
+                self.connected.clear()
+            await asyncio.sleep(backoff(attempt, 0.5, 30))
+            attempt += 1
+
+    def handle(self, message: str | bytes):
+        try:
+            data = json.loads(message)
+            buffer = self.buffers.get(str(data["symbol"]).upper())
+            if buffer is None:
+                return
+            if data.get("type") == "tick":
+                buffer.add_tick(float(data["timestamp"]), float(data["price"]))
+            else:
+                buffer.add_bar(str(data["datetime"]), data)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Ignored feed message {message!r}: {e}")
+
+    async def _send(self, action: str, symbols: list[str]):
+        ws = self._ws
+        if ws is None:
+            # Sent on connect
+            return
+        try:
+            await ws.send(json.dumps({"action": action, "symbols": symbols}))
+        except Exception as e:
+            logger.warning(f"Error sending {action} to the price feed: {e}")
@@ -0,0 +1,85 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+import plotly.graph_objects as go
+from loguru import logger
+
+
+class FigureCache:
+    """
+    Bounded LRU of serialized plotly figures. Entries are accounted by the
+    size of their JSON, the least recently used ones are evicted once either
+    the byte or the entry limit is exceeded. Entries expire after `ttl`
+    seconds, so figures are rebuilt from data the data cache revalidated.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = int(os.getenv("FIGURE_CACHE_MAX_BYTES", str(64 * 2**20))),
+        max_entries: int = int(os.getenv("FIGURE_CACHE_MAX_ENTRIES", "256")),
+        ttl: float = float(os.getenv("FIGURE_CACHE_TTL", "900")),
+    ):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._entries: OrderedDict[Hashable, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] >= self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            serialized = entry[1]
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return json.loads(serialized)
+
+    def put(self, key: Hashable, fig: go.Figure):
+        serialized = fig.to_json()
+        if len(serialized) > self.max_bytes:
+            logger.debug(f"Figure of {len(serialized)} bytes is too large to cache")
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic(), serialized)
+            self.size += len(serialized)
+            while self.size > self.max_bytes or len(self._entries) > self.max_entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,202 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import numpy as np
+from loguru import logger
+
+from utils.comm_interface import CommunicationInterface
+from utils.resilience import attempt_tokens
+
+# Priority classes, lower values are served first
+INTERACTIVE = 0
+BACKGROUND = 1
+BATCH = 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background", BATCH: "batch"}
+
+# Priority of the requests made from the current context, Dash callbacks
+# run with the default
+_priority = contextvars.ContextVar("request_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority: int):
+    """
+    Run the requests of a block, and of the tasks it starts, at a priority
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+# RATE_LIMIT_PER_SECOND and RATE_LIMIT_BURST are the quota of the API key,
+# each gunicorn worker keeps its own bucket with an equal share of it
+WORKERS = max(int(os.getenv("WEB_CONCURRENCY", "1")), 1)
+RATE = float(os.getenv("RATE_LIMIT_PER_SECOND", "10")) / WORKERS
+BURST = max(float(os.getenv("RATE_LIMIT_BURST", "20")) / WORKERS, 1)
+
+# Hosts billed against the quota, by default the strategy-processor whose
+# market data is metered. Other services, e.g. fundamentals, aren't limited.
+METERED_HOSTS = {
+    host.strip()
+    for host in os.getenv(
+        "RATE_LIMIT_HOSTS",
+        urlsplit(
+            os.getenv("STRATEGY_PROCESSOR_URL", "http://strategy-processor:8000")
+        ).netloc,
+    ).split(",")
+    if host.strip()
+}
+
+
+class RateLimitedComm(CommunicationInterface):
+    """
+    Token bucket in front of another CommunicationInterface, so bursts can't
+    exhaust the upstream's market data quota. Requests beyond the burst wait
+    in a priority queue: interactive requests always go before background
+    refreshes and batch scans, requests of the same class in arrival order.
+    Only requests to `hosts` take tokens, None limits every request. Retries
+    and hedges of the HTTP client below take a token each as well.
+    """
+
+    def __init__(
+        self,
+        data_fetcher: CommunicationInterface,
+        rate: float = RATE,
+        burst: float = BURST,
+        hosts: set[str] | None = METERED_HOSTS,
+        samples: int = 1000,
+    ):
+        self._data_fetcher = data_fetcher
+        self.hosts = hosts
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._updated = time.monotonic()
+
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._dispatcher: asyncio.Task | None = None
+
+        self._waits = {p: deque(maxlen=samples) for p in PRIORITY_NAMES}
+        self._requests = {p: 0 for p in PRIORITY_NAMES}
+
+    async def get(self, endpoint: str, accept: str | None = None):
+        if self.rate <= 0 or not self.metered(endpoint):
+            return await self._data_fetcher.get(endpoint, accept)
+        priority = current_priority()
+        waited = await self.acquire(priority)
+        if waited > 0:
+            logger.debug(
+                f"Queued {PRIORITY_NAMES[priority]} request to {endpoint} "
+                f"for {waited * 1000:.0f}ms"
+            )
+        token = attempt_tokens.set(lambda: self.acquire(priority))
+        try:
+            return await self._data_fetcher.get(endpoint, accept)
+        finally:
+            attempt_tokens.reset(token)
+
+    def metered(self, endpoint: str) -> bool:
+        return self.hosts is None or urlsplit(endpoint).netloc in self.hosts
+
+    async def acquire(self, priority: int = INTERACTIVE) -> float:
+        """
+        Take a token, waiting behind requests of the same or a higher
+        priority. Returns the time spent in the queue.
+        """
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._refill()
+            if not self._waiters and self.tokens >= 1:
+                self.tokens -= 1
+                self._record(priority, 0.0)
+                return 0.0
+            future = loop.create_future()
+            heapq.heappush(self._waiters, (priority, next(self._seq), future))
+            if self._dispatcher is None or self._dispatcher.done():
+                self._dispatcher = loop.create_task(self._dispatch())
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if future.done() and not future.cancelled():
+                    # The token was granted already, give it back
+                    self.tokens = min(self.burst, self.tokens + 1)
+            raise
+        waited = time.monotonic() - start
+        with self._lock:
+            self._record(priority, waited)
+        return waited
+
+    async def _dispatch(self):
+        """
+        Hand out tokens to the queued requests as the bucket refills
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                while self._waiters and self.tokens >= 1:
+                    _, _, future = heapq.heappop(self._waiters)
+                    if future.done():
+                        continue
+                    self.tokens -= 1
+                    future.get_loop().call_soon_threadsafe(self._grant, future)
+                # Drop requests cancelled while queued
+                while self._waiters and self._waiters[0][2].done():
+                    heapq.heappop(self._waiters)
+                if not self._waiters:
+                    self._dispatcher = None
+                    return
+                delay = (1 - self.tokens) / self.rate
+            await asyncio.sleep(delay)
+
+    def _grant(self, future: asyncio.Future):
+        if future.done():
+            # Cancelled after it was dequeued, the token goes back
+            with self._lock:
+                self.tokens = min(self.burst, self.tokens + 1)
+        else:
+            future.set_result(None)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _record(self, priority: int, waited: float):
+        self._requests[priority] += 1
+        self._waits[priority].append(waited)
+
+    def stats(self) -> dict:
+        """
+        Queue time per priority class over the most recent requests
+        """
+        with self._lock:
+            self._refill()
+            stats = {"tokens": round(self.tokens, 3), "queued": len(self._waiters)}
+            for priority, name in PRIORITY_NAMES.items():
+                waits = np.asarray(self._waits[priority])
+                stats[name] = {
+                    "requests": self._requests[priority],
+                    "mean_wait": float(waits.mean()) if len(waits) else 0.0,
+                    "p95_wait": float(np.percentile(waits, 95)) if len(waits) else 0.0,
+                    "max_wait": float(waits.max()) if len(waits) else 0.0,
+                }
+        return stats
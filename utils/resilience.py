@@ -0,0 +1,149 @@
+"""
+Building blocks keeping upstream calls bounded in time: circuit breakers
+failing fast while an upstream is unhealthy, latency tracking for hedged
+requests, jittered retry backoff and the token source billing retries and
+hedges like first attempts.
+"""
+
+import contextvars
+import os
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import numpy as np
+from loguru import logger
+
+
+class CircuitOpenError(ConnectionError):
+    """
+    Raised instead of calling an upstream whose circuit is open
+    """
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive failed calls and rejects calls until
+    `reset_after` seconds passed. A single trial call is then let through,
+    its outcome closes the circuit or opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failures: int = int(os.getenv("HTTP_BREAKER_FAILURES", "5")),
+        reset_after: float = float(os.getenv("HTTP_BREAKER_RESET", "30")),
+    ):
+        self.name = name
+        self.failures = failures
+        self.reset_after = reset_after
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_after:
+            return "open"
+        return "half-open"
+
+    def check(self):
+        """
+        Raise CircuitOpenError unless a call may go through
+        """
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return
+        raise CircuitOpenError(f"Circuit of {self.name} is open")
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"Circuit of {self.name} closed")
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def release(self):
+        """
+        Let another trial call through, e.g. after this one was cancelled
+        """
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self._trial or self.consecutive_failures >= self.failures:
+                if self.opened_at is None or self._trial:
+                    logger.warning(f"Circuit of {self.name} opened")
+                self.opened_at = time.monotonic()
+                self._trial = False
+
+
+class LatencyTracker:
+    """
+    Recent latencies of successful requests per endpoint family
+    """
+
+    def __init__(self, samples: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._latencies: dict[str, deque] = {}
+        self._samples = samples
+        self._lock = threading.Lock()
+
+    def record(self, family: str, seconds: float):
+        with self._lock:
+            latencies = self._latencies.setdefault(family, deque(maxlen=self._samples))
+            latencies.append(seconds)
+
+    def percentile(self, family: str, q: float) -> float | None:
+        """
+        q-th percentile latency of a family, None until enough samples
+        """
+        with self._lock:
+            latencies = np.asarray(self._latencies.get(family, ()))
+        if len(latencies) < self.min_samples:
+            return None
+        return float(np.percentile(latencies, q))
+
+
+def endpoint_family(endpoint: str) -> str:
+    """
+    First path segment of an endpoint's URL, e.g. "rsi" or "bestperf".
+    Ticker specific paths like "/AAPL/history" use their last segment.
+    """
+    parts = [p for p in urlsplit(endpoint).path.split("/") if p]
+    if not parts:
+        return ""
+    return parts[-1] if len(parts) == 2 and parts[-1] == "history" else parts[0]
+
+
+def backoff(attempt: int, base: float, cap: float) -> float:
+    """
+    Full jitter exponential backoff before retry number `attempt` (0 based)
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+# Takes a token for another attempt of the request being made, set by a rate
+# limiter above the HTTP client
+attempt_tokens = contextvars.ContextVar("attempt_tokens", default=None)
+
+
+async def take_attempt_token():
+    """
+    Wait for a token before a retry or hedge, if a rate limiter is above
+    """
+    acquire = attempt_tokens.get()
+    if acquire is not None:
+        await acquire()
@@ -0,0 +1,226 @@
+import asyncio
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import polars as pl
+from loguru import logger
+
+from utils.cached_comm import DEFAULT_TTLS, ttl_for
+from utils.comm_interface import CommunicationInterface, cache_key, fetch_entry
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+"""
+
+
+def encode(data) -> tuple[str, bytes]:
+    """
+    Polars frames are stored as Arrow IPC, anything else as JSON
+    """
+    if isinstance(data, pl.DataFrame):
+        return "arrow", data.write_ipc(None).getvalue()
+    return "json", json.dumps(data).encode()
+
+
+def decode(kind: str, value: bytes):
+    if kind == "arrow":
+        return pl.read_ipc(io.BytesIO(value), memory_map=False)
+    return json.loads(value)
+
+
+class SharedCache:
+    """
+    Cache shared by every worker process of the host, backed by an embedded
+    SQLite file in WAL mode. Entries are accounted by their encoded size and
+    the least recently used ones are evicted once either the byte or the
+    entry limit is exceeded. Errors of the store are logged and treated as
+    misses, the cache never fails a request.
+    """
+
+    def __init__(
+        self,
+        path: str = os.getenv(
+            "SHARED_CACHE_PATH",
+            os.path.join(tempfile.gettempdir(), "vtrade-cache.sqlite"),
+        ),
+        max_bytes: int = int(os.getenv("SHARED_CACHE_MAX_BYTES", str(256 * 2**20))),
+        max_entries: int = int(os.getenv("SHARED_CACHE_MAX_ENTRIES", "4096")),
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        # sqlite3 connections can't be shared between threads
+        self._local = threading.local()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> tuple[float, object] | None:
+        """
+        Wall-clock time the entry was stored at and its data, None on a miss
+        """
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT kind, value, stored_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            kind, value, stored_at = row
+            data = decode(kind, value)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error reading shared cache entry {key}: {e}")
+            return None
+        self.hits += 1
+        return stored_at, data
+
+    def put(self, key: str, data):
+        try:
+            kind, value = encode(data)
+        except Exception as e:
+            logger.debug(f"Response of {key} can't be shared: {e}")
+            return
+        if len(value) > self.max_bytes:
+            logger.debug(f"Response of {len(value)} bytes is too large to share")
+            return
+        now = time.time()
+        try:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, kind, value, len(value), now, now),
+                )
+                self.evictions += self._evict(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error writing shared cache entry {key}: {e}")
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        entries, size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        evicted = 0
+        if entries <= self.max_entries and size <= self.max_bytes:
+            return evicted
+        rows = conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at"
+        ).fetchall()
+        for key, entry_size in rows:
+            if entries <= self.max_entries and size <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            entries -= 1
+            size -= entry_size
+            evicted += 1
+        return evicted
+
+    def clear(self):
+        try:
+            self._connection().execute("DELETE FROM entries")
+        except Exception as e:
+            logger.error(f"Error clearing shared cache: {e}")
+
+    def stats(self) -> dict:
+        try:
+            entries, size = (
+                self._connection()
+                .execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries")
+                .fetchone()
+            )
+        except Exception:
+            entries, size = 0, 0
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class SharedCacheComm(CommunicationInterface):
+    """
+    Caching decorator backed by a SharedCache, so a response fetched by one
+    worker is served to the others. Entries older than the TTL of their
+    endpoint family are fetched again. The store is accessed from a thread
+    to keep the event loop free. get_entry() reports when a served response
+    was stored, so caches above don't restart its TTL.
+    """
+
+    def __init__(
+        self,
+        data_fetcher: CommunicationInterface,
+        cache: SharedCache | None = None,
+        default_ttl: float = float(os.getenv("CACHE_DEFAULT_TTL", "900")),
+        ttls: dict[str, float] | None = None,
+    ):
+        self._data_fetcher = data_fetcher
+        self.cache = SharedCache() if cache is None else cache
+        self.default_ttl = default_ttl
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+
+    async def get(self, endpoint: str, accept: str | None = None):
+        _, data = await self.get_entry(endpoint, accept)
+        return data
+
+    async def get_entry(
+        self, endpoint: str, accept: str | None = None
+    ) -> tuple[float, object]:
+        key = cache_key(endpoint, accept)
+        entry = await asyncio.to_thread(self.cache.get, key)
+        if entry is not None:
+            stored_at, _ = entry
+            if time.time() - stored_at < ttl_for(endpoint, self.ttls, self.default_ttl):
+                logger.debug(f"Served {endpoint} from the shared cache")
+                return entry
+
+        try:
+            fetched = await fetch_entry(self._data_fetcher, endpoint, accept)
+        except Exception as e:
+            if entry is None:
+                raise
+            # Upstream is failing, an outdated response beats none
+            logger.warning(f"Serving expired shared response of {endpoint}: {e}")
+            return entry
+        if fetched[1] is not None:
+            await asyncio.to_thread(self.cache.put, key, fetched[1])
+        return fetched
@@ -0,0 +1,66 @@
+import asyncio
+import concurrent.futures
+import threading
+
+from loguru import logger
+
+from utils.comm_interface import CommunicationInterface, cache_key, fetch_entry
+
+
+class SingleFlightComm(CommunicationInterface):
+    """
+    Coalesces concurrent requests for the same URL. The first caller fetches
+    from upstream, every other caller awaits its shared future. The futures
+    are thread-safe, so callers from different threads or event loops of the
+    same worker are coalesced as well.
+    """
+
+    def __init__(self, data_fetcher: CommunicationInterface):
+        self._data_fetcher = data_fetcher
+        self._inflight: dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    async def get(self, endpoint: str, accept: str | None = None):
+        _, data = await self.get_entry(endpoint, accept)
+        return data
+
+    async def get_entry(
+        self, endpoint: str, accept: str | None = None
+    ) -> tuple[float, object]:
+        key = cache_key(endpoint, accept)
+        while True:
+            with self._lock:
+                future = self._inflight.get(key)
+                if future is None:
+                    future = concurrent.futures.Future()
+                    self._inflight[key] = future
+                    break
+                self.coalesced += 1
+
+            logger.debug(f"Joined in-flight request to {endpoint}")
+            try:
+                # Shield so a cancelled follower doesn't cancel the shared future
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leading request was cancelled, try to lead a new one
+
+        try:
+            entry = await fetch_entry(self._data_fetcher, endpoint, accept)
+        except asyncio.CancelledError:
+            self._release(key)
+            future.cancel()
+            raise
+        except Exception as e:
+            self._release(key)
+            future.set_exception(e)
+            raise
+        self._release(key)
+        future.set_result(entry)
+        return entry
+
+    def _release(self, key: str):
+        with self._lock:
+            self._inflight.pop(key, None)
@@ -1,4 +1,6 @@
 from loguru import logger
+import hashlib
+import numpy as np
 import polars as pl
 import time
 from dotenv import load_dotenv
@@ -34,3 +36,26 @@ def df_is_none(df: pl.DataFrame) -> bool:
         return True
     else:
         return False
+
+
+def df_to_arrays(df: pl.DataFrame, columns: list[str]) -> dict[str, np.ndarray]:
+    """
+    Convert each column once into a NumPy buffer for plotly traces. Numbers
+    stay typed arrays, which plotly serializes as base64, dates become ISO
+    date strings.
+    """
+    arrays = {}
+    for col in dict.fromkeys(columns):
+        series = df[col]
+        if series.dtype.is_temporal():
+            series = series.cast(pl.String)
+        arrays[col] = series.to_numpy()
+    return arrays
+
+
+def df_fingerprint(df: pl.DataFrame, columns: list[str]) -> str:
+    """
+    Short digest of the given columns, changes whenever their data does
+    """
+    hashes = df.select(columns).hash_rows(seed=0).to_numpy()
+    return hashlib.blake2b(hashes.tobytes(), digest_size=8).hexdigest()